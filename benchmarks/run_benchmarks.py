@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试
+
+在合成数据 (或指定的数据目录) 上分别测量:
+    parser:<表名>   各解析器单独解析 (单进程、不使用缓存)
+    sql_generator   SqlGenerator 单独生成SQL (数据预先解析到内存)
+    converter       XPlaneConverter 完整转换 (单进程、不使用缓存)
+的耗时、每秒记录数和字节数，以及 tracemalloc 统计的峰值内存。
+计时取多次运行的最短时间，内存在单独的一次运行中统计，不影响计时
+(tracemalloc会使这次运行慢很多倍，只需要计时时使用 --no-memory)。
+
+结果可与保存的基准 (默认 benchmarks/baseline.json) 对比，耗时或内存超出容差时
+返回非零退出码。基准与运行的机器有关，更换机器后需要重新保存
+
+用法:
+    python run_benchmarks.py                      # 生成数据、运行并与基准对比
+    python run_benchmarks.py --save-baseline      # 运行并保存为新的基准
+    python run_benchmarks.py --only parser:terminal_procedures,converter -o results.json
+"""
+
+import os
+import io
+import gc
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCHMARK_DIR), 'src')
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from main import TABLE_SOURCES, XPlaneConverter, create_parser, get_source_size, setup_logging, stop_logging
+from sql_generator import SqlGenerator
+from metrics import get_metrics
+from synthetic_navdata import generate_navdata
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# 单个基准: 执行一次，返回 (记录数, 字节数)
+Benchmark = Callable[[], Tuple[int, int]]
+
+def _parser_benchmark(source_dir: str, table_name: str) -> Benchmark:
+    source_bytes = get_source_size(source_dir, table_name)
+    
+    def run() -> Tuple[int, int]:
+        parser = create_parser(source_dir, table_name)
+        record_count = sum(1 for _ in parser.iter_records())
+        return record_count, source_bytes
+    return run
+
+def _sql_generator_benchmark(source_dir: str, work_dir: str, table_names: List[str]) -> Benchmark:
+    # 数据在计时之外预先解析，只测量SQL生成和写出
+    data_dict = {table_name: list(create_parser(source_dir, table_name).iter_records())
+                 for table_name in table_names}
+    output_file = os.path.join(work_dir, 'sql_generator.sql')
+    
+    def run() -> Tuple[int, int]:
+        SqlGenerator(output_file).generate_complete_sql(data_dict)
+        return sum(len(records) for records in data_dict.values()), os.path.getsize(output_file)
+    return run
+
+def _converter_benchmark(source_dir: str, work_dir: str, table_names: List[str]) -> Benchmark:
+    output_file = os.path.join(work_dir, 'converter.sql')
+    source_bytes = sum(get_source_size(source_dir, table_name) for table_name in table_names)
+    
+    def run() -> Tuple[int, int]:
+        # 只保留警告，避免日志输出影响计时；转换器中再次配置日志时不会覆盖
+        setup_logging()
+        logging.getLogger().setLevel(logging.WARNING)
+        converter = XPlaneConverter(source_dir, output_file)
+        with redirect_stdout(io.StringIO()):
+            converter.convert_all(table_names)
+        # 报告的最后一个阶段为总体阶段，记录数为写入的总记录数
+        return get_metrics().stages[-1]['records'], source_bytes
+    return run
+
+def measure(benchmark: Benchmark, repeat: int, memory: bool) -> Dict[str, Any]:
+    """
+    运行一个基准
+    
+    Args:
+        benchmark: 基准函数
+        repeat: 计时运行次数，取最短时间
+        memory: 是否另外运行一次统计峰值内存
+    
+    Returns:
+        Dict: 耗时、记录数、字节数、每秒记录数和字节数、峰值内存
+    """
+    timings = []
+    for _ in range(max(1, repeat)):
+        gc.collect()
+        start_time = time.perf_counter()
+        record_count, byte_count = benchmark()
+        timings.append(time.perf_counter() - start_time)
+    
+    seconds = min(timings)
+    result = {
+        'seconds': round(seconds, 4),
+        'records': record_count,
+        'bytes': byte_count,
+        'records_per_second': round(record_count / seconds, 1) if seconds > 0 else None,
+        'bytes_per_second': round(byte_count / seconds, 1) if seconds > 0 else None,
+        'peak_memory_mb': None,
+    }
+    
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            benchmark()
+            result['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        finally:
+            tracemalloc.stop()
+    return result
+
+def compare_results(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    与基准对比，打印对比表
+    
+    Args:
+        results: 本次结果
+        baseline: 基准结果
+        tolerance: 允许的耗时和内存增长比例，如0.15为15%
+    
+    Returns:
+        List[str]: 超出容差的基准及原因
+    """
+    if results['data'] != baseline.get('data'):
+        print("警告: 本次数据的比例、种子或记录数与基准不同，对比结果仅供参考")
+    
+    regressions = []
+    print(f"\n{'基准':32} {'基准耗时':>10} {'本次耗时':>10} {'变化':>8} {'基准内存':>10} {'本次内存':>10}")
+    print("-" * 88)
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if previous is None:
+            print(f"{name:32} {'-':>10} {current['seconds']:>10.4f} {'新增':>8}")
+            continue
+    
+        change = current['seconds'] / previous['seconds'] - 1 if previous['seconds'] else 0.0
+        print(f"{name:32} {previous['seconds']:>10.4f} {current['seconds']:>10.4f} {change:>+8.1%} "
+              f"{_format_memory(previous.get('peak_memory_mb')):>10} "
+              f"{_format_memory(current.get('peak_memory_mb')):>10}")
+        if change > tolerance:
+            regressions.append(f"{name}: 耗时增加 {change:.1%}")
+    
+        previous_memory = previous.get('peak_memory_mb')
+        current_memory = current.get('peak_memory_mb')
+        if previous_memory and current_memory and current_memory / previous_memory - 1 > tolerance:
+            regressions.append(f"{name}: 峰值内存增加 {current_memory / previous_memory - 1:.1%}")
+    return regressions
+
+def _format_memory(value: Optional[float]) -> str:
+    return '-' if value is None else f"{value:.2f}MB"
+
+def main():
+    parser = argparse.ArgumentParser(description='X-Plane导航数据转换基准测试')
+    parser.add_argument('--data', help='使用已有的数据目录，不指定时在临时目录中生成合成数据')
+    parser.add_argument('--scale', type=float, default=0.05, help='合成数据的比例 (默认: 0.05)')
+    parser.add_argument('--seed', type=int, default=2401, help='合成数据的随机种子 (默认: 2401)')
+    parser.add_argument('--repeat', type=int, default=5, help='每个基准的计时次数，取最短时间 (默认: 5)')
+    parser.add_argument('--only', help='只运行指定的基准 (逗号分隔)，如 parser:waypoints,converter')
+    parser.add_argument('--no-memory', action='store_true', help='不统计峰值内存')
+    parser.add_argument('-o', '--output', help='把结果保存到JSON文件')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基准文件 (默认: benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='把本次结果保存为基准，不做对比')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='耗时或内存超出基准的容差比例 (默认: 0.15)')
+    args = parser.parse_args()
+    
+    temp_dir = tempfile.mkdtemp(prefix='xplane-bench-')
+    # 转换日志 conversion.log 写在当前目录，切换到临时目录运行
+    original_dir = os.getcwd()
+    try:
+        if args.data:
+            source_dir = os.path.abspath(args.data)
+            data_info = {'source': os.path.basename(source_dir.rstrip(os.sep))}
+        else:
+            source_dir = os.path.join(temp_dir, 'source')
+            print(f"生成合成数据 (比例 {args.scale}, 种子 {args.seed})...")
+            counts = generate_navdata(source_dir, args.scale, seed=args.seed)
+            data_info = {'scale': args.scale, 'seed': args.seed, 'counts': counts}
+        os.chdir(temp_dir)
+    
+        table_names = [table_name for table_name in TABLE_SOURCES
+                       if os.path.exists(os.path.join(source_dir, TABLE_SOURCES[table_name][1]))]
+        benchmarks: Dict[str, Callable[[], Benchmark]] = {}
+        for table_name in table_names:
+            benchmarks[f"parser:{table_name}"] = (
+                lambda table_name=table_name: _parser_benchmark(source_dir, table_name))
+        benchmarks['sql_generator'] = lambda: _sql_generator_benchmark(source_dir, temp_dir, table_names)
+        benchmarks['converter'] = lambda: _converter_benchmark(source_dir, temp_dir, table_names)
+    
+        if args.only:
+            selected = [name.strip() for name in args.only.split(',') if name.strip()]
+            unknown = [name for name in selected if name not in benchmarks]
+            if unknown:
+                parser.error(f"未知的基准: {', '.join(unknown)}，可选: {', '.join(benchmarks)}")
+            benchmarks = {name: benchmarks[name] for name in selected}
+    
+        results = {
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'environment': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'processor': platform.machine(),
+                'cpu_count': os.cpu_count(),
+            },
+            'data': data_info,
+            'benchmarks': {},
+        }
+        for name, create_benchmark in benchmarks.items():
+            result = measure(create_benchmark(), args.repeat, not args.no_memory)
+            results['benchmarks'][name] = result
+            print(f"{name:32} {result['seconds']:>9.4f} 秒 {result['records_per_second'] or 0:>14,.0f} 条/秒 "
+                  f"{(result['bytes_per_second'] or 0) / (1024 * 1024):>9.2f} MB/秒 "
+                  f"{_format_memory(result['peak_memory_mb']):>10}")
+    finally:
+        os.chdir(original_dir)
+        stop_logging()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"\n基准已保存到: {args.baseline}")
+        return
+    
+    if not os.path.exists(args.baseline):
+        print(f"\n没有基准文件 {args.baseline}，使用 --save-baseline 保存")
+        return
+    
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_results(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n超出容差 ({args.tolerance:.0%}) 的基准:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"\n所有基准均在容差 ({args.tolerance:.0%}) 内")
+
+if __name__ == '__main__':
+    main()
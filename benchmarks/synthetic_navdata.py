@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成X-Plane导航数据
+
+按比例生成格式有效的 earth_fix.dat、earth_nav.dat、earth_awy.dat、earth_hold.dat、
+earth_mora.dat、earth_msa.dat、earth_aptmeta.dat、earth_apt.dat 和 CIFP/*.dat，
+比例1.0约为一个完整AIRAC周期的数据量。相同的比例和随机种子生成完全相同的文件，
+用于没有真实数据时的基准测试
+
+用法:
+    python synthetic_navdata.py -o ../synthetic --scale 0.05
+    python synthetic_navdata.py -o ../synthetic --scale 0.05 --table-scale terminal_procedures=0.2
+"""
+
+import os
+import random
+import argparse
+from typing import Dict, Iterator, List
+
+# 比例为1.0时各文件的记录数 (CIFP和earth_apt.dat为机场数)，接近完整周期的规模；
+# earth_apt.dat 由 runways、frequencies 和 gates 三张表共用，比例按 runways 指定
+FULL_SCALE_COUNTS = {
+    'airports': 38000,
+    'waypoints': 250000,
+    'navaids': 27000,
+    'airways': 75000,
+    'holdings': 15000,
+    'mora': 2160,
+    'msa': 12000,
+    'terminal_procedures': 3500,
+    'runways': 35000,
+}
+
+# 表名 -> 生成的文件 (相对于输出目录)
+OUTPUT_FILES = {
+    'airports': 'earth_aptmeta.dat',
+    'waypoints': 'earth_fix.dat',
+    'navaids': 'earth_nav.dat',
+    'airways': 'earth_awy.dat',
+    'holdings': 'earth_hold.dat',
+    'mora': 'earth_mora.dat',
+    'msa': 'earth_msa.dat',
+    'terminal_procedures': 'CIFP',
+    'runways': 'earth_apt.dat',
+}
+
+HEADER = ("I\n"
+          "1200 Version - data cycle 2401, build 20240101, metadata SyntheticXP1200. "
+          "Synthetic data for benchmarking.\n\n")
+
+REGIONS = ['K1', 'K2', 'K3', 'K4', 'K5', 'K6', 'K7', 'EG', 'ED', 'LF', 'ZB', 'ZS', 'RJ', 'YM', 'SB']
+
+# 导航设备类型 -> 频率范围 (与 NavaidParser 的校验范围一致)
+NAVAID_TYPES = {2: (190, 1750), 3: (10800, 11795), 4: (10810, 11195), 6: (10810, 11195), 12: (10800, 11795)}
+
+NAVAID_NAMES = ['KENNEDY', 'LA GUARDIA', "ST JOHN'S", 'NORTH PLATTE', 'SAN FRANCISCO', 'BEIJING CAPITAL',
+                'DETROIT', 'HONOLULU', "O'HARE", 'FRANKFURT MAIN', 'DOVER', 'LIMA']
+
+def _name(prefix: str, index: int, width: int = 4) -> str:
+    return f"{prefix}{index:0{width}d}"
+
+def _airport_code(index: int) -> str:
+    # 前缀随编号变化，使编号较大时仍为4个字符
+    return f"{chr(ord('A') + index // 1000 % 26)}{index % 1000:03d}"
+
+def _write_dat(path: str, lines: Iterator[str]) -> None:
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(HEADER)
+        for line in lines:
+            f.write(line)
+            f.write("\n")
+        f.write("99\n")
+
+def _airport_lines(rng: random.Random, count: int) -> Iterator[str]:
+    for index in range(count):
+        transition_level = rng.choice(['FL180', 'FL060', 'FL110', '-1'])
+        yield (f"{_airport_code(index)} {rng.choice(REGIONS)} {rng.uniform(-85, 85):.9f} "
+               f"{rng.uniform(-180, 180):.9f} {rng.randint(-50, 14000)} {rng.choice('PPPM')} "
+               f"{rng.randint(800, 4500)} {rng.choice('0123')} {rng.choice([3000, 5000, 18000, -1])} "
+               f"{transition_level}")
+
+def _waypoint_lines(rng: random.Random, count: int) -> Iterator[str]:
+    for index in range(count):
+        usage_type = rng.choice(['ENRT', 'ENRT', 'ENRT', _airport_code(rng.randrange(max(count // 70, 1)))])
+        yield (f"{rng.uniform(-85, 85):13.9f} {rng.uniform(-180, 180):14.9f} {_name('W', index)} "
+               f"{usage_type} {rng.choice(REGIONS)} {rng.choice([2115159, 4530692, 4530758])} "
+               f"{_name('W', index)}")
+
+def _navaid_lines(rng: random.Random, count: int) -> Iterator[str]:
+    for index in range(count):
+        nav_type = rng.choice(list(NAVAID_TYPES))
+        low, high = NAVAID_TYPES[nav_type]
+        name = rng.choice(NAVAID_NAMES)
+        suffix = {2: 'NDB', 3: 'VOR/DME', 4: 'ILS-cat-I', 6: 'GS', 12: 'DME'}[nav_type]
+        yield (f"{nav_type:2d} {rng.uniform(-85, 85):13.9f} {rng.uniform(-180, 180):14.9f} "
+               f"{rng.randint(0, 9000)} {rng.randint(low, high)} {rng.choice([25, 40, 130, 195])} "
+               f"{rng.uniform(-30, 30):.3f} {_name('V', index, 3)} ENRT {rng.choice(REGIONS)} {name} {suffix}")
+
+def _airway_lines(rng: random.Random, count: int, waypoint_count: int) -> Iterator[str]:
+    waypoint_count = max(waypoint_count, 2)
+    for index in range(count):
+        airway_name = rng.choice('JVQTABGLMRW') + str(index % 900)
+        min_altitude = rng.choice([50, 100, 180, 245])
+        if rng.random() < 0.2:
+            # 一段航路属于多条航路时名称用连字符连接
+            airway_name += '-' + rng.choice('JVQ') + str(rng.randrange(900))
+        yield (f"{_name('W', rng.randrange(waypoint_count))} {rng.choice(REGIONS)} 11 "
+               f"{_name('W', rng.randrange(waypoint_count))} {rng.choice(REGIONS)} 11 "
+               f"{rng.choice('NFB')} {rng.choice([1, 2])} {min_altitude} "
+               f"{rng.choice([max(min_altitude, 180), 450, 600])} {airway_name}")
+
+def _holding_lines(rng: random.Random, count: int, airport_count: int) -> Iterator[str]:
+    for index in range(count):
+        airport = _airport_code(rng.randrange(max(airport_count, 1))) if rng.random() < 0.6 else 'ENRT'
+        yield (f"{_name('H', index)} {rng.choice(REGIONS)} {airport} {rng.choice([11, 3])} "
+               f"{rng.uniform(0, 360):.1f} {rng.choice(['0.0', '1.0', '1.5'])} {rng.choice(['0.0', '4.0', '5.0'])} "
+               f"{rng.choice('LR')} {rng.choice([0, 3000, 6000])} {rng.choice([0, 18000, 41000])} "
+               f"{rng.choice([0, 200, 230, 265])}")
+
+def _mora_lines(rng: random.Random, count: int) -> Iterator[str]:
+    # 每行覆盖30个1度网格，按纬度从北到南、经度从西到东排列
+    for index in range(min(count, 180 * 12)):
+        latitude = 89 - index // 12
+        longitude = -180 + index % 12 * 30
+        values = ' '.join(f"{rng.randint(0, 150):03d}" for _ in range(30))
+        yield f"{latitude:+03d} {longitude:+04d} {values}"
+
+def _msa_lines(rng: random.Random, count: int, airport_count: int) -> Iterator[str]:
+    for index in range(count):
+        sector_count = rng.choice([1, 2, 3, 3])
+        sectors = []
+        for sector in range(sector_count):
+            sectors.extend([sector * 360 // sector_count, rng.randint(20, 140), 25])
+        yield (f"{sector_count} {_name('N', index, 3)} {rng.choice(REGIONS)} "
+               f"{_airport_code(index % max(airport_count, 1))} {rng.choice('MT')} "
+               + ' '.join(str(value) for value in sectors))
+
+def _apt_lines(rng: random.Random, count: int) -> Iterator[str]:
+    for index in range(count):
+        header_code = rng.choice([1, 1, 1, 1, 16, 17])
+        latitude, longitude = rng.uniform(-85, 85), rng.uniform(-179, 179)
+        yield f"{header_code:<4d} {rng.randint(-50, 14000)} 0 0 {_airport_code(index)} Synthetic Airport {index}"
+        yield f"1302 city {rng.choice(NAVAID_NAMES)}"
+        yield f"1302 icao_code {_airport_code(index)}"
+        
+        for runway in range(rng.randint(1, 3)):
+            number = rng.randint(1, 18)
+            end1 = (latitude + runway * 0.01, longitude)
+            end2 = (latitude + runway * 0.01 + rng.uniform(0.005, 0.03), longitude + rng.uniform(-0.03, 0.03))
+            if header_code == 1:
+                yield (f"100 {rng.choice([23.0, 30.48, 45.72, 60.0]):.2f} {rng.choice([1, 2, 3, 5])} 0 0.25 1 2 1 "
+                       f"{number:02d} {end1[0]:.8f} {end1[1]:.8f} {rng.choice([0, 0, 150.88]):.2f} 0.00 3 0 0 1 "
+                       f"{number + 18:02d} {end2[0]:.8f} {end2[1]:.8f} 0.00 {rng.choice([0, 60.96]):.2f} 3 0 0 1")
+            elif header_code == 16:
+                yield (f"101 {rng.choice([50, 100]):.2f} 1 {number:02d} {end1[0]:.8f} {end1[1]:.8f} "
+                       f"{number + 18:02d} {end2[0]:.8f} {end2[1]:.8f}")
+            else:
+                yield (f"102 H{runway + 1} {end1[0]:.8f} {end1[1]:.8f} {rng.uniform(0, 360):.2f} "
+                       f"15.00 15.00 {rng.choice([1, 2])} 0 0 0.25 0")
+        
+        # 频率: 旧格式单位为10kHz，8.33kHz间隔格式单位为kHz
+        for _ in range(rng.randint(0, 6)):
+            frequency = rng.randrange(118000, 137000, 25)
+            if rng.random() < 0.2:
+                yield f"{rng.randint(50, 56)} {frequency // 10} {rng.choice(NAVAID_NAMES)}"
+            else:
+                yield f"{rng.randint(1050, 1056)} {frequency} {rng.choice(NAVAID_NAMES)}"
+        
+        # 道面和滑行道网络，实际文件中大部分是这类行
+        yield f"110 1 0.25 {rng.uniform(0, 360):.2f} Taxiway {index}"
+        for node in range(rng.randint(4, 24)):
+            yield f"{rng.choice([111, 112])} {latitude + node * 0.0001:.8f} {longitude:.8f}"
+        yield f"113 {latitude:.8f} {longitude:.8f}"
+        yield "1200"
+        for node in range(rng.randint(4, 30)):
+            yield f"1201 {latitude + node * 0.0001:.8f} {longitude:.8f} both {node}"
+        for node in range(rng.randint(3, 29)):
+            yield f"1202 {node} {node + 1} twoway taxiway A"
+        
+        for gate in range(rng.choice([0, 0, 2, 5, 20])):
+            if rng.random() < 0.1:
+                yield f"15 {latitude:.8f} {longitude + gate * 0.0002:.8f} {rng.uniform(0, 360):.2f} Ramp {gate}"
+                continue
+            yield (f"1300 {latitude:.8f} {longitude + gate * 0.0002:.8f} {rng.uniform(0, 360):.2f} "
+                   f"{rng.choice(['gate', 'hangar', 'tie-down', 'misc'])} "
+                   f"{rng.choice(['heavy|jets', 'jets|turboprops', 'props', 'all'])} Gate {gate}")
+            if rng.random() < 0.7:
+                yield f"1301 {rng.choice('ABCDEF')} {rng.choice(['airline', 'cargo', 'general_aviation'])} AAL UAL"
+
+def _procedure_line(rng: random.Random, procedure_type: str, sequence: int, route_type: str, procedure_name: str,
+                    transition: str, waypoint: str, region: str, path_terminator: str) -> str:
+    altitude = f"{rng.choice([2000, 3000, 5000, 8000]):05d}"
+    fields = [
+        f"{procedure_type}:{sequence:03d}", route_type, procedure_name, transition, waypoint, region,
+        rng.choice(['P', 'E']), rng.choice(['C', 'A', 'D']), rng.choice(['E  ', 'EY ', 'E B', '   ']),
+        rng.choice(['L', 'R', '']), '', '', path_terminator, '',
+        rng.choice(['JFK', 'LGA', '']), region, rng.choice(['D', '']), '', '',
+        f"{rng.uniform(0, 360):.1f}", f"{rng.uniform(0, 30):.1f}", f"{rng.uniform(0, 360):.1f}", '', '',
+        rng.choice(['+', '-', '@', '']), altitude, '', '18000', '', rng.choice(['', '210', '250']), '',
+        rng.choice(['', '-3.00']), '', '', '',
+    ]
+    return ','.join(fields) + ';'
+
+def _cifp_lines(rng: random.Random, waypoint_count: int) -> Iterator[str]:
+    runways = [f"RW{number:02d}{side}" for number in rng.sample(range(1, 37), 2) for side in ('L', 'R')]
+    for runway in runways:
+        yield (f"RWY:{runway},,,,N{rng.randint(10, 60)}{rng.randint(0, 599999):06d},"
+               f"W{rng.randint(70, 120)}{rng.randint(0, 599999):06d},0,{rng.randint(0, 500)},,;")
+    
+    waypoint_count = max(waypoint_count, 1)
+    for procedure_type, count in (('SID', rng.randint(3, 8)), ('STAR', rng.randint(3, 8)), ('APPCH', rng.randint(2, 6))):
+        for procedure_index in range(count):
+            procedure_name = f"{rng.choice(['RUDY', 'GREKI', 'PARCH', 'DEEZZ', 'ROBER'])}{procedure_index}"
+            if procedure_type == 'APPCH':
+                procedure_name = f"{rng.choice('IRVL')}{rng.choice(runways)[2:]}"
+            transitions = [rng.choice(runways), 'ALL'] + [_name('W', rng.randrange(waypoint_count))
+                                                          for _ in range(rng.randint(0, 2))]
+            for transition in transitions:
+                sequence = 10
+                for leg in range(rng.randint(3, 10)):
+                    path_terminator = 'IF' if leg == 0 else rng.choice(['TF', 'TF', 'CF', 'DF', 'VA', 'CA', 'RF'])
+                    yield _procedure_line(rng, procedure_type, sequence, str(rng.randint(1, 6)), procedure_name,
+                                          transition, _name('W', rng.randrange(waypoint_count)),
+                                          rng.choice(REGIONS), path_terminator)
+                    sequence += 10
+
+def generate_navdata(output_dir: str, scale: float = 0.05, table_scales: Dict[str, float] = None,
+                     seed: int = 2401) -> Dict[str, int]:
+    """
+    生成合成导航数据
+    
+    Args:
+        output_dir: 输出目录，不存在时创建
+        scale: 整体比例，1.0约为完整周期的数据量
+        table_scales: 按表覆盖的比例，如 {'terminal_procedures': 0.2}
+        seed: 随机种子
+    
+    Returns:
+        Dict[str, int]: 各表生成的记录数 (CIFP为机场数)
+    """
+    table_scales = table_scales or {}
+    counts = {table_name: max(1, int(round(full_count * table_scales.get(table_name, scale))))
+              for table_name, full_count in FULL_SCALE_COUNTS.items()}
+    counts['mora'] = min(counts['mora'], 180 * 12)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    
+    def path(table_name: str) -> str:
+        return os.path.join(output_dir, OUTPUT_FILES[table_name])
+    
+    # 每个文件使用独立的随机序列，修改一个表的比例不影响其他文件的内容
+    def rng(table_name: str) -> random.Random:
+        return random.Random(f"{seed}:{table_name}")
+    
+    _write_dat(path('airports'), _airport_lines(rng('airports'), counts['airports']))
+    _write_dat(path('waypoints'), _waypoint_lines(rng('waypoints'), counts['waypoints']))
+    _write_dat(path('navaids'), _navaid_lines(rng('navaids'), counts['navaids']))
+    _write_dat(path('airways'), _airway_lines(rng('airways'), counts['airways'], counts['waypoints']))
+    _write_dat(path('holdings'), _holding_lines(rng('holdings'), counts['holdings'], counts['airports']))
+    _write_dat(path('mora'), _mora_lines(rng('mora'), counts['mora']))
+    _write_dat(path('msa'), _msa_lines(rng('msa'), counts['msa'], counts['airports']))
+    _write_dat(path('runways'), _apt_lines(rng('runways'), counts['runways']))
+    
+    cifp_dir = path('terminal_procedures')
+    os.makedirs(cifp_dir, exist_ok=True)
+    cifp_rng = rng('terminal_procedures')
+    for index in range(counts['terminal_procedures']):
+        with open(os.path.join(cifp_dir, f"{_airport_code(index)}.dat"), 'w', encoding='utf-8', newline='\n') as f:
+            for line in _cifp_lines(cifp_rng, counts['waypoints']):
+                f.write(line)
+                f.write("\n")
+    
+    return counts
+
+def parse_table_scales(values: List[str]) -> Dict[str, float]:
+    """
+    解析命令行的 表名=比例 参数
+    """
+    table_scales = {}
+    for value in values or []:
+        table_name, _, table_scale = value.partition('=')
+        if table_name not in FULL_SCALE_COUNTS or not table_scale:
+            raise argparse.ArgumentTypeError(f"无效的表比例: {value}，格式为 表名=比例，"
+                                             f"表名为 {', '.join(FULL_SCALE_COUNTS)} 之一")
+        table_scales[table_name] = float(table_scale)
+    return table_scales
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成X-Plane导航数据')
+    parser.add_argument('-o', '--output', required=True, help='输出目录')
+    parser.add_argument('--scale', type=float, default=0.05, help='整体比例，1.0约为完整周期 (默认: 0.05)')
+    parser.add_argument('--table-scale', action='append', metavar='TABLE=SCALE',
+                        help='按表覆盖比例，可重复指定，如 terminal_procedures=0.2')
+    parser.add_argument('--seed', type=int, default=2401, help='随机种子 (默认: 2401)')
+    args = parser.parse_args()
+    
+    try:
+        table_scales = parse_table_scales(args.table_scale)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    
+    counts = generate_navdata(args.output, args.scale, table_scales, args.seed)
+    for table_name, count in counts.items():
+        unit = '个机场' if table_name in ('terminal_procedures', 'runways') else '条记录'
+        print(f"{OUTPUT_FILES[table_name]:20}: {count:8,} {unit}")
+
+if __name__ == '__main__':
+    main()
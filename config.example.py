@@ -18,16 +18,34 @@ SOURCE_CONFIG = {
         'holdings': 'earth_hold.dat',
         'navaids': 'earth_nav.dat',
         'mora': 'earth_mora.dat',
-        'msa': 'earth_msa.dat'
+        'msa': 'earth_msa.dat',
+        # runways、frequencies 和 gates 共用完整的apt.dat
+        'runways': 'earth_apt.dat',
+        'frequencies': 'earth_apt.dat',
+        'gates': 'earth_apt.dat'
     }
 }
 
 OUTPUT_CONFIG = {
+    # 输出格式: mysql (SQL文件)、loaddata (LOAD DATA数据文件和控制脚本)、postgresql (COPY导入脚本) 或 sqlite (SQLite数据库文件)，可用 --format 覆盖
+    'output_format': 'mysql',
     'output_directory': '../output',
     'main_sql_file': 'navdata.sql',
+    # mysql输出按表分片 (同 --separate-files)，附带清单和并行导入脚本
     'generate_separate_files': False,
+    # 分片输出时每个分片最多的记录数
+    'shard_rows': 500000,
     'encoding': 'utf-8',
-    'batch_size': 1000
+    # 每条INSERT语句最多的行数
+    'batch_size': 1000,
+    # 每条INSERT语句最多的字节数 (UTF-8)，需小于MySQL服务器的 max_allowed_packet
+    'max_statement_bytes': 1048576,
+    # 输出文件以 .gz/.xz 结尾时的压缩线程数，0为CPU核数
+    'compression_threads': 0,
+    # mysql输出的导入优化 (同 --import-optimized): 数据导入后再添加索引
+    'import_optimized': False,
+    # 导入优化时每多少批INSERT提交一次
+    'commit_every_batches': 10
 }
 
 PARSING_CONFIG = {
@@ -67,9 +85,28 @@ DATABASE_CONFIG = {
 }
 
 PERFORMANCE_CONFIG = {
-    # 多进程
+    # 多进程: 各表在进程池中并行解析，按源文件大小从大到小调度
     'enable_multiprocessing': False,
+    # 进程数，0表示使用CPU核数 (命令行 -j 优先)
     'process_count': 0,
+    # 并行解析时子进程以NumPy列式表返回结果，减少内存和进程间传输 (需要numpy)
+    'columnar_storage': False,
+    # 并行解析时各表结果在写入前缓冲的内存预算 (MB，平均分给各表，0为不限制)，
+    # 超出部分按批写到临时文件，读回时顺序不变
     'memory_limit': 1024,
-    'show_progress': True
+    # 超出内存预算时临时文件的目录，None为系统临时目录
+    'spill_directory': None,
+    # 在终端中实时显示各表已处理的记录数和速度
+    'show_progress': True,
+    # 转换后写出性能指标报告 <输出文件名>_metrics.json
+    'metrics_report': True
+}
+
+CACHE_CONFIG = {
+    # 缓存各表的解析结果，源文件和解析器未变化时跳过解析 (命令行 --no-cache 关闭)
+    'enabled': True,
+    # 缓存目录 (相对于运行目录)
+    'directory': '../cache',
+    # 缓存总大小上限 (MB)，超出时删除最久未使用的条目
+    'max_size_mb': 2048
 }
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+列式表存储
+
+按 sql_schemas 中的建表语句确定列和类型，数值列存为NumPy数组，
+字符串列做字典编码 (每行只存一个int32编码，相同的值只保存一次)，
+避免每行一个dict、重复保存相同键名带来的内存开销
+"""
+
+import logging
+from typing import List, Dict, Any, Iterable, Iterator, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from .sql_schemas import get_table_columns, get_column_kind
+    from .record_types import RECORD_TYPES
+except ImportError:
+    from sql_schemas import get_table_columns, get_column_kind
+    from record_types import RECORD_TYPES
+
+class ColumnarTable:
+
+    # 每积累这么多行就把待写入的Python列表转换为NumPy数组块
+    block_rows = 65536
+
+    _numpy_dtypes = {'int': 'int64', 'float': 'float64', 'bool': 'bool', 'str': 'int32'}
+
+    def __init__(self, table_name: str):
+        if np is None:
+            raise ImportError("列式存储需要安装numpy: pip install numpy")
+
+        self.table_name = table_name
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        columns = get_table_columns(table_name)
+        self.column_names: List[str] = [name for name, _ in columns]
+        self.column_kinds: List[str] = [get_column_kind(sql_type) for _, sql_type in columns]
+
+        column_count = len(columns)
+        # 尚未转换为数组的行，按列保存
+        self._pending: List[List[Any]] = [[] for _ in range(column_count)]
+        # 已转换的数组块，以及对应的NULL掩码块
+        self._blocks: List[List[Any]] = [[] for _ in range(column_count)]
+        self._null_blocks: List[List[Any]] = [[] for _ in range(column_count)]
+        # 字符串列的字典: 值 -> 编码，编码 -> 值
+        self._codes: Dict[int, Dict[str, int]] = {}
+        self._values: Dict[int, List[str]] = {}
+        for index, kind in enumerate(self.column_kinds):
+            if kind == 'str':
+                self._codes[index] = {}
+                self._values[index] = []
+
+        self._row_count = 0
+
+    @classmethod
+    def from_records(cls, table_name: str, records: Iterable[Any]) -> 'ColumnarTable':
+        table = cls(table_name)
+        table.extend(records)
+        return table
+
+    def __len__(self) -> int:
+        return self._row_count
+
+    def __iter__(self) -> Iterator[tuple]:
+        return self.iter_rows()
+
+    @property
+    def column_dtypes(self) -> Dict[str, str]:
+        """
+        各列的存储类型，字符串列为字典编码
+        """
+        return {name: ('str' if kind == 'str' else self._numpy_dtypes[kind])
+                for name, kind in zip(self.column_names, self.column_kinds)}
+
+    @property
+    def nbytes(self) -> int:
+        """
+        数组数据占用的字节数 (不含字符串字典)
+        """
+        self._flush()
+        total = 0
+        for blocks, null_blocks in zip(self._blocks, self._null_blocks):
+            total += sum(block.nbytes for block in blocks)
+            total += sum(block.nbytes for block in null_blocks if block is not None)
+        return total
+
+    def append(self, record: Union[Dict[str, Any], Iterable[Any]]) -> None:
+        """
+        追加一行，可以是 record_types 中的记录、按建表顺序排列的序列或以字段名为键的dict
+        """
+        if isinstance(record, dict):
+            values = [record.get(name) for name in self.column_names]
+        else:
+            values = record
+
+        for index, value in enumerate(values):
+            if index in self._codes:
+                if value is not None:
+                    codes = self._codes[index]
+                    code = codes.get(value)
+                    if code is None:
+                        code = codes[value] = len(codes)
+                        self._values[index].append(value)
+                    value = code
+                else:
+                    value = -1
+            self._pending[index].append(value)
+
+        self._row_count += 1
+        if len(self._pending[0]) >= self.block_rows:
+            self._flush()
+
+    def extend(self, records: Iterable[Any]) -> None:
+        for record in records:
+            self.append(record)
+
+    def _flush(self) -> None:
+        """
+        把待写入的行转换为数组块
+        """
+        if not self._pending or not self._pending[0]:
+            return
+
+        for index, kind in enumerate(self.column_kinds):
+            pending = self._pending[index]
+            if kind == 'str':
+                self._blocks[index].append(np.array(pending, dtype=np.int32))
+                self._null_blocks[index].append(None)
+            else:
+                nulls = np.fromiter((value is None for value in pending), dtype=bool, count=len(pending))
+                has_nulls = bool(nulls.any())
+                if has_nulls:
+                    fill = False if kind == 'bool' else 0
+                    pending = [fill if value is None else value for value in pending]
+                self._blocks[index].append(np.array(pending, dtype=self._numpy_dtypes[kind]))
+                self._null_blocks[index].append(nulls if has_nulls else None)
+            self._pending[index] = []
+
+    def column(self, name: str) -> Any:
+        """
+        取出整列，数值列返回NumPy数组，字符串列返回object数组，便于向量化校验
+        """
+        self._flush()
+        index = self.column_names.index(name)
+        blocks = self._blocks[index]
+        if not blocks:
+            return np.array([], dtype=object if index in self._codes else self._numpy_dtypes[self.column_kinds[index]])
+
+        data = np.concatenate(blocks)
+        if index in self._codes:
+            values = np.array(self._values[index] + [None], dtype=object)
+            return values[data]
+        return data
+
+    def null_mask(self, name: str) -> Any:
+        """
+        返回某列的NULL掩码 (True表示NULL)
+        """
+        self._flush()
+        index = self.column_names.index(name)
+        if index in self._codes:
+            return self.column(name) == None  # noqa: E711
+
+        masks = [mask if mask is not None else np.zeros(len(block), dtype=bool)
+                 for block, mask in zip(self._blocks[index], self._null_blocks[index])]
+        return np.concatenate(masks) if masks else np.array([], dtype=bool)
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """
+        按原始顺序逐行返回记录，数值转换为Python原生类型，NULL还原为None
+        """
+        self._flush()
+        make_record = RECORD_TYPES[self.table_name]._make
+
+        block_count = len(self._blocks[0]) if self._blocks else 0
+        lookups = {index: values + [None] for index, values in self._values.items()}
+
+        for block_index in range(block_count):
+            columns = []
+            for index in range(len(self.column_names)):
+                block = self._blocks[index][block_index].tolist()
+                if index in lookups:
+                    lookup = lookups[index]
+                    block = [lookup[code] for code in block]
+                else:
+                    mask = self._null_blocks[index][block_index]
+                    if mask is not None:
+                        block = [None if is_null else value for value, is_null in zip(block, mask.tolist())]
+                columns.append(block)
+
+            yield from map(make_record, zip(*columns))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+多线程压缩输出
+
+ParallelCompressedWriter 把写入的文本按块切分，每块在线程池中独立压缩为一个
+gzip member 或 xz stream (zlib和lzma压缩时释放GIL)，按顺序拼接写入文件。
+多个member/stream直接拼接仍是合法的 .gz/.xz 文件，gzip -d、zcat、xz -d 都能解压
+"""
+
+import os
+import gzip
+import lzma
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional, TextIO, Tuple
+
+# 扩展名 -> 压缩格式
+COMPRESSION_FORMATS = {'.gz': 'gzip', '.xz': 'xz'}
+
+# 每块的大小 (未压缩)，xz的块更大以保持压缩率
+_CHUNK_SIZES = {'gzip': 4 * 1024 * 1024, 'xz': 16 * 1024 * 1024}
+
+def get_compression_format(path: str) -> Optional[str]:
+    """
+    按扩展名判断压缩格式，不压缩时返回None
+    """
+    return COMPRESSION_FORMATS.get(os.path.splitext(path)[1].lower())
+
+def split_output_name(output_file: str) -> Tuple[str, str]:
+    """
+    拆分输出文件名，压缩扩展名与前面的扩展名一起保留，如 navdata.sql.gz -> (navdata, .sql.gz)
+    """
+    base_name, extension = os.path.splitext(output_file)
+    if get_compression_format(output_file):
+        base_name, inner_extension = os.path.splitext(base_name)
+        extension = inner_extension + extension
+    return base_name, extension
+
+def _get_compressor(compression: str, level: Optional[int]) -> Callable[[bytes], bytes]:
+    if compression == 'gzip':
+        compresslevel = 6 if level is None else level
+        return lambda data: gzip.compress(data, compresslevel=compresslevel, mtime=0)
+    if compression == 'xz':
+        preset = 6 if level is None else level
+        return lambda data: lzma.compress(data, format=lzma.FORMAT_XZ, preset=preset)
+    raise ValueError(f"不支持的压缩格式: {compression}")
+
+class ParallelCompressedWriter:
+    """
+    文本写入接口与文本文件相同 (write/close，可用作上下文管理器)，写入时不做换行符转换
+    """
+    
+    def __init__(self, path: str, compression: str, threads: int = 0,
+                 level: Optional[int] = None, encoding: str = 'utf-8'):
+        """
+        Args:
+            path: 输出文件路径
+            compression: 压缩格式，gzip 或 xz
+            threads: 压缩线程数，0为CPU核数
+            level: 压缩级别，None为默认 (gzip 6, xz 6)
+            encoding: 文本编码
+        """
+        self.path = path
+        self.encoding = encoding
+        self._compress = _get_compressor(compression, level)
+        self._chunk_size = _CHUNK_SIZES[compression]
+        self._threads = threads if threads > 0 else (os.cpu_count() or 1)
+        self._executor = ThreadPoolExecutor(max_workers=self._threads)
+        # 按顺序等待写入的压缩任务，数量受限以控制内存占用
+        self._pending: Deque = deque()
+        self._buffer: List[str] = []
+        self._buffered = 0
+        # 是否已经提交过块，没有任何内容时也要写出一个空的member/stream，空文件不是合法的压缩文件
+        self._submitted = False
+        self._file = open(path, 'wb')
+        self.closed = False
+    
+    def write(self, text: str) -> int:
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._chunk_size:
+            self._submit_chunk()
+        return len(text)
+    
+    def _submit_chunk(self) -> None:
+        data = ''.join(self._buffer).encode(self.encoding)
+        self._buffer = []
+        self._buffered = 0
+        self._submitted = True
+    
+        # 最多 2倍线程数 的块在压缩中，超过时先按顺序写出最早的块
+        while len(self._pending) >= self._threads * 2:
+            self._file.write(self._pending.popleft().result())
+        self._pending.append(self._executor.submit(self._compress, data))
+    
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer or not self._submitted:
+                self._submit_chunk()
+            while self._pending:
+                self._file.write(self._pending.popleft().result())
+        finally:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._file.close()
+    
+    def __enter__(self) -> 'ParallelCompressedWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+def open_output(path: str, threads: int = 0, encoding: str = 'utf-8', newline: str = None) -> TextIO:
+    """
+    打开文本输出文件，.gz/.xz 结尾时使用多线程压缩写入
+    
+    Args:
+        path: 输出文件路径
+        threads: 压缩线程数，0为CPU核数
+        encoding: 文本编码
+        newline: 不压缩时传给open的换行符参数
+    
+    Returns:
+        TextIO: 支持write的文件对象
+    """
+    compression = get_compression_format(path)
+    if compression is None:
+        return open(path, 'w', encoding=encoding, newline=newline)
+    return ParallelCompressedWriter(path, compression, threads, encoding=encoding)
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+AIRAC周期增量SQL
+
+把本次解析的数据与上一周期保存的快照 (SQLite文件) 按各表自然键对比，
+只为变化的记录生成DELETE/UPDATE/INSERT语句，不再每个周期删表重建。
+
+新数据先分批写入快照库的暂存表，对比在SQLite中以行哈希连接完成，
+内存占用与数据量无关。SQL文件写入成功后，暂存表替换为新的快照
+"""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple
+
+try:
+    from .sql_generator import SqlGenerator
+    from .sql_schemas import NATURAL_KEYS, get_table_columns
+except ImportError:
+    from sql_generator import SqlGenerator
+    from sql_schemas import NATURAL_KEYS, get_table_columns
+
+# 暂存新数据时每批写入的记录数
+_STAGE_BATCH_SIZE = 10000
+
+# 每条DELETE语句最多包含的自然键数
+_DELETE_BATCH_SIZE = 500
+
+_DECIMAL_TYPE = re.compile(r'DECIMAL\(\d+,\s*(\d+)\)', re.IGNORECASE)
+
+def _encode(values: Sequence[Any]) -> str:
+    return json.dumps(values, ensure_ascii=False, separators=(',', ':'))
+
+class SnapshotStore:
+    """
+    上一周期数据的快照
+    
+    每张表一个 snap_<表名> 表: (自然键, 同键序号, 源文件中的顺序, 行哈希, 整行JSON)
+    
+    数据库中无法区分自然键相同的多行，快照中重复的自然键只要有记录被删除或修改，
+    就按键整体替换: 删除该键的全部行，再按顺序插入本次的全部行
+    """
+    
+    def __init__(self, snapshot_file: str):
+        self.snapshot_file = snapshot_file
+        self.logger = logging.getLogger(self.__class__.__name__)
+    
+        snapshot_dir = os.path.dirname(snapshot_file)
+        if snapshot_dir and not os.path.exists(snapshot_dir):
+            os.makedirs(snapshot_dir)
+    
+        # 手动管理事务，建表和替换表也在事务中完成
+        self.connection = sqlite3.connect(snapshot_file, isolation_level=None)
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.execute("PRAGMA temp_store = FILE")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS snapshot_info ("
+            "table_name TEXT PRIMARY KEY, record_count INTEGER, updated_at TEXT)")
+    
+    def close(self) -> None:
+        self.connection.close()
+    
+    def _create_rows_table(self, name: str) -> None:
+        self.connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} ("
+            "base_key TEXT NOT NULL, ordinal INTEGER NOT NULL, seq INTEGER NOT NULL, "
+            "row_hash BLOB NOT NULL, row TEXT NOT NULL, "
+            "PRIMARY KEY (base_key, ordinal)) WITHOUT ROWID")
+    
+    def get_record_count(self, table_name: str) -> int:
+        row = self.connection.execute(
+            "SELECT record_count FROM snapshot_info WHERE table_name = ?", (table_name,)).fetchone()
+        return row[0] if row else 0
+    
+    def stage(self, table_name: str, records: Iterable[tuple]) -> int:
+        """
+        把本次的数据写入暂存表 new_<表名>，同一自然键按出现顺序编号
+    
+        Args:
+            table_name: 表名
+            records: 数据记录迭代器
+    
+        Returns:
+            int: 记录数
+        """
+        columns = [name for name, _ in get_table_columns(table_name)]
+        key_positions = [columns.index(name) for name in NATURAL_KEYS[table_name]]
+        connection = self.connection
+    
+        connection.execute("DROP TABLE IF EXISTS temp.incoming")
+        connection.execute(
+            "CREATE TEMP TABLE incoming ("
+            "seq INTEGER PRIMARY KEY, base_key TEXT, row_hash BLOB, row TEXT)")
+    
+        def iter_rows() -> Iterator[tuple]:
+            for seq, record in enumerate(records):
+                if isinstance(record, dict):
+                    record = [record.get(name) for name in columns]
+                row = _encode(record)
+                yield (seq, _encode([record[i] for i in key_positions]),
+                       hashlib.blake2b(row.encode('utf-8'), digest_size=8).digest(), row)
+    
+        count = 0
+        rows = iter_rows()
+        connection.execute("BEGIN")
+        try:
+            while True:
+                batch = list(islice(rows, _STAGE_BATCH_SIZE))
+                if not batch:
+                    break
+                connection.executemany("INSERT INTO incoming VALUES (?, ?, ?, ?)", batch)
+                count += len(batch)
+    
+            # 同一自然键按源文件中的顺序编号，作为键的一部分
+            connection.execute(f"DROP TABLE IF EXISTS new_{table_name}")
+            self._create_rows_table(f"new_{table_name}")
+            connection.execute(
+                f"INSERT INTO new_{table_name} "
+                "SELECT base_key, ROW_NUMBER() OVER (PARTITION BY base_key ORDER BY seq) - 1, "
+                "seq, row_hash, row FROM incoming")
+            connection.execute("DROP TABLE temp.incoming")
+            # 第一次运行时快照为空，所有记录都作为新增
+            self._create_rows_table(f"snap_{table_name}")
+    
+            # 需要整体替换的重复自然键 (快照中存在序号大于0的行)
+            connection.execute("DROP TABLE IF EXISTS temp.replaced_keys")
+            connection.execute(
+                "CREATE TEMP TABLE replaced_keys (base_key TEXT PRIMARY KEY) WITHOUT ROWID")
+            connection.execute(
+                "INSERT INTO replaced_keys SELECT DISTINCT o.base_key "
+                f"FROM snap_{table_name} o LEFT JOIN new_{table_name} n USING (base_key, ordinal) "
+                "WHERE (n.base_key IS NULL OR n.row_hash != o.row_hash) "
+                f"AND EXISTS (SELECT 1 FROM snap_{table_name} d "
+                "WHERE d.base_key = o.base_key AND d.ordinal > 0)")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    
+        return count
+    
+    def iter_deletes(self, table_name: str) -> Iterator[Tuple[list, int]]:
+        """
+        需要删除的自然键: 快照中有、本次没有的记录，以及整体替换的重复自然键
+    
+        Returns:
+            Iterator[Tuple]: (自然键的值, 删除的行数)
+        """
+        cursor = self.connection.execute(
+            f"SELECT o.base_key, COUNT(*) FROM snap_{table_name} o "
+            "WHERE o.base_key IN (SELECT base_key FROM temp.replaced_keys) "
+            f"OR NOT EXISTS (SELECT 1 FROM new_{table_name} n "
+            "WHERE n.base_key = o.base_key AND n.ordinal = o.ordinal) "
+            "GROUP BY o.base_key ORDER BY MIN(o.seq)")
+        for base_key, count in cursor:
+            yield json.loads(base_key), count
+    
+    def iter_updates(self, table_name: str) -> Iterator[Tuple[list, list]]:
+        """
+        自然键相同但内容不同的记录，不含整体替换的重复自然键
+    
+        Returns:
+            Iterator[Tuple]: (旧记录的值, 新记录的值)
+        """
+        cursor = self.connection.execute(
+            f"SELECT o.row, n.row FROM new_{table_name} n JOIN snap_{table_name} o USING (base_key, ordinal) "
+            "WHERE o.row_hash != n.row_hash "
+            "AND n.base_key NOT IN (SELECT base_key FROM temp.replaced_keys) ORDER BY n.seq")
+        for old_row, new_row in cursor:
+            yield json.loads(old_row), json.loads(new_row)
+    
+    def iter_inserts(self, table_name: str) -> Iterator[list]:
+        """
+        本次新增的记录和整体替换的重复自然键的全部记录，按源文件中的顺序
+        """
+        cursor = self.connection.execute(
+            f"SELECT n.row FROM new_{table_name} n LEFT JOIN snap_{table_name} o USING (base_key, ordinal) "
+            "WHERE o.base_key IS NULL "
+            "OR n.base_key IN (SELECT base_key FROM temp.replaced_keys) ORDER BY n.seq")
+        for (row,) in cursor:
+            yield json.loads(row)
+    
+    def commit(self, record_counts: Dict[str, int], updated_at: str) -> None:
+        """
+        用暂存表替换各表的快照
+    
+        Args:
+            record_counts: 表名 -> 记录数，只替换其中的表
+            updated_at: 快照时间
+        """
+        connection = self.connection
+        connection.execute("BEGIN")
+        try:
+            for table_name, count in record_counts.items():
+                connection.execute(f"DROP TABLE snap_{table_name}")
+                connection.execute(f"ALTER TABLE new_{table_name} RENAME TO snap_{table_name}")
+                connection.execute("INSERT OR REPLACE INTO snapshot_info VALUES (?, ?, ?)",
+                                   (table_name, count, updated_at))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    
+        self.logger.info(f"快照已更新: {self.snapshot_file}")
+
+class DeltaSqlGenerator(SqlGenerator):
+    """
+    生成相对于上一周期快照的增量SQL
+    """
+    
+    def __init__(self, output_file: str, snapshot_file: str, **options):
+        """
+        Args:
+            output_file: 增量SQL文件路径
+            snapshot_file: 快照文件路径
+            options: 传给 SqlGenerator 的选项 (batch_size, max_statement_bytes, compression_threads)
+        """
+        super().__init__(output_file, **options)
+        self.snapshot_file = snapshot_file
+        # 表名 -> {'delete': n, 'update': n, 'insert': n}
+        self.delta_counts: Dict[str, Dict[str, int]] = {}
+    
+    def generate_complete_sql(self, data_dict: Dict[str, Iterable[tuple]]) -> None:
+        """
+        生成增量SQL文件，写入成功后更新快照
+    
+        Args:
+            data_dict: 包含所有表数据的字典，值可以是列表或记录迭代器
+        """
+        store = SnapshotStore(self.snapshot_file)
+        try:
+            with self._open_output(self.output_file) as f:
+                self._write_header(f)
+                f.write(f"-- 增量更新，对比快照: {os.path.basename(self.snapshot_file)}\n")
+                f.write("START TRANSACTION;\n\n")
+                self._write_delta(f, data_dict, store)
+                f.write("COMMIT;\n\n")
+                self._write_footer(f)
+    
+            store.commit({table_name: self.record_counts[table_name] for table_name in self.delta_counts},
+                         datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        finally:
+            store.close()
+    
+        self.logger.info(f"增量SQL文件生成完成: {self.output_file}")
+    
+    def _write_delta(self, f: TextIO, data_dict: Dict[str, Iterable[tuple]], store: SnapshotStore) -> None:
+        for table_name in self.table_order:
+            if table_name not in data_dict:
+                continue
+    
+            # 暂存失败 (如解析出错) 时不输出该表的任何语句，快照也保持不变
+            try:
+                self.record_counts[table_name] = store.stage(table_name, data_dict[table_name])
+            except Exception as e:
+                self.logger.error(f"暂存 {table_name} 表数据失败，跳过该表的增量: {e}")
+                self.record_counts.setdefault(table_name, 0)
+                continue
+    
+            if not store.get_record_count(table_name):
+                self.logger.info(f"快照中没有 {table_name} 表的数据，所有记录作为新增")
+            self.delta_counts[table_name] = self._write_table_delta(f, table_name, store)
+    
+    def _write_table_delta(self, f: TextIO, table_name: str, store: SnapshotStore) -> Dict[str, int]:
+        """
+        写入单个表的增量语句，顺序为删除、更新、新增，避免唯一键冲突
+    
+        Args:
+            f: 文件对象
+            table_name: 表名
+            store: 快照
+    
+        Returns:
+            Dict[str, int]: 删除、更新、新增的记录数
+        """
+        table_columns = get_table_columns(table_name)
+        columns = [name for name, _ in table_columns]
+        key_columns = NATURAL_KEYS[table_name]
+        key_positions = [columns.index(name) for name in key_columns]
+        key_formatters = self._get_key_formatters(dict(table_columns), key_columns)
+        format_value = self._format_sql_value
+        counts = {'delete': 0, 'update': 0, 'insert': 0}
+    
+        f.write(f"-- {table_name.upper()} 表增量\n")
+    
+        deleted_keys = store.iter_deletes(table_name)
+        while True:
+            batch = list(islice(deleted_keys, _DELETE_BATCH_SIZE))
+            if not batch:
+                break
+            self._write_deletes(f, table_name, key_columns, key_formatters, [key for key, _ in batch])
+            counts['delete'] += sum(count for _, count in batch)
+    
+        for old_values, new_values in store.iter_updates(table_name):
+            assignments = ', '.join(f"{name} = {format_value(new)}"
+                                    for name, old, new in zip(columns, old_values, new_values)
+                                    if old != new)
+            where = self._format_key_condition(key_columns, key_formatters,
+                                               [old_values[i] for i in key_positions])
+            f.write(f"UPDATE {table_name} SET {assignments} WHERE {where};\n")
+            counts['update'] += 1
+    
+        if counts['delete'] or counts['update']:
+            f.write("\n")
+    
+        counts['insert'] = self._write_insert_statements(f, table_name, columns,
+                                                         store.iter_inserts(table_name))
+    
+        f.write(f"-- {table_name.upper()} 表增量: 删除 {counts['delete']} 条, "
+                f"更新 {counts['update']} 条, 新增 {counts['insert']} 条\n\n")
+        self.logger.info(f"{table_name} 表增量: 删除 {counts['delete']} 条, "
+                         f"更新 {counts['update']} 条, 新增 {counts['insert']} 条")
+        return counts
+    
+    def _get_key_formatters(self, column_types: Dict[str, str],
+                            key_columns: Sequence[str]) -> List[Callable[[Any], str]]:
+        """
+        自然键各列的SQL值格式化函数
+    
+        DECIMAL列按列的小数位数输出定点数，与库中存储的值精确比较，不依赖浮点数的表示
+        """
+        formatters = []
+        for name in key_columns:
+            match = _DECIMAL_TYPE.match(column_types[name])
+            if match:
+                scale = int(match.group(1))
+                formatters.append(lambda value, scale=scale: f"{float(value):.{scale}f}")
+            else:
+                formatters.append(self._format_sql_value)
+        return formatters
+    
+    def _format_key_condition(self, key_columns: Sequence[str], key_formatters: Sequence[Callable[[Any], str]],
+                              key_values: Sequence[Any]) -> str:
+        """
+        按自然键定位一条记录的条件
+        """
+        return ' AND '.join(f"{name} IS NULL" if value is None else f"{name} = {format_value(value)}"
+                            for name, format_value, value in zip(key_columns, key_formatters, key_values))
+    
+    def _write_deletes(self, f: TextIO, table_name: str, key_columns: Sequence[str],
+                       key_formatters: Sequence[Callable[[Any], str]], keys: List[list]) -> None:
+        """
+        按自然键批量删除: 单列键为 key IN (...)，多列键为 (k1, k2) IN ((...), ...)
+    
+        含NULL的键无法用IN匹配，逐条按 IS NULL 条件删除
+        """
+        tuples = []
+        for key_values in keys:
+            if None in key_values:
+                where = self._format_key_condition(key_columns, key_formatters, key_values)
+                f.write(f"DELETE FROM {table_name} WHERE {where};\n")
+            else:
+                values = ', '.join(format_value(value) for format_value, value in zip(key_formatters, key_values))
+                tuples.append(values if len(key_columns) == 1 else f"({values})")
+    
+        if tuples:
+            names = key_columns[0] if len(key_columns) == 1 else f"({', '.join(key_columns)})"
+            f.write(f"DELETE FROM {table_name} WHERE {names} IN ({', '.join(tuples)});\n")
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+MySQL LOAD DATA 导出
+
+每张表写一个制表符分隔的数据文件 (<输出文件名>_<表名>.tsv)，转义规则与
+LOAD DATA 默认的 FIELDS ESCAPED BY '\\' 一致，NULL写为 \\N，字段顺序与建表语句相同。
+输出文件本身是控制脚本: 建表后对每个数据文件执行 LOAD DATA LOCAL INFILE
+"""
+
+import os
+from typing import Any, Dict, Iterable, TextIO
+
+try:
+    from .sql_generator import SqlGenerator
+    from .sql_schemas import get_column_definitions
+except ImportError:
+    from sql_generator import SqlGenerator
+    from sql_schemas import get_column_definitions
+
+# LOAD DATA 默认转义: 反斜杠、制表符、换行、回车、NUL和Ctrl+Z
+_ESCAPE_TABLE = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': '\\0',
+    '\x1a': '\\Z',
+})
+
+def format_tsv_value(value: Any) -> str:
+    """
+    格式化LOAD DATA数据文件中的一个字段
+    
+    Args:
+        value: 原始值
+    
+    Returns:
+        str: 转义后的字段文本
+    """
+    if value is None:
+        return '\\N'
+    elif isinstance(value, bool):
+        return '1' if value else '0'
+    elif isinstance(value, (int, float)):
+        return str(value)
+    return str(value).translate(_ESCAPE_TABLE)
+
+class LoadDataGenerator(SqlGenerator):
+    """
+    生成LOAD DATA数据文件和控制脚本
+    """
+    
+    def generate_complete_sql(self, data_dict: Dict[str, Iterable[tuple]]) -> None:
+        """
+        写入各表的数据文件和控制脚本
+    
+        Args:
+            data_dict: 包含所有表数据的字典，值可以是列表或记录迭代器
+        """
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            self._write_header(f)
+            f.write("-- 数据文件与本脚本在同一目录，请在该目录中运行:\n")
+            f.write("--   mysql --local-infile=1 <数据库名> < "
+                    f"{os.path.basename(self.output_file)}\n\n")
+            self._write_schema(f)
+    
+            f.write("-- =====================================================\n")
+            f.write("-- 数据导入\n")
+            f.write("-- =====================================================\n\n")
+    
+            for table_name in self.table_order:
+                if table_name not in data_dict:
+                    continue
+    
+                # 迭代器在写入时才真正解析数据，单表失败不影响其他表
+                data_file = self.get_data_file(table_name)
+                try:
+                    self.record_counts[table_name] = self._write_data_file(data_file, table_name,
+                                                                           data_dict[table_name])
+                except Exception as e:
+                    self.logger.error(f"写入 {table_name} 表数据失败: {e}")
+                    self.record_counts.setdefault(table_name, 0)
+                    continue
+    
+                self._write_load_statement(f, table_name, data_file)
+    
+            self._write_footer(f)
+    
+        self.logger.info(f"LOAD DATA控制脚本生成完成: {self.output_file}")
+    
+    def get_data_file(self, table_name: str) -> str:
+        base_name = os.path.splitext(self.output_file)[0]
+        return f"{base_name}_{table_name}.tsv"
+    
+    def _write_data_file(self, data_file: str, table_name: str, records: Iterable[tuple]) -> int:
+        """
+        写入单个表的数据文件
+    
+        Args:
+            data_file: 数据文件路径
+            table_name: 表名
+            records: 数据记录列表或迭代器，记录字段顺序与建表语句一致，也兼容dict
+    
+        Returns:
+            int: 写入的记录数
+        """
+        column_names = [name for name, _ in get_column_definitions(table_name)]
+    
+        # 不做换行符转换，行尾固定为 \n
+        with open(data_file, 'w', encoding='utf-8', newline='') as f:
+            record_count = self._write_delimited_rows(f, column_names, records, format_tsv_value)
+    
+        self.logger.info(f"写入 {table_name} 表数据文件: {record_count} 条记录")
+        return record_count
+    
+    def _write_load_statement(self, f: TextIO, table_name: str, data_file: str) -> None:
+        """
+        写入单个表的LOAD DATA语句，数据文件使用相对于脚本的文件名
+        """
+        column_names = [name for name, _ in get_column_definitions(table_name)]
+        file_name = self._format_sql_value(os.path.basename(data_file))
+    
+        f.write(f"-- {table_name.upper()} 表数据共 {self.record_counts[table_name]} 条记录\n")
+        f.write(f"LOAD DATA LOCAL INFILE {file_name}\n")
+        f.write(f"INTO TABLE {table_name}\n")
+        f.write("CHARACTER SET utf8mb4\n")
+        f.write("FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'\n")
+        f.write("LINES TERMINATED BY '\\n'\n")
+        f.write(f"({', '.join(column_names)});\n\n")
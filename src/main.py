@@ -3,9 +3,19 @@
 """
 选项:
     -s, --source DIR     源数据目录路径 (默认: ../source)
-    -o, --output FILE    输出SQL文件路径 (默认: ../output/navdata.sql)
+    -o, --output FILE    输出SQL文件路径，.gz/.xz 结尾时压缩输出 (默认: ../output/navdata.sql)
     -t, --tables LIST   指定要处理的表 (逗号分隔, 默认: 全部)
     -v, --verbose        详细输出模式
+    -j, --processes N    并行解析的进程数 (0为CPU核数, 1为串行)
+    --columnar           并行解析时使用NumPy列式表保存各表数据
+    --no-cache           不使用解析结果缓存，重新解析所有数据
+    --delta SNAPSHOT     增量模式: 与快照对比，只输出变化记录的DELETE/UPDATE/INSERT
+    --changed-airports-only  只输出CIFP中新增、变化或已删除机场的终端程序SQL
+    -f, --format FORMAT  输出格式: mysql (SQL文件)、loaddata (LOAD DATA数据文件和控制脚本)、
+                         postgresql (COPY导入脚本) 或 sqlite (SQLite数据库文件)
+    --import-optimized   mysql输出先建不带索引的表、分批提交，数据导入后再添加索引
+    --separate-files     mysql输出按表分片，附带清单和并行导入脚本
+    --profile            按表输出cProfile统计和tracemalloc分配位置到 <输出文件名>_profile/
     -h, --help          显示帮助信息
 """
 
@@ -13,143 +23,707 @@ import os
 import sys
 import argparse
 import logging
-from typing import Dict, List, Any
+import time
+import multiprocessing
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
 from datetime import datetime
 
-# 添加src目录到Python路径
+# 添加src目录到Python路径，项目根目录用于加载config.py
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from parsers import (
     AirportParser, AirwayParser, WaypointParser, HoldingParser,
-    NavaidParser, MoraParser, MsaParser, TerminalParser
+    NavaidParser, MoraParser, MsaParser, TerminalParser,
+    RunwayParser, FrequencyParser, GateParser, AirportFacilityParser,
+    collect_diagnostics, get_diagnostics
 )
+from record_types import RECORD_TYPES
 from sql_generator import SqlGenerator
+from delta_generator import DeltaSqlGenerator
+from sqlite_generator import SqliteGenerator
+from load_data_generator import LoadDataGenerator
+from postgres_generator import PostgresGenerator
+from sharded_generator import ShardedSqlGenerator, get_manifest_file
+from parse_cache import ParseCache
+from compressed_output import get_compression_format, split_output_name
+from metrics import ConversionMetrics, ProgressDisplay, TimedRecords, get_metrics, get_peak_rss_mb, reset_metrics
+from profiling import ConversionProfiler
+from spill_buffer import SpillBuffer
 
-class XPlaneConverter:
+# 表名 -> (解析器类, 相对于源目录的数据文件或CIFP目录)
+TABLE_SOURCES = {
+    'airports': (AirportParser, 'earth_aptmeta.dat'),
+    'airways': (AirwayParser, 'earth_awy.dat'),
+    'waypoints': (WaypointParser, 'earth_fix.dat'),
+    'holdings': (HoldingParser, 'earth_hold.dat'),
+    'navaids': (NavaidParser, 'earth_nav.dat'),
+    'mora': (MoraParser, 'earth_mora.dat'),
+    'msa': (MsaParser, 'earth_msa.dat'),
+    'terminal_procedures': (TerminalParser, 'CIFP'),
+    'runways': (RunwayParser, 'earth_apt.dat'),
+    'frequencies': (FrequencyParser, 'earth_apt.dat'),
+    'gates': (GateParser, 'earth_apt.dat')
+}
+
+# 共用一个源文件的表 -> 一遍解析同时输出这些表的解析器，同时处理其中多张表时只读一遍文件
+SHARED_SOURCE_PARSERS = dict.fromkeys(AirportFacilityParser.get_table_names(), AirportFacilityParser)
+
+def load_config(section: str) -> Dict[str, Any]:
+    """
+    读取项目根目录config.py中的配置段，没有config.py时返回空字典
+    """
+    try:
+        import config
+    except ImportError:
+        return {}
+    return dict(getattr(config, section, {}))
+
+# 主进程中的日志监听线程及其队列，子进程的日志也通过该队列写出
+_log_listener = None
+_log_queue = None
+
+def setup_logging(verbose: bool = False, log_queue=None) -> None:
+    """
+    配置日志: 各进程只把日志记录放入队列，由主进程的监听线程统一写到控制台和日志文件，
+    解析过程中不做同步的文件写入
+    
+    Args:
+        verbose: 是否输出DEBUG日志
+        log_queue: 子进程使用，为主进程创建的日志队列
+    """
+    global _log_listener, _log_queue
+    root = logging.getLogger()
+    # fork出的子进程继承了父进程的配置，重复调用也不再添加
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
+    
+    if log_queue is None:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handlers = [
+            logging.StreamHandler(sys.stdout),
+            logging.FileHandler('conversion.log', encoding='utf-8')
+        ]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+    
+        _log_queue = log_queue = multiprocessing.Queue(-1)
+        _log_listener = QueueListener(_log_queue, *handlers)
+        _log_listener.start()
+    
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+def stop_logging() -> None:
+    """
+    写出队列中剩余的日志并停止监听线程
+    """
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+def create_parser(source_dir: str, table_name: str, workers: int = 1,
+                  cache: ParseCache = None, changed_only: bool = False):
+    parser_class, source_name = TABLE_SOURCES[table_name]
+    source_path = os.path.join(source_dir, source_name)
+    if parser_class is TerminalParser and cache is not None:
+        # CIFP使用按机场的清单，只重新解析变化的机场
+        return parser_class(source_path, workers=workers, changed_only=changed_only,
+                            manifest=cache.get_cifp_manifest(source_path, parser_class))
+    # 逐行格式的大文件分块并行解析，CIFP按机场文件并行解析
+    return parser_class(source_path, workers=workers)
+
+def get_source_path(source_dir: str, table_name: str) -> str:
+    return os.path.join(source_dir, TABLE_SOURCES[table_name][1])
+
+def get_source_size(source_dir: str, table_name: str) -> int:
+    """
+    获取表对应源数据的字节数，CIFP目录按其中所有文件的总大小计算
+    """
+    path = get_source_path(source_dir, table_name)
+    if os.path.isdir(path):
+        with os.scandir(path) as entries:
+            return sum(entry.stat().st_size for entry in entries if entry.is_file())
+    if os.path.exists(path):
+        return os.path.getsize(path)
+    return 0
+
+def iter_table_records(source_dir: str, table_name: str, workers: int = 1,
+                       cache: ParseCache = None, shared: 'SharedSourceParse' = None) -> Iterator[tuple]:
+    """
+    获取一张表的记录迭代器，指定缓存时源文件未变化则直接读取缓存，否则边解析边写入缓存
+    
+    Args:
+        source_dir: 源数据目录
+        table_name: 表名
+        workers: 解析进程数
+        cache: 解析结果缓存，None为不使用缓存
+        shared: 与其他表共用源文件时的一遍解析，None为单独解析该表
+    
+    Returns:
+        Iterator[tuple]: 数据记录迭代器
+    """
+    if shared is not None:
+        parser_class = TABLE_SOURCES[table_name][0]
+        parse = lambda: shared.iter_records(table_name)
+    else:
+        # 源文件不存在时在这里抛出异常，而不是在开始读取记录时
+        parser = create_parser(source_dir, table_name, workers, cache)
+        parser_class, parse = type(parser), parser.iter_records
+    # CIFP由按机场的清单缓存，不另存整表的解析结果
+    if cache is None or parser_class is TerminalParser:
+        return parse()
+    return cache.iter_records(table_name, get_source_path(source_dir, table_name), parser_class, parse)
+
+def is_table_cached(source_dir: str, table_name: str, cache: ParseCache = None) -> bool:
+    """
+    缓存中是否有该表当前源数据的解析结果，CIFP为清单中所有机场都未变化
+    """
+    if cache is None:
+        return False
+    parser_class = TABLE_SOURCES[table_name][0]
+    if parser_class is TerminalParser:
+        parser = create_parser(source_dir, table_name, cache=cache)
+        try:
+            return not parser.get_airport_changes()[0]
+        finally:
+            parser.manifest.close()
+    return cache.lookup(table_name, get_source_path(source_dir, table_name), parser_class) is not None
+
+def group_shared_tables(tables: List[str]) -> List[List[str]]:
+    """
+    把共用源文件的表 (见 SHARED_SOURCE_PARSERS) 分为一组，其余每张表单独一组，组按第一张表的顺序排列
+    """
+    groups = []
+    shared_groups: Dict[type, List[str]] = {}
+    for table_name in tables:
+        parser_class = SHARED_SOURCE_PARSERS.get(table_name)
+        if parser_class is None:
+            groups.append([table_name])
+        elif parser_class in shared_groups:
+            shared_groups[parser_class].append(table_name)
+        else:
+            shared_groups[parser_class] = [table_name]
+            groups.append(shared_groups[parser_class])
+    return groups
+
+class SharedSourceParse:
+    """
+    共用一个源文件的多张表 (earth_apt.dat 的跑道、频率和停机位) 只解析一遍
+    
+    第一次读取任一张表时完整解析，记录按类型分到各表的缓冲区，之后各表从缓冲区读取；
+    指定memory_limit (字节) 时缓冲的记录超过预算的部分写到spill_dir中的临时文件
+    """
+    
+    def __init__(self, source_dir: str, table_names: List[str], workers: int = 1,
+                 memory_limit: int = 0, spill_dir: str = None):
+        parser_class = SHARED_SOURCE_PARSERS[table_names[0]]
+        # 源文件不存在时在这里抛出异常，而不是在开始读取记录时
+        self.parser = parser_class(get_source_path(source_dir, table_names[0]), workers=workers)
+        self.table_names = list(table_names)
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self._buffers: Optional[Dict[str, Iterable[tuple]]] = None
+        # 解析失败时各表读取时都抛出同一个异常，不重复解析
+        self._error: Optional[Exception] = None
+    
+    def take(self, table_name: str) -> Iterable[tuple]:
+        """
+        取出一张表的缓冲区 (记录列表或SpillBuffer)，第一次调用时解析源文件
+        """
+        if self._error is not None:
+            raise self._error
+        if self._buffers is None:
+            try:
+                self._buffers = self._parse()
+            except Exception as e:
+                self._error = e
+                raise
+        return self._buffers.pop(table_name)
+    
+    def iter_records(self, table_name: str) -> Iterator[tuple]:
+        records = self.take(table_name)
+        try:
+            yield from records
+        finally:
+            if isinstance(records, SpillBuffer):
+                records.close()
+    
+    def _parse(self) -> Dict[str, Iterable[tuple]]:
+        if self.memory_limit > 0:
+            table_limit = max(self.memory_limit // len(self.table_names), 1)
+            buffers = {table_name: SpillBuffer(table_limit, self.spill_dir, table_name)
+                       for table_name in self.table_names}
+        else:
+            buffers = {table_name: [] for table_name in self.table_names}
+    
+        # 记录类型 -> 所属表缓冲区的append，不需要的表的记录直接丢弃
+        appenders = {RECORD_TYPES[table_name]: buffer.append for table_name, buffer in buffers.items()}
+        try:
+            for record in self.parser.iter_records():
+                append = appenders.get(type(record))
+                if append is not None:
+                    append(record)
+        except BaseException:
+            self._close_buffers(buffers.values())
+            raise
+    
+        for buffer in buffers.values():
+            if isinstance(buffer, SpillBuffer):
+                buffer.flush()
+        return buffers
+    
+    def close(self) -> None:
+        """
+        释放还没有读取的缓冲区，删除其临时文件
+        """
+        if self._buffers:
+            self._close_buffers(self._buffers.values())
+            self._buffers.clear()
+    
+    @staticmethod
+    def _close_buffers(buffers: Iterable[Iterable[tuple]]) -> None:
+        for buffer in buffers:
+            if isinstance(buffer, SpillBuffer):
+                buffer.close()
+
+class TableParseError(Exception):
+    """
+    单表的源数据缺失或解析失败
+    """
+
+def _iter_failed_table(table_name: str, error: Exception) -> Iterator[tuple]:
+    """
+    解析失败的表: 读取时抛出 TableParseError，由SQL生成器跳过该表，
+    不会当作空表写出，增量模式下该表的快照也保持不变
+    """
+    raise TableParseError(f"解析 {table_name} 数据失败: {error}") from error
+    yield
+
+def _parse_table_job(source_dir: str, table_names: List[str], workers: int,
+                     columnar: bool = False, cache: ParseCache = None, memory_limit: int = 0,
+                     spill_dir: str = None) -> Tuple[Dict[str, Iterable[tuple]], Dict[str, Any]]:
+    """
+    进程池任务: 在子进程中完整解析一张表，或一遍解析共用源文件的一组表，结果通过pickle传回主进程
+    
+    columnar为True时返回列式表，传回主进程的数据量和主进程的内存占用都小得多；
+    指定memory_limit (字节) 时缓冲的记录超过预算的部分写到spill_dir中的临时文件，只传回文件路径
+    
+    Returns:
+        Tuple: (表名 -> 记录列表、列式表或SpillBuffer,
+                本任务的性能指标: 各表耗时、子进程峰值内存和CIFP各机场的耗时)
+    """
+    # fork出的子进程会继承父进程已有的机场耗时，先清空
+    get_metrics().drain_airports()
+    shared = None
+    if len(table_names) > 1:
+        shared = SharedSourceParse(source_dir, table_names, workers, memory_limit, spill_dir)
     
-    def __init__(self, source_dir: str, output_file: str, verbose: bool = False):
+    results = {}
+    seconds = {}
+    try:
+        for table_name in table_names:
+            # 一遍解析的耗时计入第一张表
+            start_time = time.perf_counter()
+            if shared is not None and cache is None and not columnar:
+                # 一遍解析的缓冲区直接传回
+                records = shared.take(table_name)
+            else:
+                records = iter_table_records(source_dir, table_name, workers, cache, shared)
+                if columnar:
+                    from columnar_table import ColumnarTable
+                    records = ColumnarTable.from_records(table_name, records)
+                elif memory_limit > 0:
+                    records = SpillBuffer.from_records(records, memory_limit, spill_dir, table_name)
+                else:
+                    records = list(records)
+            results[table_name] = records
+            seconds[table_name] = time.perf_counter() - start_time
+    except BaseException:
+        for records in results.values():
+            if isinstance(records, SpillBuffer):
+                records.close()
+        if shared is not None:
+            shared.close()
+        raise
+    
+    job_metrics = {
+        'seconds': seconds,
+        'peak_rss_mb': get_peak_rss_mb(),
+        'airports': get_metrics().drain_airports(),
+    }
+    return results, job_metrics
+
+class XPlaneConverter:
+
+    def __init__(self, source_dir: str, output_file: str, verbose: bool = False,
+                 process_count: int = 1, columnar: bool = False, cache: ParseCache = None,
+                 delta_snapshot: str = None, output_format: str = 'mysql',
+                 import_optimized: bool = False, commit_every: int = 10, separate_files: bool = False,
+                 profile: bool = False):
         self.source_dir = source_dir
         self.output_file = output_file
         self.verbose = verbose
-        
+        # 进程数，大于1时各表在进程池中并行解析
+        self.process_count = process_count
+        # 并行解析时子进程是否以列式表返回结果
+        self.columnar = columnar
+        # 解析结果缓存，None为不使用
+        self.cache = cache
+        # 增量模式的快照文件，None为输出完整SQL
+        self.delta_snapshot = delta_snapshot
+        # 输出格式: mysql、loaddata、postgresql 或 sqlite
+        self.output_format = output_format
+        # mysql输出是否使用导入优化 (延后建索引、分批提交)，以及每多少批提交一次
+        self.import_optimized = import_optimized
+        self.commit_every = commit_every
+        # INSERT语句的分批: 每条语句的行数上限和字节预算
+        output_config = load_config('OUTPUT_CONFIG')
+        self.batch_size = output_config.get('batch_size', 1000)
+        self.max_statement_bytes = output_config.get('max_statement_bytes', 1024 * 1024)
+        # 输出文件以 .gz/.xz 结尾时的压缩线程数，0为CPU核数
+        self.compression_threads = output_config.get('compression_threads', 0)
+        # mysql输出是否按表分片，以及每个分片的记录数
+        self.separate_files = separate_files
+        self.shard_rows = output_config.get('shard_rows', 500000)
+        # 性能报告和实时进度显示
+        performance_config = load_config('PERFORMANCE_CONFIG')
+        self.metrics_report = performance_config.get('metrics_report', True)
+        self.show_progress = performance_config.get('show_progress', True)
+        # 并行解析时缓冲记录的内存预算 (MB，0为不限制) 和超出预算时临时文件的目录 (None为系统临时目录)
+        self.memory_limit = performance_config.get('memory_limit', 0) or 0
+        self.spill_directory = performance_config.get('spill_directory')
+        # 并行模式下缓存命中、由主进程直接读取缓存的表
+        self._cached_tables = set()
+        # 并行模式下已合并诊断信息的解析任务，一个任务可能解析多张表
+        self._merged_jobs = set()
+        # 并行模式下提交的解析任务，写出结束后释放其中没有读取的缓冲区
+        self._parse_jobs: List[Future] = []
+    
         # 设置日志
-        self._setup_logging()
-        
+        setup_logging(verbose)
+    
         # 验证源目录
         if not os.path.exists(source_dir):
             raise FileNotFoundError(f"源数据目录不存在: {source_dir}")
-        
+    
         # 确保输出目录存在
         output_dir = os.path.dirname(output_file)
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir)
-        
+    
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logger.info(f"初始化转换器: 源目录={source_dir}, 输出文件={output_file}")
     
-    def _setup_logging(self):
-        level = logging.DEBUG if self.verbose else logging.INFO
-        
-        logging.basicConfig(
-            level=level,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(sys.stdout),
-                logging.FileHandler('conversion.log', encoding='utf-8')
-            ]
-        )
+        # 性能分析: 按表统计，各表需要在主进程中串行解析和写出
+        self.profiler = None
+        if profile:
+            self.profiler = ConversionProfiler(f"{split_output_name(output_file)[0]}_profile")
+            if self.process_count > 1:
+                self.logger.info("性能分析模式下各表串行解析和写出")
+            self.process_count = 1
     
     def convert_all(self, selected_tables: List[str] = None) -> None:
         start_time = datetime.now()
         self.logger.info("开始数据转换...")
-        
-        # 定义所有可用的表和对应的解析器
-        all_tables = {
-            'airports': self._parse_airports,
-            'airways': self._parse_airways,
-            'waypoints': self._parse_waypoints,
-            'holdings': self._parse_holdings,
-            'navaids': self._parse_navaids,
-            'mora': self._parse_mora,
-            'msa': self._parse_msa,
-            'terminal_procedures': self._parse_terminal_procedures
-        }
-        
+        metrics = reset_metrics()
+        progress = ProgressDisplay() if self.show_progress else None
+        if self.profiler is not None:
+            self.profiler.start()
+    
         # 确定要处理的表
         if selected_tables:
-            tables_to_process = {k: v for k, v in all_tables.items() if k in selected_tables}
+            tables_to_process = [t for t in TABLE_SOURCES if t in selected_tables]
         else:
-            tables_to_process = all_tables
-        
-        # 解析数据
-        data_dict = {}
-        for table_name, parser_func in tables_to_process.items():
+            tables_to_process = list(TABLE_SOURCES)
+    
+        sql_generator = self._create_sql_generator()
+    
+        if self.process_count > 1:
+            # 各表在进程池中并行解析，主进程按固定表顺序写入，输出与串行一致
+            workers = min(self.process_count, len(group_shared_tables(tables_to_process))) or 1
+            self.logger.info(f"使用 {workers} 个进程并行解析数据...")
+            with ProcessPoolExecutor(max_workers=workers, initializer=setup_logging,
+                                     initargs=(self.verbose, _log_queue)) as executor:
+                data_dict = self._submit_parse_jobs(executor, tables_to_process)
+                timed_records = self._wrap_timed_records(data_dict, progress)
+                self.logger.info("开始生成SQL文件...")
+                try:
+                    sql_generator.generate_complete_sql(timed_records)
+                finally:
+                    self._close_job_results()
+        else:
+            # 准备解析器，返回的是记录迭代器，实际解析在写入SQL时进行
+            data_dict = {}
+            shared_sources = self._create_shared_sources(tables_to_process)
+            for table_name in tables_to_process:
+                try:
+                    self.logger.info(f"准备解析 {table_name} 数据...")
+                    data_dict[table_name] = iter_table_records(self.source_dir, table_name,
+                                                               self.process_count, self.cache,
+                                                               shared_sources.get(table_name))
+                except Exception as e:
+                    self.logger.error(f"解析 {table_name} 数据失败: {e}")
+                    data_dict[table_name] = _iter_failed_table(table_name, e)
+    
+            # 边解析边生成SQL文件
+            self.logger.info("开始解析数据并生成SQL文件...")
+            timed_records = self._wrap_timed_records(data_dict, progress)
             try:
-                self.logger.info(f"开始解析 {table_name} 数据...")
-                data_dict[table_name] = parser_func()
-                self.logger.info(f"完成解析 {table_name} 数据: {len(data_dict[table_name])} 条记录")
-            except Exception as e:
-                self.logger.error(f"解析 {table_name} 数据失败: {e}")
-                data_dict[table_name] = []
-        
-        # 生成SQL文件
-        self.logger.info("开始生成SQL文件...")
-        sql_generator = SqlGenerator(self.output_file)
-        sql_generator.generate_complete_sql(data_dict)
-        
+                sql_generator.generate_complete_sql(timed_records)
+            finally:
+                for shared in set(shared_sources.values()):
+                    shared.close()
+    
+        if progress is not None:
+            progress.finish()
+        self._record_table_metrics(metrics, timed_records, sql_generator)
+    
         # 输出统计信息
         stats = sql_generator.get_statistics(data_dict)
         self._print_statistics(stats)
-        
+    
+        # 汇总输出解析过程中发现的问题数据
+        get_diagnostics().log_summary(self.logger)
+    
+        if self.cache is not None:
+            self.cache.evict()
+    
         end_time = datetime.now()
         duration = end_time - start_time
+        self._write_metrics_report(metrics, stats, duration.total_seconds())
         self.logger.info(f"数据转换完成，耗时: {duration}")
     
-    def _parse_airports(self) -> List[Dict[str, Any]]:
-        file_path = os.path.join(self.source_dir, 'earth_aptmeta.dat')
-        parser = AirportParser(file_path)
-        return parser.parse()
-    
-    def _parse_airways(self) -> List[Dict[str, Any]]:
-        file_path = os.path.join(self.source_dir, 'earth_awy.dat')
-        parser = AirwayParser(file_path)
-        return parser.parse()
-    
-    def _parse_waypoints(self) -> List[Dict[str, Any]]:
-        file_path = os.path.join(self.source_dir, 'earth_fix.dat')
-        parser = WaypointParser(file_path)
-        return parser.parse()
-    
-    def _parse_holdings(self) -> List[Dict[str, Any]]:
-        file_path = os.path.join(self.source_dir, 'earth_hold.dat')
-        parser = HoldingParser(file_path)
-        return parser.parse()
-    
-    def _parse_navaids(self) -> List[Dict[str, Any]]:
-        file_path = os.path.join(self.source_dir, 'earth_nav.dat')
-        parser = NavaidParser(file_path)
-        return parser.parse()
-    
-    def _parse_mora(self) -> List[Dict[str, Any]]:
-        file_path = os.path.join(self.source_dir, 'earth_mora.dat')
-        parser = MoraParser(file_path)
-        return parser.parse()
-    
-    def _parse_msa(self) -> List[Dict[str, Any]]:
-        file_path = os.path.join(self.source_dir, 'earth_msa.dat')
-        parser = MsaParser(file_path)
-        return parser.parse()
-    
-    def _parse_terminal_procedures(self) -> List[Dict[str, Any]]:
-        cifp_dir = os.path.join(self.source_dir, 'CIFP')
-        parser = TerminalParser(cifp_dir)
-        return parser.parse()
+        if self.profiler is not None:
+            self._profile_parser_memory(tables_to_process)
+    
+    def _profile_parser_memory(self, tables: List[str]) -> None:
+        """
+        转换完成后在内存跟踪下单独运行各解析器 (不使用缓存)，并写出性能分析汇总
+        """
+        self.logger.info("性能分析: 统计各解析器的内存分配...")
+        for table_name in tables:
+            try:
+                self.profiler.profile_memory(
+                    table_name, lambda: create_parser(self.source_dir, table_name).iter_records())
+            except Exception as e:
+                self.logger.error(f"统计 {table_name} 解析器内存失败: {e}")
+        self.profiler.stop()
+    
+    def _wrap_timed_records(self, data_dict: Dict[str, Iterable[tuple]],
+                            progress: ProgressDisplay) -> Dict[str, TimedRecords]:
+        if self.profiler is not None:
+            data_dict = {table_name: self.profiler.profile_records(table_name, records)
+                         for table_name, records in data_dict.items()}
+        return {table_name: TimedRecords(table_name, records, progress)
+                for table_name, records in data_dict.items()}
+    
+    def _record_table_metrics(self, metrics: ConversionMetrics, timed_records: Dict[str, TimedRecords],
+                              sql_generator: SqlGenerator) -> None:
+        """
+        记录各表的读取 (串行模式和缓存命中时即解析) 和SQL生成与写入阶段
+        """
+        parallel = self.process_count > 1
+        for table_name, timed in timed_records.items():
+            if not timed.started:
+                continue
+            if parallel and table_name not in self._cached_tables:
+                # 子进程的解析耗时在 _iter_job_result 中记录，主进程的读取是等待任务完成和接收结果
+                metrics.record_stage('collect', table_name, timed.read_seconds, timed.record_count)
+            else:
+                metrics.record_stage('parse', table_name, timed.read_seconds, timed.record_count,
+                                     get_source_size(self.source_dir, table_name),
+                                     cached=table_name in self._cached_tables or None)
+            metrics.record_stage('render', table_name, timed.span_seconds - timed.read_seconds,
+                                 timed.record_count, sql_generator.output_bytes.get(table_name))
+    
+    def _write_metrics_report(self, metrics: ConversionMetrics, stats: Dict[str, int], seconds: float) -> None:
+        """
+        记录总体阶段并把性能报告写到输出文件旁边 (<输出文件名>_metrics.json)
+        """
+        output_bytes = os.path.getsize(self.output_file) if os.path.isfile(self.output_file) else None
+        metrics.record_stage('total', None, seconds, stats.get('total'), output_bytes)
+        if not self.metrics_report:
+            return
+    
+        report_file = f"{split_output_name(self.output_file)[0]}_metrics.json"
+        try:
+            metrics.write_report(report_file)
+            self.logger.info(f"性能报告已保存到: {report_file}")
+        except OSError as e:
+            self.logger.warning(f"写入性能报告失败: {e}")
+    
+    def _create_sql_generator(self) -> SqlGenerator:
+        if self.delta_snapshot:
+            self.logger.info(f"增量模式，对比快照: {self.delta_snapshot}")
+            return DeltaSqlGenerator(self.output_file, self.delta_snapshot,
+                                     batch_size=self.batch_size, max_statement_bytes=self.max_statement_bytes,
+                                     compression_threads=self.compression_threads)
+        if self.output_format == 'sqlite':
+            return SqliteGenerator(self.output_file)
+        if self.output_format == 'loaddata':
+            return LoadDataGenerator(self.output_file)
+        if self.output_format == 'postgresql':
+            return PostgresGenerator(self.output_file, compression_threads=self.compression_threads)
+        if self.separate_files:
+            return ShardedSqlGenerator(self.output_file, self.shard_rows,
+                                       batch_size=self.batch_size, max_statement_bytes=self.max_statement_bytes,
+                                       compression_threads=self.compression_threads)
+        return SqlGenerator(self.output_file, self.import_optimized, self.commit_every,
+                            self.batch_size, self.max_statement_bytes, self.compression_threads)
+    
+    def convert_changed_airports(self) -> None:
+        """
+        只为CIFP中新增、变化或已删除的机场生成终端程序SQL，需要启用缓存 (清单保存在缓存目录)
+        """
+        if self.cache is None:
+            raise ValueError("只输出变化的机场需要启用解析结果缓存")
+    
+        start_time = datetime.now()
+        parser = create_parser(self.source_dir, 'terminal_procedures', self.process_count,
+                               self.cache, changed_only=True)
+        changed, removed = parser.get_airport_changes()
+        if removed:
+            self.logger.info(f"已删除的机场: {', '.join(removed)}")
+    
+        sql_generator = SqlGenerator(self.output_file, batch_size=self.batch_size,
+                                     max_statement_bytes=self.max_statement_bytes,
+                                     compression_threads=self.compression_threads)
+        records = parser.iter_records()
+        if self.profiler is not None:
+            self.profiler.start()
+            records = self.profiler.profile_records('terminal_procedures', records)
+        # 先解析完所有变化的机场并写入清单，再生成SQL: 解析失败的机场不删除，数据库中保留其原有记录
+        for _ in records:
+            pass
+        if parser.failed_airports:
+            self.logger.warning(f"解析失败、本次不更新的机场: {', '.join(parser.failed_airports)}")
+        failed = set(parser.failed_airports)
+        updated = [airport_icao for airport_icao in changed if airport_icao not in failed]
+        sql_generator.generate_airport_patch_sql('terminal_procedures', sorted(updated + removed),
+                                                 parser.iter_stored_records(updated))
+    
+        self._print_statistics(sql_generator.get_statistics({'terminal_procedures': []}))
+        get_diagnostics().log_summary(self.logger)
+        self.logger.info(f"数据转换完成，耗时: {datetime.now() - start_time}")
+    
+        if self.profiler is not None:
+            self._profile_parser_memory(['terminal_procedures'])
+    
+    def _create_shared_sources(self, tables: List[str]) -> Dict[str, SharedSourceParse]:
+        """
+        串行模式下共用源文件、需要重新解析的表共用一遍解析；缓存命中的表直接读取缓存，不参与
+    
+        Returns:
+            Dict[str, SharedSourceParse]: 表名 -> 所属的一遍解析
+        """
+        tables = [table_name for table_name in tables if table_name in SHARED_SOURCE_PARSERS
+                  and os.path.exists(get_source_path(self.source_dir, table_name))]
+        tables = [table_name for table_name in tables
+                  if not is_table_cached(self.source_dir, table_name, self.cache)]
+    
+        shared_sources = {}
+        for group in group_shared_tables(tables):
+            if len(group) > 1:
+                shared = SharedSourceParse(self.source_dir, group, self.process_count,
+                                           self.memory_limit * 1024 * 1024, self.spill_directory)
+                shared_sources.update(dict.fromkeys(group, shared))
+        return shared_sources
+    
+    def _submit_parse_jobs(self, executor: ProcessPoolExecutor,
+                           tables: List[str]) -> Dict[str, Iterator[tuple]]:
+        """
+        按源文件大小从大到小提交解析任务，让earth_fix、earth_nav和CIFP等耗时任务最先开始；
+        缓存命中的表不提交任务，由主进程直接读取缓存；共用源文件的表在同一个任务中一遍解析
+        """
+        data_dict = {}
+        jobs = []
+        for table_name in tables:
+            try:
+                if is_table_cached(self.source_dir, table_name, self.cache):
+                    data_dict[table_name] = iter_table_records(self.source_dir, table_name,
+                                                               cache=self.cache)
+                    self._cached_tables.add(table_name)
+                    continue
+            except Exception as e:
+                self.logger.error(f"读取 {table_name} 缓存失败: {e}")
+            jobs.append(table_name)
+    
+        job_groups = group_shared_tables(jobs)
+        sizes = {group[0]: get_source_size(self.source_dir, group[0]) for group in job_groups}
+        # 各表的结果可能同时缓冲在主进程中等待写入，内存预算平均分给各个任务
+        job_memory_limit = int(self.memory_limit * 1024 * 1024 / len(job_groups)) if job_groups else 0
+        # 任务内部分块或按机场并行解析的进程数: 进程总数平均分给同时运行的任务，不超额使用CPU
+        job_workers = max(1, self.process_count // max(1, min(self.process_count, len(job_groups))))
+        for group in sorted(job_groups, key=lambda g: sizes[g[0]], reverse=True):
+            self.logger.info(f"提交解析任务 {', '.join(group)} ({sizes[group[0]]:,} 字节)")
+            future = executor.submit(collect_diagnostics, _parse_table_job,
+                                     self.source_dir, group,
+                                     job_workers, self.columnar, self.cache,
+                                     job_memory_limit, self.spill_directory)
+            self._parse_jobs.append(future)
+            for table_name in group:
+                data_dict[table_name] = self._iter_job_result(table_name, future)
+    
+        return {table_name: data_dict[table_name] for table_name in tables}
+    
+    def _iter_job_result(self, table_name: str, future: Future) -> Iterator[tuple]:
+        """
+        等待解析任务完成并读取其中一张表的结果，任务失败时记录错误并抛出 TableParseError
+        """
+        try:
+            (results, job_metrics), diagnostics = future.result()
+        except Exception as e:
+            self.logger.error(f"解析 {table_name} 数据失败: {e}")
+            raise TableParseError(f"解析 {table_name} 数据失败: {e}") from e
+    
+        metrics = get_metrics()
+        # 一个任务解析多张表时诊断信息和机场耗时只合并一次
+        if future not in self._merged_jobs:
+            self._merged_jobs.add(future)
+            get_diagnostics().merge(diagnostics)
+            metrics.merge_airports(job_metrics['airports'])
+        records = results[table_name]
+        metrics.record_stage('parse', table_name, job_metrics['seconds'][table_name], len(records),
+                             get_source_size(self.source_dir, table_name),
+                             peak_rss_mb=job_metrics['peak_rss_mb'], process='worker',
+                             spilled_records=getattr(records, 'spilled_records', None) or None)
+        self.logger.info(f"完成解析 {table_name} 数据: {len(records)} 条记录")
+        try:
+            yield from records
+        finally:
+            # 超出内存预算时写出的临时文件在读完后删除
+            if isinstance(records, SpillBuffer):
+                records.close()
+    
+    def _close_job_results(self) -> None:
+        """
+        释放各解析任务返回的SpillBuffer，删除其临时文件
+        
+        被跳过的表 (如SQL生成失败或写出中断) 的 _iter_job_result 生成器可能从未开始，
+        其finally不会执行，这里统一关闭；已经读完关闭过的缓冲区再次关闭没有影响
+        """
+        for future in self._parse_jobs:
+            # 还没有开始的任务直接取消，不再等待其结果
+            if future.cancel():
+                continue
+            try:
+                (results, _), _ = future.result()
+            except Exception:
+                continue
+            for records in results.values():
+                if isinstance(records, SpillBuffer):
+                    records.close()
+        self._parse_jobs.clear()
     
     def _print_statistics(self, stats: Dict[str, int]) -> None:
         print("\n" + "="*60)
         print("数据转换统计信息")
         print("="*60)
-        
+    
         table_names = {
             'airports': '机场',
             'airways': '航路',
@@ -158,14 +732,17 @@ class XPlaneConverter:
             'navaids': '导航设备',
             'mora': 'MORA',
             'msa': 'MSA',
-            'terminal_procedures': '终端程序'
+            'terminal_procedures': '终端程序',
+            'runways': '跑道',
+            'frequencies': '机场频率',
+            'gates': '停机位'
         }
-        
+    
         for table_name, count in stats.items():
             if table_name != 'total':
                 chinese_name = table_names.get(table_name, table_name)
                 print(f"{chinese_name:12}: {count:8,} 条记录")
-        
+    
         print("-" * 60)
         print(f"{'总计':12}: {stats.get('total', 0):8,} 条记录")
         print("="*60)
@@ -186,12 +763,12 @@ def main():
     parser.add_argument(
         '-o', '--output',
         default='../output/navdata.sql',
-        help='输出SQL文件路径 (默认: ../output/navdata_data.sql)'
+        help='输出SQL文件路径，以 .gz 或 .xz 结尾时多线程压缩输出 (默认: ../output/navdata_data.sql)'
     )
     
     parser.add_argument(
         '-t', '--tables',
-        help='指定要处理的表 (逗号分隔), 可选: airports,airways,waypoints,holdings,navaids,mora,msa,terminal_procedures'
+        help='指定要处理的表 (逗号分隔), 可选: airports,airways,waypoints,holdings,navaids,mora,msa,terminal_procedures,runways,frequencies,gates'
     )
     
     parser.add_argument(
@@ -200,19 +777,103 @@ def main():
         help='启用详细输出模式'
     )
     
+    parser.add_argument(
+        '-j', '--processes',
+        type=int,
+        help='并行解析的进程数, 0为CPU核数, 1为串行 (默认: 读取PERFORMANCE_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--columnar',
+        action='store_true',
+        help='并行解析时使用NumPy列式表保存各表数据 (需要numpy)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='不使用解析结果缓存，重新解析所有数据 (默认: 读取CACHE_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--delta',
+        metavar='SNAPSHOT',
+        help='增量模式: 与上一周期的快照文件对比，只输出变化记录的DELETE/UPDATE/INSERT，完成后更新快照'
+    )
+    
+    parser.add_argument(
+        '--changed-airports-only',
+        action='store_true',
+        help='只输出CIFP中新增、变化或已删除机场的终端程序SQL (先删除这些机场的记录再插入，需要缓存)'
+    )
+    
+    parser.add_argument(
+        '-f', '--format',
+        choices=['mysql', 'loaddata', 'postgresql', 'sqlite'],
+        help='输出格式: mysql为SQL文件, loaddata为每表一个制表符分隔的数据文件加LOAD DATA控制脚本, '
+             'postgresql为COPY FROM STDIN导入脚本, sqlite为带R*Tree空间索引的SQLite数据库文件 (默认: 读取OUTPUT_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--import-optimized',
+        action='store_true',
+        help='mysql输出使用导入优化: 先建不带索引的表，关闭自动提交和唯一性检查并分批提交，数据导入后再添加索引 (默认: 读取OUTPUT_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--separate-files',
+        action='store_true',
+        help='mysql输出按表分片: 每张表 (大表拆成多个) 一个SQL文件，附带清单和并行导入脚本 (默认: 读取OUTPUT_CONFIG的generate_separate_files)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='性能分析: 各表串行处理，按表输出cProfile统计和tracemalloc分配位置到 <输出文件名>_profile/ 目录'
+    )
+    
     args = parser.parse_args()
+    output_config = load_config('OUTPUT_CONFIG')
+    output_format = args.format or output_config.get('output_format', 'mysql')
+    separate_files = args.separate_files or output_config.get('generate_separate_files', False)
+    if separate_files and (output_format != 'mysql' or args.delta or args.changed_airports_only
+                           or args.import_optimized):
+        parser.error("分片输出只用于完整的mysql输出，不能与 --delta、--changed-airports-only 或 --import-optimized 同时使用")
+    if get_compression_format(args.output) and output_format in ('loaddata', 'sqlite'):
+        parser.error("压缩输出 (.gz/.xz) 只支持mysql和postgresql输出格式")
+    if args.import_optimized and (output_format != 'mysql' or args.delta or args.changed_airports_only):
+        parser.error("--import-optimized 只用于完整的mysql输出，不能与 --delta 或 --changed-airports-only 同时使用")
+    if args.changed_airports_only and (args.delta or args.no_cache):
+        parser.error("--changed-airports-only 不能与 --delta 或 --no-cache 同时使用")
+    if output_format != 'mysql' and (args.delta or args.changed_airports_only):
+        parser.error("--delta 和 --changed-airports-only 只支持mysql输出格式")
+    
+    # 确定进程数，命令行参数优先于配置文件
+    performance_config = load_config('PERFORMANCE_CONFIG')
+    process_count = args.processes
+    if process_count is None:
+        process_count = 1
+        if performance_config.get('enable_multiprocessing'):
+            process_count = performance_config.get('process_count', 0)
+    if process_count <= 0:
+        process_count = os.cpu_count() or 1
+    elif process_count > (os.cpu_count() or 1):
+        # 超过CPU核数的进程不能同时运行，只会增加结果传回主进程和进程切换的开销
+        print(f"注意: 进程数 {process_count} 超过CPU核数 {os.cpu_count() or 1}，按CPU核数解析")
+        process_count = os.cpu_count() or 1
     
     # 解析选择的表
     selected_tables = None
     if args.tables:
         selected_tables = [table.strip() for table in args.tables.split(',')]
-        
+    
         # 验证表名
         valid_tables = {
             'airports', 'airways', 'waypoints', 'holdings',
-            'navaids', 'mora', 'msa', 'terminal_procedures'
+            'navaids', 'mora', 'msa', 'terminal_procedures',
+            'runways', 'frequencies', 'gates'
         }
-        
+    
         invalid_tables = set(selected_tables) - valid_tables
         if invalid_tables:
             print(f"错误: 无效的表名: {', '.join(invalid_tables)}")
@@ -220,15 +881,35 @@ def main():
             sys.exit(1)
     
     try:
+        # 解析结果缓存，默认开启
+        cache = None
+        cache_config = load_config('CACHE_CONFIG')
+        if not args.no_cache and cache_config.get('enabled', True):
+            cache = ParseCache(cache_config.get('directory', '../cache'),
+                               cache_config.get('max_size_mb', 2048))
+    
         # 创建转换器并执行转换
-        converter = XPlaneConverter(args.source, args.output, args.verbose)
-        converter.convert_all(selected_tables)
-        
-        print(f"\n转换完成! SQL文件已保存到: {args.output}")
-        
+        columnar = args.columnar or performance_config.get('columnar_storage', False)
+        import_optimized = args.import_optimized or output_config.get('import_optimized', False)
+        converter = XPlaneConverter(args.source, args.output, args.verbose, process_count,
+                                    columnar, cache, args.delta, output_format,
+                                    import_optimized, output_config.get('commit_every_batches', 10),
+                                    separate_files, args.profile)
+        if args.changed_airports_only:
+            converter.convert_changed_airports()
+        else:
+            converter.convert_all(selected_tables)
+    
+        if separate_files:
+            print(f"\n转换完成! 分片清单已保存到: {get_manifest_file(args.output)}")
+        else:
+            print(f"\n转换完成! SQL文件已保存到: {args.output}")
+    
     except Exception as e:
         print(f"转换失败: {e}")
         sys.exit(1)
+    finally:
+        stop_logging()
 
 if __name__ == '__main__':
     main()
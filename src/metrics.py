@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+转换性能指标
+
+记录每个阶段 (各表的解析、SQL生成与写入，CIFP各机场的解析) 的耗时、记录数、字节数和
+阶段结束时的进程峰值内存 (RSS)，转换结束后写成JSON报告，用于对比各周期的性能和估算主机规格。
+
+解析是流式的，读文件、解析和校验交替进行，统计为同一个 parse 阶段；
+串行模式下 SQL生成与写入的耗时 = 该表从开始读取到读完的时间 - 解析耗时
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+try:
+    import resource
+except ImportError:
+    # Windows没有resource模块，不统计峰值内存
+    resource = None
+
+def get_peak_rss_mb(children: bool = False) -> Optional[float]:
+    """
+    当前进程 (或已结束的子进程中最大的) 的峰值常驻内存，单位MB
+    
+    Args:
+        children: 为True时返回子进程的峰值
+    
+    Returns:
+        Optional[float]: 峰值内存，不支持的平台返回None
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # Linux上ru_maxrss单位为KB，macOS上为字节
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(usage.ru_maxrss / divisor, 1)
+
+def _rate(amount: Optional[int], seconds: float) -> Optional[float]:
+    if amount is None or seconds <= 0:
+        return None
+    return round(amount / seconds, 1)
+
+class ConversionMetrics:
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._start_time = time.perf_counter()
+        self.stages: List[Dict[str, Any]] = []
+        # 机场ICAO代码 -> (解析耗时秒数, 记录数)
+        self.airports: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def record_stage(self, stage: str, table_name: Optional[str], seconds: float,
+                     records: Optional[int] = None, byte_count: Optional[int] = None,
+                     peak_rss_mb: Optional[float] = None, **extra: Any) -> Dict[str, Any]:
+        """
+        记录一个阶段
+    
+        Args:
+            stage: 阶段名，如 parse / render / total
+            table_name: 表名，全局阶段为None
+            seconds: 耗时 (秒)
+            records: 处理的记录数
+            byte_count: 处理的字节数 (解析为源数据大小，生成为写出的SQL大小)
+            peak_rss_mb: 峰值内存，None时取当前进程到此为止的峰值
+            extra: 其他需要写入报告的字段，值为None的不写入
+    
+        Returns:
+            Dict: 记录的条目
+        """
+        entry = {
+            'stage': stage,
+            'table': table_name,
+            'seconds': round(seconds, 4),
+            'records': records,
+            'bytes': byte_count,
+            'records_per_second': _rate(records, seconds),
+            'bytes_per_second': _rate(byte_count, seconds),
+            'peak_rss_mb': get_peak_rss_mb() if peak_rss_mb is None else peak_rss_mb,
+        }
+        entry.update((key, value) for key, value in extra.items() if value is not None)
+        with self._lock:
+            self.stages.append(entry)
+        return entry
+    
+    def record_airport(self, airport_icao: str, seconds: float, records: int) -> None:
+        with self._lock:
+            self.airports[airport_icao] = (seconds, records)
+    
+    def merge_airports(self, airports: Dict[str, tuple]) -> None:
+        """
+        合并子进程中记录的机场耗时
+        """
+        with self._lock:
+            self.airports.update(airports)
+    
+    def drain_airports(self) -> Dict[str, tuple]:
+        with self._lock:
+            airports, self.airports = self.airports, {}
+        return airports
+    
+    def to_dict(self, slowest_airports: int = 20) -> Dict[str, Any]:
+        """
+        Args:
+            slowest_airports: 报告中单独列出的最慢机场数
+    
+        Returns:
+            Dict: 完整报告
+        """
+        airport_seconds = sum(seconds for seconds, _ in self.airports.values())
+        airport_records = sum(records for _, records in self.airports.values())
+        slowest = sorted(self.airports.items(), key=lambda item: item[1][0], reverse=True)[:slowest_airports]
+        return {
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'elapsed_seconds': round(time.perf_counter() - self._start_time, 4),
+            'peak_rss_mb': get_peak_rss_mb(),
+            'children_peak_rss_mb': get_peak_rss_mb(children=True),
+            'stages': self.stages,
+            'cifp_airports': {
+                'count': len(self.airports),
+                'seconds': round(airport_seconds, 4),
+                'records': airport_records,
+                'records_per_second': _rate(airport_records, airport_seconds),
+                'slowest': [
+                    {'airport': icao, 'seconds': round(seconds, 4), 'records': records}
+                    for icao, (seconds, records) in slowest
+                ],
+                'all': {icao: round(seconds, 4) for icao, (seconds, _) in sorted(self.airports.items())},
+            },
+        }
+    
+    def write_report(self, report_file: str) -> None:
+        report_dir = os.path.dirname(report_file)
+        if report_dir and not os.path.exists(report_dir):
+            os.makedirs(report_dir)
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            f.write("\n")
+
+# 当前进程的指标，子进程的解析任务把机场耗时带回主进程
+_METRICS = ConversionMetrics()
+
+def get_metrics() -> ConversionMetrics:
+    return _METRICS
+
+def reset_metrics() -> ConversionMetrics:
+    global _METRICS
+    _METRICS = ConversionMetrics()
+    return _METRICS
+
+class ProgressDisplay:
+    """
+    在终端同一行实时显示各表已处理的记录数和速度，非终端 (如重定向到文件) 时不输出
+    """
+    
+    def __init__(self, stream: TextIO = None, interval: float = 0.5):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.enabled = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self._last_update = 0.0
+        self._counts: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+    
+    def update(self, table_name: str, records: int, seconds: float, force: bool = False) -> None:
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            self._counts[table_name] = (records, seconds)
+            if not force and now - self._last_update < self.interval:
+                return
+            self._last_update = now
+            parts = [f"{name} {count:,} 条 ({_rate(count, elapsed) or 0:,.0f} 条/秒)"
+                     for name, (count, elapsed) in self._counts.items()]
+            self.stream.write("\r\033[K" + " | ".join(parts[-3:]))
+            self.stream.flush()
+    
+    def finish(self) -> None:
+        if self.enabled and self._counts:
+            self.stream.write("\r\033[K")
+            self.stream.flush()
+
+class TimedRecords:
+    """
+    包装记录迭代器，统计读取记录 (即解析) 的耗时和从开始读取到读完的总时间；
+    读取之外的时间是写入方生成和写出SQL的时间
+    """
+    
+    def __init__(self, table_name: str, records: Iterable[tuple], progress: ProgressDisplay = None):
+        self.table_name = table_name
+        self.records = records
+        self.progress = progress
+        self.record_count = 0
+        # 读取记录的耗时和从开始读取到读完的时间
+        self.read_seconds = 0.0
+        self.span_seconds = 0.0
+        self.started = False
+    
+    def __iter__(self) -> Iterator[tuple]:
+        return self._iterate()
+    
+    def _iterate(self) -> Iterator[tuple]:
+        self.started = True
+        perf_counter = time.perf_counter
+        progress = self.progress
+        start_time = perf_counter()
+        read_seconds = 0.0
+        count = 0
+        try:
+            record_iter = iter(self.records)
+            while True:
+                read_start = perf_counter()
+                try:
+                    record = next(record_iter)
+                except StopIteration:
+                    read_seconds += perf_counter() - read_start
+                    break
+                read_seconds += perf_counter() - read_start
+                count += 1
+                if progress is not None and not count % 10000:
+                    progress.update(self.table_name, count, perf_counter() - start_time)
+                yield record
+        finally:
+            self.record_count = count
+            self.read_seconds = read_seconds
+            self.span_seconds = perf_counter() - start_time
+            if progress is not None:
+                progress.update(self.table_name, count, self.span_seconds, force=True)
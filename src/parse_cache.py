@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+"""
+解析结果的磁盘缓存
+
+同一AIRAC周期的数据经常要反复转换 (选择不同的表、调整表结构或输出格式)，
+源文件没有变化时直接读取上次的解析结果，跳过解析。
+
+缓存目录结构:
+    <cache_dir>/<表名>-<源路径摘要>.json    源文件指纹: 路径、大小/修改时间、内容哈希、解析器版本
+    <cache_dir>/data/<表名>-<内容哈希>-<解析器版本>.pkl    解析结果，分批pickle
+
+大小和修改时间不变时直接命中；变化时 (如重新解压了同一份数据) 再比较内容哈希。
+解析器版本由解析器及其依赖模块的源码计算，修改解析代码后缓存自动失效。
+数据文件的修改时间即最近使用时间，总大小超过上限时按LRU删除。
+
+CIFP不保存整表的解析结果，只有按机场的清单 (<cache_dir>/cifp-<源路径摘要>.db)，
+整表的记录由清单中各机场的结果按顺序拼接。只有部分机场文件变化时，只重新解析这些机场，
+其余机场直接使用清单中的结果。清单与数据文件一起计入总大小，按最近使用时间删除
+"""
+
+import os
+import sys
+import json
+import pickle
+import sqlite3
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from . import record_types, sql_schemas
+    from .parsers import field_spec
+    from .parsers.diagnostics import get_diagnostics
+except ImportError:
+    import record_types
+    import sql_schemas
+    from parsers import field_spec
+    from parsers.diagnostics import get_diagnostics
+
+# 缓存文件格式版本，格式变化时递增
+CACHE_FORMAT_VERSION = 2
+
+# 每次pickle写入的记录数
+_BATCH_SIZE = 10000
+
+# 所有解析器共同依赖的模块，其源码参与解析器版本的计算
+_SHARED_MODULES = (field_spec, record_types, sql_schemas)
+
+# 解析器类 -> 版本摘要
+_PARSER_VERSIONS: Dict[type, str] = {}
+
+def _digest(*parts: Any) -> str:
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+def get_parser_version(parser_class: type) -> str:
+    """
+    由解析器类及其基类所在模块、共同依赖模块的源码计算解析器版本
+    """
+    version = _PARSER_VERSIONS.get(parser_class)
+    if version is None:
+        modules = [sys.modules.get(cls.__module__) for cls in parser_class.__mro__]
+        modules.extend(_SHARED_MODULES)
+    
+        hasher = hashlib.blake2b(str(CACHE_FORMAT_VERSION).encode(), digest_size=8)
+        seen = set()
+        for module in modules:
+            file_path = getattr(module, '__file__', None)
+            if not file_path or file_path in seen:
+                continue
+            seen.add(file_path)
+            with open(file_path, 'rb') as file:
+                hasher.update(file.read())
+        version = _PARSER_VERSIONS[parser_class] = hasher.hexdigest()
+    return version
+
+def _list_source_files(source_path: str) -> List[os.DirEntry]:
+    with os.scandir(source_path) as entries:
+        return sorted((entry for entry in entries if entry.is_file()), key=lambda entry: entry.name)
+
+def get_stat_signature(source_path: str) -> str:
+    """
+    由大小和修改时间计算的快速指纹，目录 (CIFP) 按其中所有文件计算
+    """
+    if os.path.isdir(source_path):
+        return _digest([(entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                        for entry in _list_source_files(source_path)])
+    stat = os.stat(source_path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def get_content_hash(source_path: str) -> str:
+    """
+    源文件内容哈希，目录按文件名顺序对文件名和内容一起计算
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    if os.path.isdir(source_path):
+        paths = [entry.path for entry in _list_source_files(source_path)]
+    else:
+        paths = [source_path]
+    
+    for path in paths:
+        hasher.update(os.path.basename(path).encode('utf-8') + b'\0')
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                hasher.update(block)
+    return hasher.hexdigest()
+
+class ParseCache:
+
+    def __init__(self, cache_dir: str, max_size_mb: int = 2048):
+        self.cache_dir = cache_dir
+        self.data_dir = os.path.join(cache_dir, 'data')
+        # 缓存总大小上限 (字节)
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.logger = logging.getLogger(self.__class__.__name__)
+        os.makedirs(self.data_dir, exist_ok=True)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # 传给子进程时不带logger
+        state = self.__dict__.copy()
+        del state['logger']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(self.__class__.__name__)
+    
+    def _meta_path(self, table_name: str, source_path: str) -> str:
+        return os.path.join(self.cache_dir, f"{table_name}-{_digest(os.path.abspath(source_path))}.json")
+    
+    def _data_path(self, table_name: str, content_hash: str, parser_version: str) -> str:
+        return os.path.join(self.data_dir, f"{table_name}-{content_hash}-{parser_version}.pkl")
+    
+    def _load_meta(self, meta_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+    
+    def _save_meta(self, meta_path: str, meta: Dict[str, Any]) -> None:
+        temp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(meta, file, ensure_ascii=False, indent=2)
+        os.replace(temp_path, meta_path)
+    
+    def lookup(self, table_name: str, source_path: str, parser_class: type) -> Optional[Dict[str, Any]]:
+        """
+        查找源文件对应的缓存条目
+    
+        Args:
+            table_name: 表名
+            source_path: 源数据文件或CIFP目录
+            parser_class: 解析器类
+    
+        Returns:
+            Optional[Dict]: 命中时返回缓存元数据，否则返回None
+        """
+        return self._locate(table_name, source_path, parser_class)[0]
+    
+    def _locate(self, table_name: str, source_path: str, parser_class: type) -> tuple:
+        """
+        Returns:
+            tuple: (命中的缓存元数据或None, 源文件指纹)
+        """
+        meta_path = self._meta_path(table_name, source_path)
+        parser_version = get_parser_version(parser_class)
+        stat_signature = get_stat_signature(source_path)
+        meta = self._load_meta(meta_path) or {}
+    
+        # 大小和修改时间都没变，内容视为未变
+        if meta.get('stat_signature') == stat_signature:
+            content_hash = meta['content_hash']
+        else:
+            content_hash = get_content_hash(source_path)
+    
+        fingerprint = (stat_signature, content_hash, parser_version)
+        data_path = self._data_path(table_name, content_hash, parser_version)
+        if not os.path.exists(data_path):
+            return None, fingerprint
+    
+        if meta.get('stat_signature') != stat_signature or meta.get('data_file') != os.path.basename(data_path):
+            # 内容相同但文件被重新写过，或来自其他路径的相同内容
+            data_meta = self._load_meta(data_path[:-4] + '.json')
+            if data_meta is None:
+                return None, fingerprint
+            meta = dict(data_meta, source_path=os.path.abspath(source_path), stat_signature=stat_signature)
+            self._save_meta(meta_path, meta)
+        return meta, fingerprint
+    
+    def iter_records(self, table_name: str, source_path: str, parser_class: type,
+                     parse: Callable[[], Iterable[tuple]]) -> Iterator[tuple]:
+        """
+        命中时从缓存读取记录，否则调用parse解析并同时写入缓存
+    
+        Args:
+            table_name: 表名
+            source_path: 源数据文件或CIFP目录
+            parser_class: 解析器类
+            parse: 返回记录迭代器的解析函数
+    
+        Returns:
+            Iterator[tuple]: 数据记录迭代器
+        """
+        # 先计算指纹再解析，解析期间源文件被修改时缓存不会对应到新内容
+        meta, fingerprint = self._locate(table_name, source_path, parser_class)
+        if meta is not None:
+            yield from self._read_entry(table_name, meta)
+        else:
+            yield from self._write_entry(table_name, source_path, parser_class.__name__,
+                                         fingerprint, parse())
+    
+    def _read_entry(self, table_name: str, meta: Dict[str, Any]) -> Iterator[tuple]:
+        data_path = os.path.join(self.data_dir, meta['data_file'])
+        # 更新最近使用时间
+        os.utime(data_path)
+        self.logger.info(f"从缓存读取 {table_name} 数据: {meta['records']} 条记录")
+        # 解析时产生的诊断信息随缓存一起恢复
+        get_diagnostics().merge_items(meta.get('diagnostics', []))
+    
+        with open(data_path, 'rb') as file:
+            while True:
+                try:
+                    batch = pickle.load(file)
+                except EOFError:
+                    break
+                yield from batch
+    
+    def _write_entry(self, table_name: str, source_path: str, parser_name: str,
+                     fingerprint: tuple, records: Iterable[tuple]) -> Iterator[tuple]:
+        stat_signature, content_hash, parser_version = fingerprint
+        data_path = self._data_path(table_name, content_hash, parser_version)
+        temp_path = f"{data_path}.{os.getpid()}.tmp"
+    
+        count = 0
+        try:
+            with open(temp_path, 'wb') as file:
+                batch = []
+                for record in records:
+                    batch.append(record)
+                    if len(batch) >= _BATCH_SIZE:
+                        pickle.dump(batch, file, pickle.HIGHEST_PROTOCOL)
+                        count += len(batch)
+                        batch = []
+                    yield record
+                if batch:
+                    pickle.dump(batch, file, pickle.HIGHEST_PROTOCOL)
+                    count += len(batch)
+        except BaseException:
+            # 解析失败或中途停止读取，不留下不完整的缓存
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+        meta = {
+            'table_name': table_name,
+            'source_path': os.path.abspath(source_path),
+            'stat_signature': stat_signature,
+            'content_hash': content_hash,
+            'parser_version': parser_version,
+            'data_file': os.path.basename(data_path),
+            'records': count,
+            'diagnostics': get_diagnostics().to_dict(parser_name)
+        }
+        os.replace(temp_path, data_path)
+        # 数据文件旁边保存一份，其他路径的相同内容可以直接复用
+        self._save_meta(data_path[:-4] + '.json', meta)
+        self._save_meta(self._meta_path(table_name, source_path), meta)
+        self.logger.info(f"已缓存 {table_name} 数据: {count} 条记录")
+    
+    def get_cifp_manifest(self, cifp_directory: str, parser_class: type) -> 'CifpManifest':
+        """
+        获取CIFP目录对应的按机场清单，清单文件的修改时间即最近使用时间
+        """
+        manifest_file = os.path.join(
+            self.cache_dir, f"cifp-{_digest(os.path.abspath(cifp_directory), CACHE_FORMAT_VERSION)}.db")
+        if os.path.exists(manifest_file):
+            os.utime(manifest_file)
+        return CifpManifest(manifest_file, get_parser_version(parser_class))
+    
+    def evict(self) -> int:
+        """
+        缓存总大小超过上限时，按最近使用时间从旧到新删除数据文件和CIFP清单
+    
+        Returns:
+            int: 删除的条目数
+        """
+        with os.scandir(self.data_dir) as entries:
+            cache_files = [(entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                           for entry in entries if entry.name.endswith('.pkl')]
+        with os.scandir(self.cache_dir) as entries:
+            cache_files.extend((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries
+                               if entry.name.startswith('cifp-') and entry.name.endswith('.db'))
+    
+        total_bytes = sum(size for _, size, _ in cache_files)
+        removed = 0
+        for _, size, path in sorted(cache_files):
+            if total_bytes <= self.max_bytes:
+                break
+            os.remove(path)
+            meta_path = path[:-4] + '.json'
+            if path.endswith('.pkl') and os.path.exists(meta_path):
+                os.remove(meta_path)
+            total_bytes -= size
+            removed += 1
+    
+        if removed:
+            self.logger.info(f"缓存超过上限，删除了 {removed} 个最久未使用的条目")
+        return removed
+
+class CifpManifest:
+    """
+    CIFP按机场的清单: 每个机场文件的指纹和解析结果，解析失败的机场不写入
+    
+    表 airports: (ICAO代码, 大小/修改时间, 内容哈希, 解析器版本, 记录数, pickle后的记录列表, 诊断信息JSON)
+    """
+    
+    def __init__(self, manifest_file: str, parser_version: str):
+        self.manifest_file = manifest_file
+        self.parser_version = parser_version
+        self._connection = None
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # 传给子进程时不带数据库连接
+        state = self.__dict__.copy()
+        state['_connection'] = None
+        return state
+    
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.manifest_file)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS airports ("
+                "airport_icao TEXT PRIMARY KEY, stat_signature TEXT, content_hash TEXT, "
+                "parser_version TEXT, record_count INTEGER, records BLOB, diagnostics TEXT)")
+        return self._connection
+    
+    def load_fingerprints(self) -> Dict[str, Tuple[str, str, str]]:
+        """
+        Returns:
+            Dict: 机场ICAO代码 -> (大小/修改时间, 内容哈希, 解析器版本)
+        """
+        cursor = self.connection.execute(
+            "SELECT airport_icao, stat_signature, content_hash, parser_version FROM airports")
+        return {row[0]: row[1:] for row in cursor}
+    
+    def get_airport(self, airport_icao: str) -> Tuple[List[tuple], List[Dict[str, Any]]]:
+        """
+        Returns:
+            Tuple: (机场的记录列表, 解析时产生的诊断信息，to_dict 格式)
+        """
+        row = self.connection.execute(
+            "SELECT records, diagnostics FROM airports WHERE airport_icao = ?", (airport_icao,)).fetchone()
+        if row is None:
+            return [], []
+        return pickle.loads(row[0]), json.loads(row[1])
+    
+    def put(self, airport_icao: str, stat_signature: str, content_hash: str, records: List[tuple],
+            diagnostics: List[Dict[str, Any]]) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO airports VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (airport_icao, stat_signature, content_hash, self.parser_version, len(records),
+             pickle.dumps(records, pickle.HIGHEST_PROTOCOL), json.dumps(diagnostics, ensure_ascii=False)))
+    
+    def touch(self, airport_icao: str, stat_signature: str) -> None:
+        """
+        内容未变但文件被重新写过，只更新大小/修改时间
+        """
+        self.connection.execute(
+            "UPDATE airports SET stat_signature = ? WHERE airport_icao = ?", (stat_signature, airport_icao))
+    
+    def remove(self, airport_icaos: Iterable[str]) -> None:
+        self.connection.executemany(
+            "DELETE FROM airports WHERE airport_icao = ?", [(icao,) for icao in airport_icaos])
+    
+    def commit(self) -> None:
+        self.connection.commit()
+    
+    def close(self) -> None:
+        # 未提交的修改 (如中途停止读取) 全部丢弃
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
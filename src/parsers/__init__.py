@@ -8,6 +8,8 @@ from .navaid_parser import NavaidParser
 from .mora_parser import MoraParser
 from .msa_parser import MsaParser
 from .terminal_parser import TerminalParser
+from .apt_dat_parser import RunwayParser, FrequencyParser, GateParser, AirportFacilityParser
+from .diagnostics import ParseDiagnostics, collect_diagnostics, get_diagnostics
 
 __all__ = [
     'AirportParser',
@@ -17,5 +19,12 @@ __all__ = [
     'NavaidParser',
     'MoraParser',
     'MsaParser',
-    'TerminalParser'
+    'TerminalParser',
+    'RunwayParser',
+    'FrequencyParser',
+    'GateParser',
+    'AirportFacilityParser',
+    'ParseDiagnostics',
+    'collect_diagnostics',
+    'get_diagnostics'
 ]
@@ -1,62 +1,38 @@
 # -*- coding: utf-8 -*-
-from typing import List, Dict, Any
+from typing import Optional
+from record_types import AirwayRecord
 from .base_parser import BaseParser
+from .field_spec import FieldSpec, not_empty
 
 class AirwayParser(BaseParser):
-    def parse(self) -> List[Dict[str, Any]]:
-        records = []
-        
-        for line in self._read_file_lines():
-            try:
-                record = self._parse_airway_line(line)
-                if record:
-                    records.append(record)
-            except Exception as e:
-                self.logger.error(f"解析航路数据行失败: {line}, 错误: {e}")
-                continue
-        
-        self.validate_data(records)
-        return records
+    table_name = 'airways'
+    data_label = '航路'
+    supports_chunking = True
     
-    def _parse_airway_line(self, line: str) -> Dict[str, Any]:
-        fields = self._split_line(line)
-        
-        if len(fields) < 11:
-            self.logger.warning(f"航路数据字段不足: {line}")
-            return None
-        
-        # 解析基本字段
-        from_waypoint = self._safe_str(fields[0])
-        from_region = self._safe_str(fields[1])
-        from_section = self._safe_int(fields[2])
-        to_waypoint = self._safe_str(fields[3])
-        to_region = self._safe_str(fields[4])
-        to_section = self._safe_int(fields[5])
-        airway_type = self._safe_str(fields[6], 'N')
-        direction = self._safe_int(fields[7], 1)
-        min_altitude = self._safe_int(fields[8])
-        max_altitude = self._safe_int(fields[9])
-        airway_name = self._safe_str(fields[10])
-        
-        # 验证必要字段
-        if not from_waypoint or not to_waypoint or not airway_name:
-            self.logger.warning(f"航路点或航路名称为空: {line}")
-            return None
+    min_fields = 11
+    record_type = AirwayRecord
+    field_specs = (
+        FieldSpec('from_waypoint', 0, validator=not_empty),
+        FieldSpec('from_region', 1),
+        FieldSpec('from_section', 2, 'int'),
+        FieldSpec('to_waypoint', 3, validator=not_empty),
+        FieldSpec('to_region', 4),
+        FieldSpec('to_section', 5, 'int'),
+        FieldSpec('airway_type', 6, default='N'),
+        FieldSpec('direction', 7, 'int', 1),
+        FieldSpec('min_altitude', 8, 'int'),
+        FieldSpec('max_altitude', 9, 'int'),
+        FieldSpec('airway_name', 10, validator=not_empty),
+    )
+    
+    def _parse_line(self, line: str) -> Optional[AirwayRecord]:
+        return self._parse_airway_line(line)
+    
+    def _parse_airway_line(self, line: str) -> Optional[AirwayRecord]:
+        record = self._convert_fields(line.split())
         
         # 验证高度范围
-        if min_altitude > max_altitude and max_altitude > 0:
-            self.logger.warning(f"最低高度大于最高高度: {airway_name}, min={min_altitude}, max={max_altitude}")
+        if record.min_altitude > record.max_altitude and record.max_altitude > 0:
+            self._report_issue('out_of_range', 'min_altitude', line)
         
-        return {
-            'from_waypoint': from_waypoint,
-            'from_region': from_region,
-            'from_section': from_section,
-            'to_waypoint': to_waypoint,
-            'to_region': to_region,
-            'to_section': to_section,
-            'airway_type': airway_type,
-            'direction': direction,
-            'min_altitude': min_altitude,
-            'max_altitude': max_altitude,
-            'airway_name': airway_name
-        }
+        return record
@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+"""
+earth_apt.dat (完整的apt.dat) 的流式解析
+
+文件按机场分段: 每段以机场头 (行代码 1=陆地机场, 16=水上机场, 17=直升机场) 开始，
+之后是该机场的子记录 (跑道、频率、停机位、滑行道网络、道面等)，直到下一个机场头。
+
+各解析器用行代码分派表只处理自己需要的子记录，其余行 (占文件大部分的滑行道网络和道面数据)
+在字节层面按行代码跳过，不解码也不切分。解析只需读一遍文件，当前机场随机场头更新，
+不在内存中保留整个文件；大文件按机场分段的边界分块，在进程池中并行解析。
+多张表都需要时用 AirportFacilityParser 一遍读取，同时输出各表的记录
+"""
+
+import re
+import mmap
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
+from record_types import RunwayRecord, FrequencyRecord, GateRecord
+from .base_parser import BaseParser
+from .field_spec import (FieldSpec, FieldError, FieldCountError, compile_field_specs,
+                         is_latitude, is_longitude, non_zero)
+
+# 机场头的行代码
+AIRPORT_HEADER_CODES = frozenset(('1', '16', '17'))
+_AIRPORT_HEADER_PREFIXES = frozenset(code.encode('ascii') for code in AIRPORT_HEADER_CODES)
+
+# 机场元数据行 (如 "1302 icao_code KSEA")，icao_code 覆盖机场头中的X-Plane标识
+METADATA_CODE = '1302'
+
+# 解析器类 -> 行代码 -> 编译后的字段转换函数
+_ROW_CONVERTERS: Dict[type, Dict[str, Callable[..., tuple]]] = {}
+
+class AptDatParser(BaseParser):
+    """
+    1    433 0 0 KSEA Seattle Tacoma Intl
+    1302 icao_code KSEA
+    100 45.72 1 0 0.25 1 3 0 16L 47.46379136 -122.30800667 0.00 0.00 3 0 0 1 34R 47.43121431 -122.30809111 ...
+    """
+    
+    # 按机场分段的边界分块
+    supports_chunking = True
+    
+    # 行代码 -> (处理方法名, 最少字段数, 字段规格)，由子类指定；
+    # 处理方法的参数为 (机场标识, 行代码, 转换后的字段值)，返回记录或None
+    row_handlers: Dict[str, Tuple[str, int, Tuple[FieldSpec, ...]]] = {}
+    
+    def __init__(self, file_path: str, workers: int = 1):
+        super().__init__(file_path, workers)
+        # 行代码 -> (处理方法, 字段转换函数)
+        self._dispatch = self._get_dispatch()
+        # 需要解码的行: 行代码为分派表中的子记录、机场头或元数据行。匹配包括行首的换行符，
+        # 正则引擎可以按换行符快速定位候选位置 (用^和MULTILINE时要在每个字节上尝试匹配，慢3倍以上)
+        row_codes = sorted({*self.row_handlers, *AIRPORT_HEADER_CODES, METADATA_CODE}, key=len, reverse=True)
+        self._line_pattern = re.compile(
+            rb'\n[ \t]*(?:' + b'|'.join(code.encode('ascii') for code in row_codes) + rb')[ \t][^\n]*')
+    
+    @classmethod
+    def get_row_converters(cls) -> Dict[str, Callable[..., tuple]]:
+        """
+        获取各行代码的字段转换函数，每个解析器类只编译一次
+        """
+        converters = _ROW_CONVERTERS.get(cls)
+        if converters is None:
+            on_conversion_error = cls._get_conversion_error_handler()
+            converters = {code: compile_field_specs(specs, min_fields, on_conversion_error=on_conversion_error)
+                          for code, (_, min_fields, specs) in cls.row_handlers.items()}
+            _ROW_CONVERTERS[cls] = converters
+        return converters
+    
+    def _get_dispatch(self) -> Dict[str, Tuple[Callable[..., Optional[tuple]], Callable[..., tuple]]]:
+        converters = self.get_row_converters()
+        return {code: (getattr(self, method_name), converters[code])
+                for code, (method_name, _, _) in self.row_handlers.items()}
+    
+    def _iter_mmap_lines(self, mm: mmap.mmap, start: int, end: int) -> Iterator[str]:
+        """
+        只解码分派表中的行代码、机场头和元数据行
+    
+        按行代码匹配的正则表达式直接在映射的文件上查找，不需要的行 (包括空行、注释行和结束标记)
+        在C层面跳过，不逐行读取和切分
+        """
+        warned = False
+    
+        for line in self._iter_matching_lines(mm, start, end):
+            try:
+                yield line.decode('utf-8')
+            except UnicodeDecodeError:
+                if not warned:
+                    self.logger.warning(f"UTF-8解码失败，该行使用latin-1编码: {self.file_path}")
+                    warned = True
+                yield line.decode('latin-1')
+    
+    def _iter_matching_lines(self, mm: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+        """
+        返回 [start, end) 中行代码匹配的行 (去掉首尾空白)，start 为行首
+        """
+        if start > 0 and mm[start - 1:start] == b'\n':
+            # 从前一个换行符开始查找，第一行也能匹配
+            start -= 1
+        else:
+            # 没有文件头时第一行前面没有换行符，单独匹配
+            first_end = mm.find(b'\n', start, end)
+            first_end = end if first_end < 0 else first_end
+            first_line = mm[start:first_end]
+            if self._line_pattern.match(b'\n' + first_line):
+                yield first_line.strip()
+            start = first_end
+    
+        for match in self._line_pattern.finditer(mm, start, end):
+            yield match.group().strip()
+    
+    def _get_chunk_ranges(self, chunk_count: int) -> List[Tuple[int, int]]:
+        """
+        把数据区切分为约 chunk_count 个字节范围，每个范围都从机场头开始，
+        子记录和所属的机场头总在同一块中
+        """
+        mm = self._open_mmap()
+        if mm is None:
+            return []
+    
+        ranges = []
+        with mm:
+            data_start, data_end = self._get_data_range(mm)
+            chunk_size = max((data_end - data_start) // chunk_count, 1)
+    
+            start = data_start
+            while start < data_end:
+                end = self._find_airport_start(mm, start + chunk_size, data_end)
+                ranges.append((start, end))
+                start = end
+    
+        return ranges
+    
+    def _find_airport_start(self, mm: mmap.mmap, position: int, end: int) -> int:
+        """
+        从 position 所在行的下一行开始查找机场头，返回其行首位置，找不到时返回 end
+        """
+        while position < end:
+            newline = mm.find(b'\n', position, end)
+            if newline < 0:
+                return end
+            position = newline + 1
+            prefix = mm[position:position + 3].split()
+            if prefix and prefix[0] in _AIRPORT_HEADER_PREFIXES:
+                return position
+        return end
+    
+    def _parse_lines(self, lines: Iterator[str]) -> Iterator[tuple]:
+        dispatch = self._dispatch
+        airport_icao = None
+    
+        for line in lines:
+            fields = line.split()
+            row_code = fields[0]
+            record = None
+            try:
+                if row_code in AIRPORT_HEADER_CODES:
+                    # 上一个机场的子记录到此结束
+                    yield from self._end_airport()
+                    # 机场头无效时之后的子记录不能归到上一个机场
+                    airport_icao = None
+                    airport_icao = self._parse_airport_header(fields)
+                    continue
+    
+                if row_code == METADATA_CODE:
+                    if airport_icao is not None and len(fields) > 2 and fields[1] == 'icao_code':
+                        airport_icao = fields[2]
+                    continue
+    
+                if airport_icao is None:
+                    # 第一个机场头之前或机场头无效的子记录
+                    self._report_issue('invalid_field', 'airport_icao', line)
+                    continue
+    
+                handler, convert = dispatch[row_code]
+                record = handler(airport_icao, row_code, convert(fields))
+            except FieldCountError:
+                self._report_row_issue(row_code, 'field_count', row_code, line)
+            except FieldError as e:
+                self._report_row_issue(row_code, 'invalid_field', getattr(e, 'field_name', ''), line)
+            except Exception as e:
+                self._report_row_issue(row_code, 'parse_error', type(e).__name__, f"{line} ({e})")
+            else:
+                if record:
+                    yield record
+                continue
+    
+            # 无效的行被丢弃，之后的行不能归到它之前的记录
+            yield from self._discard_row(row_code)
+    
+        yield from self._end_airport()
+    
+    def _parse_airport_header(self, fields: List[str]) -> str:
+        """
+        机场头: 行代码 海拔 (两个已废弃的字段) 标识 名称
+        """
+        if len(fields) < 5:
+            raise FieldCountError(len(fields), 5)
+        return fields[4]
+    
+    def _end_airport(self) -> Iterator[tuple]:
+        """
+        一个机场的分段结束时调用，返回等待后续行补充的记录
+        """
+        return iter(())
+    
+    def _discard_row(self, row_code: str) -> Iterator[tuple]:
+        """
+        一行因字段无效被丢弃时调用，返回需要先输出的等待中的记录
+        """
+        return iter(())
+    
+    def _report_row_issue(self, row_code: str, category: str, field: str, sample: str) -> None:
+        self._report_issue(category, field, sample)
+
+class RunwayParser(AptDatParser):
+    table_name = 'runways'
+    data_label = '跑道'
+    
+    row_handlers = {
+        # 陆地跑道: 宽度 道面 路肩 平整度 中线灯 边灯 距离标志牌，之后每个跑道端9个字段:
+        # 跑道号 纬度 经度 内移入口 停止道 标志 进近灯 接地区灯 跑道端识别灯
+        '100': ('_parse_land_runway', 22, (
+            FieldSpec('width', 1, 'float'),
+            FieldSpec('surface_type', 2, 'int'),
+            FieldSpec('end1_identifier', 8),
+            FieldSpec('end1_latitude', 9, 'float', validator=is_latitude),
+            FieldSpec('end1_longitude', 10, 'float', validator=is_longitude),
+            FieldSpec('end1_displaced_threshold', 11, 'float'),
+            FieldSpec('end1_overrun_length', 12, 'float'),
+            FieldSpec('end2_identifier', 17),
+            FieldSpec('end2_latitude', 18, 'float', validator=is_latitude),
+            FieldSpec('end2_longitude', 19, 'float', validator=is_longitude),
+            FieldSpec('end2_displaced_threshold', 20, 'float'),
+            FieldSpec('end2_overrun_length', 21, 'float'),
+        )),
+        # 水上跑道: 宽度 浮标，之后每个跑道端3个字段: 跑道号 纬度 经度
+        '101': ('_parse_water_runway', 9, (
+            FieldSpec('width', 1, 'float'),
+            FieldSpec('end1_identifier', 3),
+            FieldSpec('end1_latitude', 4, 'float', validator=is_latitude),
+            FieldSpec('end1_longitude', 5, 'float', validator=is_longitude),
+            FieldSpec('end2_identifier', 6),
+            FieldSpec('end2_latitude', 7, 'float', validator=is_latitude),
+            FieldSpec('end2_longitude', 8, 'float', validator=is_longitude),
+        )),
+        # 直升机坪: 名称 纬度 经度 朝向 长度 宽度 道面 ...
+        '102': ('_parse_helipad', 8, (
+            FieldSpec('end1_identifier', 1),
+            FieldSpec('end1_latitude', 2, 'float', validator=is_latitude),
+            FieldSpec('end1_longitude', 3, 'float', validator=is_longitude),
+            FieldSpec('width', 6, 'float'),
+            FieldSpec('surface_type', 7, 'int'),
+        )),
+    }
+    
+    def _parse_land_runway(self, airport_icao: str, row_code: str, values: tuple) -> RunwayRecord:
+        return RunwayRecord(airport_icao, 'L', *values)
+    
+    def _parse_water_runway(self, airport_icao: str, row_code: str, values: tuple) -> RunwayRecord:
+        width, end1_identifier, end1_latitude, end1_longitude, end2_identifier, end2_latitude, end2_longitude = values
+        return RunwayRecord(airport_icao, 'W', width, None,
+                            end1_identifier, end1_latitude, end1_longitude, None, None,
+                            end2_identifier, end2_latitude, end2_longitude, None, None)
+    
+    def _parse_helipad(self, airport_icao: str, row_code: str, values: tuple) -> RunwayRecord:
+        identifier, latitude, longitude, width, surface_type = values
+        return RunwayRecord(airport_icao, 'H', width, surface_type,
+                            identifier, latitude, longitude, None, None,
+                            None, None, None, None, None)
+
+# 频率行代码 (不含前缀10) 对应的类型
+FREQUENCY_TYPES = {
+    '50': 'ATIS',
+    '51': 'CTAF',
+    '52': 'CLD',
+    '53': 'GND',
+    '54': 'TWR',
+    '55': 'APP',
+    '56': 'DEP',
+}
+
+_FREQUENCY_SPECS = (
+    FieldSpec('frequency', 1, 'int', validator=non_zero),
+    FieldSpec('name', 2, 'rest'),
+)
+
+class FrequencyParser(AptDatParser):
+    """
+    50 12825 ATIS         旧格式，单位10kHz
+    1050 128250 ATIS      8.33kHz间隔格式，单位kHz
+    """
+    
+    table_name = 'frequencies'
+    data_label = '频率'
+    
+    row_handlers = dict(
+        [(code, ('_parse_legacy_frequency', 2, _FREQUENCY_SPECS)) for code in FREQUENCY_TYPES] +
+        [(f"10{code}", ('_parse_frequency', 2, _FREQUENCY_SPECS)) for code in FREQUENCY_TYPES]
+    )
+    
+    def _parse_legacy_frequency(self, airport_icao: str, row_code: str, values: tuple) -> FrequencyRecord:
+        frequency, name = values
+        return FrequencyRecord(airport_icao, FREQUENCY_TYPES[row_code], frequency * 10, name)
+    
+    def _parse_frequency(self, airport_icao: str, row_code: str, values: tuple) -> FrequencyRecord:
+        frequency, name = values
+        return FrequencyRecord(airport_icao, FREQUENCY_TYPES[row_code[2:]], frequency, name)
+
+class GateParser(AptDatParser):
+    """
+    1300 47.44314 -122.29860 270.00 gate jets|turboprops A2
+    1301 C airline AAL UAL
+    15 47.44314 -122.29860 270.00 Gate A2      旧格式
+    """
+    
+    table_name = 'gates'
+    data_label = '停机位'
+    
+    row_handlers = {
+        '1300': ('_parse_startup_location', 5, (
+            FieldSpec('latitude', 1, 'float', validator=is_latitude),
+            FieldSpec('longitude', 2, 'float', validator=is_longitude),
+            FieldSpec('heading', 3, 'float'),
+            FieldSpec('location_type', 4),
+            FieldSpec('aircraft_types', 5),
+            FieldSpec('name', 6, 'rest'),
+        )),
+        # 紧跟在1300之后，补充该停机位的元数据
+        '1301': ('_parse_startup_metadata', 2, (
+            FieldSpec('icao_width', 1),
+            FieldSpec('operation_type', 2),
+            FieldSpec('airlines', 3, 'rest'),
+        )),
+        '15': ('_parse_legacy_startup_location', 4, (
+            FieldSpec('latitude', 1, 'float', validator=is_latitude),
+            FieldSpec('longitude', 2, 'float', validator=is_longitude),
+            FieldSpec('heading', 3, 'float'),
+            FieldSpec('name', 4, 'rest'),
+        )),
+    }
+    
+    def __init__(self, file_path: str, workers: int = 1):
+        super().__init__(file_path, workers)
+        # 等待1301元数据的停机位，遇到下一个停机位或机场分段结束时输出
+        self._pending: Optional[GateRecord] = None
+    
+    def _parse_startup_location(self, airport_icao: str, row_code: str, values: tuple) -> Optional[GateRecord]:
+        latitude, longitude, heading, location_type, aircraft_types, name = values
+        previous, self._pending = self._pending, GateRecord(
+            airport_icao, latitude, longitude, heading, location_type,
+            aircraft_types or None, name, None, None, None)
+        return previous
+    
+    def _parse_legacy_startup_location(self, airport_icao: str, row_code: str,
+                                       values: tuple) -> Optional[GateRecord]:
+        latitude, longitude, heading, name = values
+        previous, self._pending = self._pending, GateRecord(
+            airport_icao, latitude, longitude, heading, None, None, name, None, None, None)
+        return previous
+    
+    def _parse_startup_metadata(self, airport_icao: str, row_code: str, values: tuple) -> Optional[GateRecord]:
+        if self._pending is None:
+            # 前面没有对应的停机位
+            self._report_issue('invalid_field', 'icao_width', f"{airport_icao}: {row_code} {' '.join(values)}")
+            return None
+        icao_width, operation_type, airlines = values
+        record = self._pending._replace(icao_width=icao_width, operation_type=operation_type or None,
+                                        airlines=airlines or None)
+        self._pending = None
+        return record
+    
+    def _end_airport(self) -> Iterator[GateRecord]:
+        if self._pending is not None:
+            record, self._pending = self._pending, None
+            yield record
+    
+    def _discard_row(self, row_code: str) -> Iterator[GateRecord]:
+        # 无效的停机位行之后的1301属于被丢弃的停机位，先输出上一个停机位，1301作为孤立的元数据报告
+        if row_code in ('1300', '15'):
+            yield from self._end_airport()
+
+class AirportFacilityParser(AptDatParser):
+    """
+    一遍读取earth_apt.dat，同时输出跑道、频率和停机位记录 (按记录类型区分所属的表)
+    
+    各行代码由对应表的解析器处理，诊断信息也记在该解析器名下，与单独解析时一致
+    """
+    
+    data_label = '机场设施'
+    
+    table_parsers: Tuple[Type[AptDatParser], ...] = (RunwayParser, FrequencyParser, GateParser)
+    
+    row_handlers = {code: handler for parser_class in table_parsers
+                    for code, handler in parser_class.row_handlers.items()}
+    
+    def __init__(self, file_path: str, workers: int = 1):
+        self._table_parsers = [parser_class(file_path) for parser_class in self.table_parsers]
+        # 行代码 -> 处理该行的解析器
+        self._row_owners = {code: parser for parser in self._table_parsers for code in parser.row_handlers}
+        super().__init__(file_path, workers)
+    
+    @classmethod
+    def get_table_names(cls) -> List[str]:
+        return [parser_class.table_name for parser_class in cls.table_parsers]
+    
+    def _get_dispatch(self) -> Dict[str, Tuple[Callable[..., Optional[tuple]], Callable[..., tuple]]]:
+        dispatch = {}
+        for parser in self._table_parsers:
+            dispatch.update(parser._dispatch)
+        return dispatch
+    
+    def _end_airport(self) -> Iterator[tuple]:
+        for parser in self._table_parsers:
+            yield from parser._end_airport()
+    
+    def _discard_row(self, row_code: str) -> Iterator[tuple]:
+        owner = self._row_owners.get(row_code)
+        if owner is not None:
+            yield from owner._discard_row(row_code)
+    
+    def _report_row_issue(self, row_code: str, category: str, field: str, sample: str) -> None:
+        self._row_owners.get(row_code, self)._report_issue(category, field, sample)
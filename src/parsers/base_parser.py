@@ -1,57 +1,171 @@
 # -*- coding: utf-8 -*-
 import os
+import mmap
 import logging
-from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
+from .field_spec import FieldError, FieldCountError, compile_field_specs
+from .diagnostics import collect_diagnostics, get_diagnostics
 
-class BaseParser(ABC):
+# 解析器类 -> 编译后的字段转换函数
+_FIELD_CONVERTERS: Dict[type, Callable[..., tuple]] = {}
+
+def _parse_chunk(parser_class: type, file_path: str, start: int, end: int) -> List[tuple]:
+    """
+    进程池任务: 解析文件中 [start, end) 字节范围内的数据行
+    """
+    parser = parser_class(file_path)
+    return list(parser._parse_lines(parser._read_chunk_lines(start, end)))
+
+class BaseParser:
+    
+    # 对应sql_schemas中的表名
+    table_name = None
+    # 日志中使用的数据类型名称
+    data_label = '数据'
+    # 是否为逐行独立的格式，可以按字节范围分块并行解析
+    supports_chunking = False
+    # 小于该大小的文件不分块
+    chunk_min_bytes = 4 * 1024 * 1024
     
-    def __init__(self, file_path: str):
+    # 字段规格 (见 field_spec.FieldSpec)，为None时解析器自行转换字段
+    field_specs = None
+    # 数据行的最少字段数
+    min_fields = 0
+    # 字段规格与记录类型一一对应时指定，转换函数直接构造记录
+    record_type = None
+    # 由调用方额外传入、排在记录最前面的字段
+    field_spec_args = ()
+    # 非空字段无法转换时是否计入诊断信息
+    report_conversion_errors = True
+    
+    def __init__(self, file_path: str, workers: int = 1):
         self.file_path = file_path
+        # 分块并行解析的进程数，1为不分块
+        self.workers = workers
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._convert_fields = self.get_field_converter()
         
         # 验证文件是否存在
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"数据文件不存在: {file_path}")
     
+    def _open_mmap(self) -> Optional[mmap.mmap]:
+        """
+        以只读方式映射数据文件，空文件返回None
+        """
+        with open(self.file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def _get_data_range(self, mm: mmap.mmap) -> Tuple[int, int]:
+        """
+        定位文件头之后、99结束标记之前的数据字节范围
+        
+        X-Plane数据文件的文件头只出现在文件开头: 第一行为I或A (字节序标记)，
+        第二行为版本信息行；最后一个非空行为99结束标记
+        """
+        start = 0
+        mm.seek(0)
+        if mm.readline().strip() in (b'I', b'A'):
+            start = mm.tell()
+            if b'Version' in mm.readline():
+                start = mm.tell()
+        
+        # 结束标记是最后一个非空行
+        end = len(mm)
+        while end > start and mm[end - 1:end].isspace():
+            end -= 1
+        trailer_start = mm.rfind(b'\n', start, end) + 1 or start
+        if mm[trailer_start:end].strip() == b'99':
+            end = trailer_start
+        else:
+            end = len(mm)
+        
+        return start, end
+    
     def _read_file_lines(self) -> Iterator[str]:
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    
-                    # 跳过空行、注释行和结束标记
-                    if not line or line.startswith('I') or line.startswith('#'):
-                        continue
-                    
-                    # 跳过版本信息行
-                    if 'Version - data cycle' in line:
-                        continue
-                    
-                    # 跳过文件结束标记
-                    if line.strip() == '99':
-                        continue
-                    
-                    yield line
-                    
-        except UnicodeDecodeError:
-            # 如果UTF-8解码失败，尝试使用latin-1编码
-            self.logger.warning(f"UTF-8解码失败，尝试使用latin-1编码: {self.file_path}")
-            with open(self.file_path, 'r', encoding='latin-1') as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    
-                    if not line or line.startswith('I') or line.startswith('#'):
-                        continue
-                    
-                    if 'Version - data cycle' in line:
-                        continue
-                    
-                    # 跳过文件结束标记
-                    if line.strip() == '99':
-                        continue
-                    
-                    yield line
+        mm = self._open_mmap()
+        if mm is None:
+            return
+        
+        with mm:
+            start, end = self._get_data_range(mm)
+            yield from self._iter_mmap_lines(mm, start, end)
+    
+    def _read_chunk_lines(self, start: int, end: int) -> Iterator[str]:
+        """
+        读取 [start, end) 字节范围内的数据行，范围由 _get_chunk_ranges 生成，
+        已经排除了文件头和结束标记，边界对齐到行首
+        """
+        mm = self._open_mmap()
+        if mm is None:
+            return
+        
+        with mm:
+            yield from self._iter_mmap_lines(mm, start, end)
+    
+    def _iter_mmap_lines(self, mm: mmap.mmap, start: int, end: int) -> Iterator[str]:
+        """
+        在字节层面逐行扫描，只对数据行解码
+        
+        绝大多数行是ASCII，按UTF-8解码；个别无法解码的行单独使用latin-1，
+        不会从头重读文件，也不会重复输出已经读过的行
+        """
+        readline = mm.readline
+        position = start
+        mm.seek(start)
+        warned = False
+        
+        while position < end:
+            raw_line = readline()
+            position += len(raw_line)
+            line = raw_line.strip()
+            
+            # 跳过空行和注释行
+            if not line or line[0] == 35:  # '#'
+                continue
+            
+            # 文件末尾的结束标记已由 _get_data_range 排除，文件中间孤立的99行直接跳过，
+            # 不能提前结束读取，否则整文件读取和分块读取的结果不同
+            if line == b'99':
+                continue
+            
+            try:
+                yield line.decode('utf-8')
+            except UnicodeDecodeError:
+                if not warned:
+                    self.logger.warning(f"UTF-8解码失败，该行使用latin-1编码: {self.file_path}")
+                    warned = True
+                yield line.decode('latin-1')
+    
+    def _get_chunk_ranges(self, chunk_count: int) -> List[Tuple[int, int]]:
+        """
+        把数据区切分为约 chunk_count 个字节范围，每个范围的结束位置对齐到换行符之后
+        """
+        mm = self._open_mmap()
+        if mm is None:
+            return []
+        
+        ranges = []
+        with mm:
+            data_start, data_end = self._get_data_range(mm)
+            chunk_size = max((data_end - data_start) // chunk_count, 1)
+            
+            start = data_start
+            while start < data_end:
+                end = start + chunk_size
+                if end < data_end:
+                    # 移动到当前行的末尾，避免把一行切成两半
+                    newline = mm.find(b'\n', end, data_end)
+                    end = data_end if newline < 0 else newline + 1
+                else:
+                    end = data_end
+                ranges.append((start, end))
+                start = end
+        
+        return ranges
     
     def _split_line(self, line: str, delimiter: str = None) -> List[str]:
         if delimiter:
@@ -64,22 +178,142 @@ class BaseParser(ABC):
         try:
             return int(value) if value and value.strip() != '' else default
         except (ValueError, TypeError):
-            self.logger.warning(f"无法转换为整数: {value}, 使用默认值: {default}")
+            self._report_issue('conversion', 'int', f"{value!r} -> {default!r}")
             return default
     
     def _safe_float(self, value: str, default: float = 0.0) -> float:
         try:
             return float(value) if value and value.strip() != '' else default
         except (ValueError, TypeError):
-            self.logger.warning(f"无法转换为浮点数: {value}, 使用默认值: {default}")
+            self._report_issue('conversion', 'float', f"{value!r} -> {default!r}")
             return default
     
     def _safe_str(self, value: str, default: str = '') -> str:
         return value.strip() if value else default
     
-    @abstractmethod
-    def parse(self) -> List[Dict[str, Any]]:
-        pass
+    def _report_issue(self, category: str, field: str = '', sample: str = '') -> None:
+        """
+        记录一个数据问题，转换结束后统一汇总输出 (见 diagnostics)
+        
+        Args:
+            category: 问题类别，见 diagnostics.CATEGORY_LABELS
+            field: 相关字段名
+            sample: 示例 (通常是原始数据行)
+        """
+        get_diagnostics().record(self.__class__.__name__, category, field, sample)
+    
+    @classmethod
+    def get_field_converter(cls) -> Optional[Callable[..., tuple]]:
+        """
+        获取由 field_specs 编译的字段转换函数，每个解析器类只编译一次
+        """
+        if cls.field_specs is None:
+            return None
+        
+        converter = _FIELD_CONVERTERS.get(cls)
+        if converter is None:
+            converter = compile_field_specs(cls.field_specs, cls.min_fields, cls.record_type,
+                                            cls.field_spec_args, cls._get_conversion_error_handler())
+            _FIELD_CONVERTERS[cls] = converter
+        return converter
+    
+    @classmethod
+    def _get_conversion_error_handler(cls) -> Optional[Callable[[str, str, Any], None]]:
+        """
+        编译字段转换函数时使用的回调: 非空字段无法转换时计入诊断信息
+        """
+        if not cls.report_conversion_errors:
+            return None
+        parser_name = cls.__name__
+        
+        def on_conversion_error(name: str, value: str, default: Any) -> None:
+            get_diagnostics().record(parser_name, 'conversion', name, f"{value!r} -> {default!r}")
+        return on_conversion_error
+    
+    def _parse_line(self, line: str) -> Optional[tuple]:
+        """
+        解析单个数据行: 默认按空白切分后交给 field_specs 编译的转换函数，
+        字段数、必要字段和取值范围的校验都在转换函数中完成；需要额外处理的解析器覆盖此方法
+        """
+        if self._convert_fields is None:
+            raise NotImplementedError(f"{self.__class__.__name__} 没有定义 field_specs，需要实现 _parse_line")
+        return self._convert_fields(line.split())
+    
+    def _parse_lines(self, lines: Iterator[str]) -> Iterator[tuple]:
+        for line in lines:
+            try:
+                record = self._parse_line(line)
+            except FieldCountError:
+                self._report_issue('field_count', '', line)
+                continue
+            except FieldError as e:
+                self._report_issue('invalid_field', getattr(e, 'field_name', ''), line)
+                continue
+            except Exception as e:
+                self._report_issue('parse_error', type(e).__name__, f"{line} ({e})")
+                continue
+            
+            if record:
+                yield record
+    
+    def _iter_chunked_records(self) -> Iterator[tuple]:
+        """
+        把文件按字节范围分块，在进程池中并行解析，并按原始顺序拼接结果，
+        各块的诊断信息合并到主进程
+        """
+        ranges = self._get_chunk_ranges(self.workers)
+        self.logger.info(f"分 {len(ranges)} 块并行解析: {self.file_path}")
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(collect_diagnostics, _parse_chunk,
+                                       self.__class__, self.file_path, start, end)
+                       for start, end in ranges]
+            for future in futures:
+                records, diagnostics = future.result()
+                get_diagnostics().merge(diagnostics)
+                yield from records
+    
+    def _should_chunk(self) -> bool:
+        return (self.supports_chunking and self.workers > 1
+                and os.path.getsize(self.file_path) >= self.chunk_min_bytes)
+    
+    def iter_records(self) -> Iterator[tuple]:
+        """
+        逐条解析数据记录，不在内存中保留整个列表
+        
+        Returns:
+            Iterator[tuple]: 数据记录迭代器，记录类型见 record_types
+        """
+        if self._should_chunk():
+            records = self._iter_chunked_records()
+        else:
+            records = self._parse_lines(self._read_file_lines())
+        
+        count = 0
+        for record in records:
+            count += 1
+            yield record
+        
+        self.validate_count(count)
+    
+    def parse(self) -> List[tuple]:
+        """
+        解析整个数据文件
+        
+        Returns:
+            List[tuple]: 数据记录列表
+        """
+        return list(self.iter_records())
+    
+    def parse_columnar(self):
+        """
+        解析整个数据文件并直接填充到列式表中，内存占用远小于dict列表
+        
+        Returns:
+            ColumnarTable: 列式表
+        """
+        from columnar_table import ColumnarTable
+        return ColumnarTable.from_records(self.table_name, self.iter_records())
     
     def get_record_count(self) -> int:
         count = 0
@@ -87,10 +321,13 @@ class BaseParser(ABC):
             count += 1
         return count
     
-    def validate_data(self, records: List[Dict[str, Any]]) -> bool:
-        if not records:
+    def validate_data(self, records: List[tuple]) -> bool:
+        return self.validate_count(len(records) if records else 0)
+    
+    def validate_count(self, count: int) -> bool:
+        if not count:
             self.logger.warning("没有解析到任何数据记录")
             return False
         
-        self.logger.info(f"成功解析 {len(records)} 条记录")
+        self.logger.info(f"成功解析 {count} 条记录")
         return True
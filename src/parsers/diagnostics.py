@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+解析诊断信息汇总
+
+解析器不再对每个有问题的数据行写日志，而是按 (解析器, 类别, 字段) 计数，
+每类只保留少量示例行，转换结束后统一输出汇总
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 类别 -> 汇总中显示的名称
+CATEGORY_LABELS = {
+    'field_count': '字段不足',
+    'invalid_field': '字段无效',
+    'conversion': '类型转换失败',
+    'out_of_range': '超出有效范围',
+    'clamped': '数值被截断',
+    'parse_error': '解析异常',
+}
+
+class ParseDiagnostics:
+
+    def __init__(self, max_samples: int = 5):
+        # 每个 (解析器, 类别, 字段) 最多保留的示例行数
+        self.max_samples = max_samples
+        self.counts: Counter = Counter()
+        self.samples: Dict[Tuple[str, str, str], List[str]] = {}
+    
+    def record(self, parser_name: str, category: str, field: str = '', sample: str = '') -> None:
+        key = (parser_name, category, field)
+        self.counts[key] += 1
+        samples = self.samples.setdefault(key, [])
+        if sample and len(samples) < self.max_samples and sample not in samples:
+            samples.append(sample)
+    
+    def merge(self, other: 'ParseDiagnostics') -> None:
+        """
+        合并子进程返回的诊断信息
+        """
+        self.counts.update(other.counts)
+        for key, samples in other.samples.items():
+            merged = self.samples.setdefault(key, [])
+            for sample in samples:
+                if len(merged) >= self.max_samples:
+                    break
+                if sample not in merged:
+                    merged.append(sample)
+    
+    def clear(self) -> None:
+        self.counts.clear()
+        self.samples.clear()
+    
+    def drain(self) -> 'ParseDiagnostics':
+        """
+        取出当前的诊断信息并清空
+        """
+        drained = ParseDiagnostics(self.max_samples)
+        drained.merge(self)
+        self.counts.clear()
+        self.samples.clear()
+        return drained
+    
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+    
+    def to_dict(self, parser_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Args:
+            parser_name: 只返回该解析器的条目，None为全部
+        """
+        return [
+            {
+                'parser': name,
+                'category': category,
+                'field': field,
+                'count': count,
+                'samples': self.samples.get((name, category, field), [])
+            }
+            for (name, category, field), count in sorted(self.counts.items())
+            if parser_name is None or name == parser_name
+        ]
+    
+    def merge_items(self, items: List[Dict[str, Any]]) -> None:
+        """
+        合并 to_dict 格式的条目 (如解析缓存中保存的诊断信息)
+        """
+        for item in items:
+            key = (item['parser'], item['category'], item['field'])
+            self.counts[key] += item['count']
+            samples = self.samples.setdefault(key, [])
+            for sample in item['samples']:
+                if len(samples) < self.max_samples and sample not in samples:
+                    samples.append(sample)
+    
+    def log_summary(self, logger: logging.Logger) -> None:
+        if not self.counts:
+            logger.info("解析诊断: 未发现问题数据行")
+            return
+    
+        logger.warning(f"解析诊断汇总: 共 {self.total} 个问题")
+        for item in self.to_dict():
+            label = CATEGORY_LABELS.get(item['category'], item['category'])
+            field = item['field'] or '-'
+            logger.warning(f"  {item['parser']} / {label} / {field}: {item['count']} 次")
+            for sample in item['samples']:
+                logger.warning(f"      示例: {sample}")
+
+# 当前进程的诊断信息，子进程任务通过 collect_diagnostics 把自己的部分带回主进程
+_DIAGNOSTICS = ParseDiagnostics()
+
+def get_diagnostics() -> ParseDiagnostics:
+    return _DIAGNOSTICS
+
+def collect_diagnostics(func: Callable, *args: Any) -> Tuple[Any, ParseDiagnostics]:
+    """
+    进程池任务包装: 执行 func(*args)，并返回本任务产生的诊断信息
+    
+    fork出的子进程会继承父进程已有的计数，所以先清空
+    """
+    _DIAGNOSTICS.clear()
+    result = func(*args)
+    return result, _DIAGNOSTICS.drain()
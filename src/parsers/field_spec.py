@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+声明式字段规格
+
+每种数据格式用一组 FieldSpec 描述 "第几列、什么类型、默认值、如何校验"，
+compile_field_specs 把它们一次性编译成专用的转换函数: 转换器预先绑定，
+没有逐字段的方法调用和 len(fields) > n 判断，行解析只剩一次函数调用
+"""
+
+from typing import Any, Callable, NamedTuple, Optional, Sequence
+
+# missing 的默认值: 字段缺失时与字段为空时使用相同的默认值
+SAME_AS_DEFAULT = object()
+
+class FieldSpec(NamedTuple):
+    # 字段名，与记录类型的字段名一致
+    name: str
+    # 在按分隔符切分后的字段列表中的位置
+    index: int
+    # 类型: str / int / float / int_float (先转浮点再取整，如 "57.0") / rest (该列及之后所有列用空格连接)
+    kind: str = 'str'
+    # 字段为空或无法转换时的默认值，None表示使用类型的默认值
+    default: Any = None
+    # 校验函数，返回False时整行无效
+    validator: Optional[Callable[[Any], bool]] = None
+    # 行中没有该列时使用的值
+    missing: Any = SAME_AS_DEFAULT
+
+class FieldError(ValueError):
+    pass
+
+class FieldCountError(FieldError):
+    def __init__(self, count: int, min_fields: int):
+        super().__init__(f"数据字段不足: {count} < {min_fields}")
+        self.count = count
+        self.min_fields = min_fields
+
+class FieldValidationError(FieldError):
+    def __init__(self, field_name: str, value: Any):
+        super().__init__(f"数据字段无效: {field_name}={value!r}")
+        self.field_name = field_name
+        self.value = value
+
+def is_latitude(value: float) -> bool:
+    return -90 <= value <= 90
+
+def is_longitude(value: float) -> bool:
+    return -180 <= value <= 180
+
+def not_empty(value: str) -> bool:
+    return bool(value)
+
+def non_zero(value: int) -> bool:
+    return value != 0
+
+_KIND_DEFAULTS = {'str': '', 'rest': '', 'int': 0, 'float': 0.0, 'int_float': 0}
+
+_KIND_EXPRESSIONS = {
+    'int': 'int({value})',
+    'float': 'float({value})',
+    'int_float': 'int(float({value}))',
+}
+
+def _make_fallback(spec: FieldSpec, default: Any,
+                   on_conversion_error: Optional[Callable[[str, str, Any], None]]) -> Callable[[str], Any]:
+    """
+    转换失败时调用: 空值直接返回默认值，非空值先报告再返回默认值
+    """
+    name = spec.name
+
+    def fallback(value: str) -> Any:
+        if value.strip() and on_conversion_error is not None:
+            on_conversion_error(name, value, default)
+        return default
+
+    return fallback
+
+def compile_field_specs(specs: Sequence[FieldSpec], min_fields: int = 0,
+                        record_type: type = None, arg_fields: Sequence[str] = (),
+                        on_conversion_error: Optional[Callable[[str, str, Any], None]] = None
+                        ) -> Callable[..., tuple]:
+    """
+    把字段规格编译为转换函数
+
+    Args:
+        specs: 字段规格，顺序即输出顺序
+        min_fields: 最少字段数，不足时抛出 FieldCountError；
+                    序号不小于该值的字段视为可选，缺失时使用 missing
+        record_type: 记录类型，指定时直接构造记录，否则返回普通元组
+        arg_fields: 不来自字段列表、由调用方作为额外参数传入的值，排在输出最前面
+        on_conversion_error: 非空值无法转换时的回调 (字段名, 原始值, 默认值)
+
+    Returns:
+        Callable: convert(fields, *args)
+    """
+    namespace = {'FieldCountError': FieldCountError, 'FieldValidationError': FieldValidationError,
+                 '_record_type': record_type, '_tuple_new': tuple.__new__}
+    lines = [f"def convert(fields{''.join(', ' + name for name in arg_fields)}):"]
+
+    needs_count = min_fields > 0 or any(spec.index >= min_fields for spec in specs)
+    if needs_count:
+        lines.append("    count = len(fields)")
+    if min_fields > 0:
+        lines.append(f"    if count < {min_fields}:")
+        lines.append(f"        raise FieldCountError(count, {min_fields})")
+
+    output_names = list(arg_fields)
+    for position, spec in enumerate(specs):
+        variable = f"v{position}"
+        default = _KIND_DEFAULTS[spec.kind] if spec.default is None else spec.default
+        missing = default if spec.missing is SAME_AS_DEFAULT else spec.missing
+        namespace[f"_default{position}"] = default
+        namespace[f"_missing{position}"] = missing
+
+        value = f"fields[{spec.index}]"
+        if spec.kind == 'rest':
+            body = [f"{variable} = ' '.join(fields[{spec.index}:])"]
+        elif spec.kind == 'str':
+            body = [f"{variable} = {value} or _default{position}" if default else f"{variable} = {value}"]
+        else:
+            namespace[f"_fallback{position}"] = _make_fallback(spec, default, on_conversion_error)
+            body = ["try:",
+                    f"    {variable} = {_KIND_EXPRESSIONS[spec.kind].format(value=value)}",
+                    "except ValueError:",
+                    f"    {variable} = _fallback{position}({value})"]
+
+        if spec.index >= min_fields:
+            lines.append(f"    if count > {spec.index}:")
+            lines.extend("        " + line for line in body)
+            lines.append("    else:")
+            lines.append(f"        {variable} = _missing{position}")
+        else:
+            lines.extend("    " + line for line in body)
+
+        if spec.validator is not None:
+            namespace[f"_validate{position}"] = spec.validator
+            lines.append(f"    if not _validate{position}({variable}):")
+            lines.append(f"        raise FieldValidationError({spec.name!r}, {variable})")
+
+        output_names.append(variable)
+
+    values = ', '.join(output_names) + (',' if len(output_names) == 1 else '')
+    if record_type is not None:
+        lines.append(f"    return _tuple_new(_record_type, ({values}))")
+    else:
+        lines.append(f"    return ({values})")
+
+    # 生成的代码带上记录类型名，性能分析结果中可以区分各解析器的转换函数
+    source_name = f"<field_spec {record_type.__name__ if record_type is not None else 'tuple'}>"
+    exec(compile('\n'.join(lines), source_name, 'exec'), namespace)
+    return namespace['convert']
@@ -1,32 +1,35 @@
 # -*- coding: utf-8 -*-
 
-from typing import List, Dict, Any
+from typing import Optional
+from record_types import HoldingRecord
 from .base_parser import BaseParser
+from .field_spec import FieldSpec, not_empty
 
 class HoldingParser(BaseParser):
     
-    def parse(self) -> List[Dict[str, Any]]:
-        """
-        解析等待航线数据文件
-        
-        Returns:
-            List[Dict[str, Any]]: 等待航线数据记录列表
-        """
-        records = []
-        
-        for line in self._read_file_lines():
-            try:
-                record = self._parse_holding_line(line)
-                if record:
-                    records.append(record)
-            except Exception as e:
-                self.logger.error(f"解析等待航线数据行失败: {line}, 错误: {e}")
-                continue
-        
-        self.validate_data(records)
-        return records
+    table_name = 'holdings'
+    data_label = '等待航线'
     
-    def _parse_holding_line(self, line: str) -> Dict[str, Any]:
+    min_fields = 11
+    record_type = HoldingRecord
+    field_specs = (
+        FieldSpec('waypoint_name', 0, validator=not_empty),
+        FieldSpec('region_code', 1),
+        FieldSpec('airport_icao', 2, validator=not_empty),
+        FieldSpec('section_code', 3, 'int'),
+        FieldSpec('inbound_course', 4, 'float'),
+        FieldSpec('turn_direction', 5, 'float'),
+        FieldSpec('leg_length', 6, 'float'),
+        FieldSpec('leg_type', 7, default='R'),
+        FieldSpec('min_altitude', 8, 'int'),
+        FieldSpec('max_altitude', 9, 'int'),
+        FieldSpec('speed_limit', 10, 'int'),
+    )
+    
+    def _parse_line(self, line: str) -> Optional[HoldingRecord]:
+        return self._parse_holding_line(line)
+    
+    def _parse_holding_line(self, line: str) -> Optional[HoldingRecord]:
         """
         解析单行等待航线数据
         
@@ -34,50 +37,16 @@ class HoldingParser(BaseParser):
             line: 数据行
             
         Returns:
-            Dict[str, Any]: 等待航线数据记录
+            HoldingRecord: 等待航线数据记录
         """
-        fields = self._split_line(line)
-        
-        if len(fields) < 11:
-            self.logger.warning(f"等待航线数据字段不足: {line}")
-            return None
-        
-        # 解析基本字段
-        waypoint_name = self._safe_str(fields[0])
-        region_code = self._safe_str(fields[1])
-        airport_icao = self._safe_str(fields[2])
-        section_code = self._safe_int(fields[3])
-        inbound_course = self._safe_float(fields[4])
-        turn_direction = self._safe_float(fields[5])
-        leg_length = self._safe_float(fields[6])
-        leg_type = self._safe_str(fields[7], 'R')
-        min_altitude = self._safe_int(fields[8])
-        max_altitude = self._safe_int(fields[9])
-        speed_limit = self._safe_int(fields[10])
-        
-        # 验证必要字段
-        if not waypoint_name or not airport_icao:
-            self.logger.warning(f"等待点名称或机场代码为空: {line}")
-            return None
+        record = self._convert_fields(line.split())
         
         # 验证航向范围
-        if not (0 <= inbound_course <= 360):
-            self.logger.warning(f"入航道向超出有效范围: {waypoint_name}, course={inbound_course}")
+        if not (0 <= record.inbound_course <= 360):
+            self._report_issue('out_of_range', 'inbound_course', line)
         
         # 验证高度范围
-        if min_altitude > max_altitude and max_altitude > 0:
-            self.logger.warning(f"最低高度大于最高高度: {waypoint_name}, min={min_altitude}, max={max_altitude}")
+        if record.min_altitude > record.max_altitude and record.max_altitude > 0:
+            self._report_issue('out_of_range', 'min_altitude', line)
         
-        return {
-            'waypoint_name': waypoint_name,
-            'region_code': region_code,
-            'airport_icao': airport_icao,
-            'section_code': section_code,
-            'inbound_course': inbound_course,
-            'turn_direction': turn_direction,
-            'leg_length': leg_length,
-            'leg_type': leg_type,
-            'min_altitude': min_altitude,
-            'max_altitude': max_altitude,
-            'speed_limit': speed_limit
-        }
+        return record
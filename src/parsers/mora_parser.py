@@ -1,30 +1,16 @@
 # -*- coding: utf-8 -*-
-from typing import List, Dict, Any
+from typing import Optional
+from record_types import MoraRecord
 from .base_parser import BaseParser
 
 class MoraParser(BaseParser):
-    def parse(self) -> List[Dict[str, Any]]:
-        """
-        解析MORA数据文件
-        
-        Returns:
-            List[Dict[str, Any]]: MORA数据记录列表
-        """
-        records = []
-        
-        for line in self._read_file_lines():
-            try:
-                record = self._parse_mora_line(line)
-                if record:
-                    records.append(record)
-            except Exception as e:
-                self.logger.error(f"解析MORA数据行失败: {line}, 错误: {e}")
-                continue
-        
-        self.validate_data(records)
-        return records
+    table_name = 'mora'
+    data_label = 'MORA'
+    
+    def _parse_line(self, line: str) -> Optional[MoraRecord]:
+        return self._parse_mora_line(line)
     
-    def _parse_mora_line(self, line: str) -> Dict[str, Any]:
+    def _parse_mora_line(self, line: str) -> Optional[MoraRecord]:
         """
         解析单行MORA数据
         
@@ -32,12 +18,12 @@ class MoraParser(BaseParser):
             line: 数据行
             
         Returns:
-            Dict[str, Any]: MORA数据记录
+            MoraRecord: MORA数据记录
         """
         fields = self._split_line(line)
         
         if len(fields) < 32:  # 2个坐标字段 + 30个高度值
-            self.logger.warning(f"MORA数据字段不足: {line}")
+            self._report_issue('field_count', '', line)
             return None
         
         # 解析坐标字段
@@ -50,11 +36,11 @@ class MoraParser(BaseParser):
         
         # 验证坐标范围
         if latitude_deg is None or longitude_deg is None:
-            self.logger.warning(f"MORA坐标格式错误: {lat_str}, {lon_str}")
+            self._report_issue('invalid_field', 'latitude_deg' if latitude_deg is None else 'longitude_deg', line)
             return None
         
         if not (-90 <= latitude_deg <= 90) or not (-180 <= longitude_deg <= 180):
-            self.logger.warning(f"MORA坐标超出有效范围: lat={latitude_deg}, lon={longitude_deg}")
+            self._report_issue('out_of_range', 'latitude_deg' if not (-90 <= latitude_deg <= 90) else 'longitude_deg', line)
             return None
         
         # 提取高度数据 (30个值)
@@ -63,20 +49,20 @@ class MoraParser(BaseParser):
         # 验证高度数据
         height_values = fields[2:32]
         if len(height_values) != 30:
-            self.logger.warning(f"MORA网格数据不足30个值: {len(height_values)}")
+            self._report_issue('field_count', 'grid_data', line)
             return None
         
         # 验证所有高度值都是数字
         for i, height in enumerate(height_values):
             if not height.isdigit():
-                self.logger.warning(f"MORA高度值不是数字: 位置{i}, 值={height}")
+                self._report_issue('invalid_field', 'grid_data', line)
                 return None
         
-        return {
-            'latitude_deg': latitude_deg,
-            'longitude_deg': longitude_deg,
-            'grid_data': grid_data
-        }
+        return MoraRecord(
+            latitude_deg=latitude_deg,
+            longitude_deg=longitude_deg,
+            grid_data=grid_data
+        )
     
     def _parse_coordinate(self, coord_str: str) -> int:
         """
@@ -1,30 +1,27 @@
 # -*- coding: utf-8 -*-
-from typing import List, Dict, Any
+from typing import Optional
+from record_types import MsaRecord
 from .base_parser import BaseParser
+from .field_spec import FieldSpec, not_empty
 
 class MsaParser(BaseParser):
-    def parse(self) -> List[Dict[str, Any]]:
-        """
-        解析MSA数据文件
-        
-        Returns:
-            List[Dict[str, Any]]: MSA数据记录列表
-        """
-        records = []
-        
-        for line in self._read_file_lines():
-            try:
-                record = self._parse_msa_line(line)
-                if record:
-                    records.append(record)
-            except Exception as e:
-                self.logger.error(f"解析MSA数据行失败: {line}, 错误: {e}")
-                continue
-        
-        self.validate_data(records)
-        return records
+    table_name = 'msa'
+    data_label = 'MSA'
+    
+    # 扇区数据个数不定，只有前5列由字段规格描述
+    min_fields = 6
+    field_specs = (
+        FieldSpec('sector_count', 0, 'int'),
+        FieldSpec('navaid_identifier', 1, validator=not_empty),
+        FieldSpec('region_code', 2),
+        FieldSpec('airport_icao', 3, validator=not_empty),
+        FieldSpec('msa_type', 4, default='M'),
+    )
     
-    def _parse_msa_line(self, line: str) -> Dict[str, Any]:
+    def _parse_line(self, line: str) -> Optional[MsaRecord]:
+        return self._parse_msa_line(line)
+    
+    def _parse_msa_line(self, line: str) -> Optional[MsaRecord]:
         """
         解析单行MSA数据
         
@@ -32,59 +29,31 @@ class MsaParser(BaseParser):
             line: 数据行
             
         Returns:
-            Dict[str, Any]: MSA数据记录
+            MsaRecord: MSA数据记录
         """
-        fields = self._split_line(line)
-        
-        if len(fields) < 6:
-            self.logger.warning(f"MSA数据字段不足: {line}")
-            return None
+        fields = line.split()
         
         # 解析基本字段
-        sector_count = self._safe_int(fields[0])
-        navaid_identifier = self._safe_str(fields[1])
-        region_code = self._safe_str(fields[2])
-        airport_icao = self._safe_str(fields[3])
-        msa_type = self._safe_str(fields[4], 'M')
-        
-        # 验证必要字段
-        if not navaid_identifier or not airport_icao:
-            self.logger.warning(f"导航台标识符或机场代码为空: {line}")
-            return None
+        sector_count, navaid_identifier, region_code, airport_icao, msa_type = self._convert_fields(fields)
         
         # 验证扇区数量，如果超过3，只处理前3个
         if sector_count < 1:
-            self.logger.warning(f"MSA扇区数量无效: {sector_count}")
+            self._report_issue('invalid_field', 'sector_count', line)
             return None
         
         # 限制最大扇区数量为3
         if sector_count > 3:
-            self.logger.info(f"MSA扇区数量超过3，只处理前3个: {sector_count}")
+            self._report_issue('clamped', 'sector_count', line)
             sector_count = 3
         
-        # 初始化记录
-        record = {
-            'sector_count': sector_count,
-            'navaid_identifier': navaid_identifier,
-            'region_code': region_code,
-            'airport_icao': airport_icao,
-            'msa_type': msa_type,
-            'sector1_bearing': None,
-            'sector1_altitude': None,
-            'sector1_radius': None,
-            'sector2_bearing': None,
-            'sector2_altitude': None,
-            'sector2_radius': None,
-            'sector3_bearing': None,
-            'sector3_altitude': None,
-            'sector3_radius': None
-        }
+        # 三个扇区的方位、高度、半径，按扇区号排列
+        sectors = [None] * 9
         
         # 解析扇区数据
         field_index = 5
         actual_sectors = 0
         
-        for sector_num in range(1, sector_count + 1):
+        for sector_num in range(sector_count):
             if field_index + 2 < len(fields):
                 bearing = self._safe_int(fields[field_index])
                 altitude = self._safe_int(fields[field_index + 1])
@@ -92,9 +61,7 @@ class MsaParser(BaseParser):
                 
                 # 检查是否是有效的扇区数据
                 if bearing != 0 or altitude != 0 or radius != 0:
-                    record[f'sector{sector_num}_bearing'] = bearing
-                    record[f'sector{sector_num}_altitude'] = altitude
-                    record[f'sector{sector_num}_radius'] = radius
+                    sectors[sector_num * 3:sector_num * 3 + 3] = bearing, altitude, radius
                     actual_sectors += 1
                 
                 field_index += 3
@@ -102,7 +69,5 @@ class MsaParser(BaseParser):
                 # 字段不足，可能是单扇区数据
                 break
         
-        # 更新实际扇区数量
-        record['sector_count'] = actual_sectors
-        
-        return record
+        # 扇区数量为实际有效的扇区数
+        return MsaRecord(actual_sectors, navaid_identifier, region_code, airport_icao, msa_type, *sectors)
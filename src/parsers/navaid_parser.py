@@ -1,31 +1,37 @@
 # -*- coding: utf-8 -*-
-from typing import List, Dict, Any
+from typing import Optional
+from record_types import NavaidRecord
 from .base_parser import BaseParser
+from .field_spec import FieldSpec, is_latitude, is_longitude, non_zero, not_empty
 
 class NavaidParser(BaseParser):
     
-    def parse(self) -> List[Dict[str, Any]]:
-        """
-        解析导航设备数据文件
-        
-        Returns:
-            List[Dict[str, Any]]: 导航设备数据记录列表
-        """
-        records = []
-        
-        for line in self._read_file_lines():
-            try:
-                record = self._parse_navaid_line(line)
-                if record:
-                    records.append(record)
-            except Exception as e:
-                self.logger.error(f"解析导航设备数据行失败: {line}, 错误: {e}")
-                continue
-        
-        self.validate_data(records)
-        return records
+    table_name = 'navaids'
+    data_label = '导航设备'
+    supports_chunking = True
+    
+    min_fields = 11
+    record_type = NavaidRecord
+    field_specs = (
+        FieldSpec('nav_type', 0, 'int', validator=non_zero),
+        FieldSpec('latitude', 1, 'float', validator=is_latitude),
+        FieldSpec('longitude', 2, 'float', validator=is_longitude),
+        FieldSpec('elevation', 3, 'int'),
+        # 先转浮点数再转整数，处理57.0这种格式
+        FieldSpec('frequency', 4, 'int_float'),
+        FieldSpec('range_nm', 5, 'int_float'),
+        FieldSpec('magnetic_variation', 6, 'float'),
+        FieldSpec('identifier', 7, validator=not_empty),
+        FieldSpec('usage_type', 8),
+        FieldSpec('region_code', 9),
+        # 名称可能包含空格
+        FieldSpec('name', 10, 'rest'),
+    )
     
-    def _parse_navaid_line(self, line: str) -> Dict[str, Any]:
+    def _parse_line(self, line: str) -> Optional[NavaidRecord]:
+        return self._parse_navaid_line(line)
+    
+    def _parse_navaid_line(self, line: str) -> Optional[NavaidRecord]:
         """
         解析单行导航设备数据
         
@@ -33,56 +39,15 @@ class NavaidParser(BaseParser):
             line: 数据行
             
         Returns:
-            Dict[str, Any]: 导航设备数据记录
+            NavaidRecord: 导航设备数据记录
         """
-        fields = self._split_line(line)
-        
-        if len(fields) < 11:
-            self.logger.warning(f"导航设备数据字段不足: {line}")
-            return None
-        
-        # 解析基本字段
-        nav_type = self._safe_int(fields[0])
-        latitude = self._safe_float(fields[1])
-        longitude = self._safe_float(fields[2])
-        elevation = self._safe_int(fields[3])
-        frequency = int(self._safe_float(fields[4]))  # 先转浮点数再转整数，处理57.0这种格式
-        range_nm = int(self._safe_float(fields[5]))   # 同样处理
-        magnetic_variation = self._safe_float(fields[6])
-        identifier = self._safe_str(fields[7])
-        usage_type = self._safe_str(fields[8])
-        region_code = self._safe_str(fields[9])
-        
-        # 名称可能包含空格，需要特殊处理
-        name = ' '.join(fields[10:]) if len(fields) > 10 else ''
+        record = self._convert_fields(line.split())
         
-        # 验证必要字段
-        if not identifier or nav_type == 0:
-            self.logger.warning(f"导航台标识符或类型为空: {line}")
-            return None
+        # 验证频率范围（根据导航设备类型），超出范围只警告
+        if not self._validate_frequency(record.nav_type, record.frequency):
+            self._report_issue('out_of_range', 'frequency', line)
         
-        # 验证坐标范围
-        if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
-            self.logger.warning(f"导航台坐标超出有效范围: {identifier}, lat={latitude}, lon={longitude}")
-            return None
-        
-        # 验证频率范围（根据导航设备类型）
-        if not self._validate_frequency(nav_type, frequency):
-            self.logger.warning(f"导航台频率超出有效范围: {identifier}, type={nav_type}, freq={frequency}")
-        
-        return {
-            'nav_type': nav_type,
-            'latitude': latitude,
-            'longitude': longitude,
-            'elevation': elevation,
-            'frequency': frequency,
-            'range_nm': range_nm,
-            'magnetic_variation': magnetic_variation,
-            'identifier': identifier,
-            'usage_type': usage_type,
-            'region_code': region_code,
-            'name': name
-        }
+        return record
     
     def _validate_frequency(self, nav_type: int, frequency: int) -> bool:
         """
@@ -1,16 +1,104 @@
 # -*- coding: utf-8 -*-
 
 import os
-from typing import List, Dict, Any
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from record_types import TerminalProcedureRecord
+from metrics import get_metrics
 from .base_parser import BaseParser
+from .diagnostics import ParseDiagnostics, get_diagnostics
+from .field_spec import FieldSpec
+
+def _parse_airport_job(cifp_directory: str, file_path: str,
+                       airport_icao: str) -> Tuple[List[TerminalProcedureRecord], float, Optional[str], list]:
+    """
+    进程池任务: 解析单个机场文件，异常在子进程内捕获，只影响该机场
+    
+    Returns:
+        Tuple: (记录列表, 耗时秒数, 错误信息, 该机场的诊断信息 (to_dict 格式))
+    """
+    start_time = time.perf_counter()
+    parser = TerminalParser(cifp_directory)
+    # 各机场的诊断信息单独收集，随解析结果保存到清单中
+    parser.airport_diagnostics = ParseDiagnostics()
+    try:
+        records = parser.parse_airport(file_path, airport_icao)
+    except Exception as e:
+        return [], time.perf_counter() - start_time, str(e), parser.airport_diagnostics.to_dict()
+    return records, time.perf_counter() - start_time, None, parser.airport_diagnostics.to_dict()
 
 class TerminalParser(BaseParser):
-    def __init__(self, cifp_directory: str):
+    table_name = 'terminal_procedures'
+    
+    # 少于10个字段的行在 _parse_terminal_line 中直接跳过，之后的列都可能缺失；
+    # 参考导航台段落代码和坐标类字段缺失时为NULL，存在但为空时为0
+    min_fields = 10
+    record_type = TerminalProcedureRecord
+    field_spec_args = ('airport_icao', 'procedure_type', 'sequence_number')
+    # 段落代码等字段在CIFP中常为字母，转换为默认值属于正常情况
+    report_conversion_errors = False
+    field_specs = (
+        FieldSpec('route_type', 1, 'int'),
+        FieldSpec('procedure_name', 2),
+        FieldSpec('transition_name', 3),
+        FieldSpec('waypoint_name', 4),
+        FieldSpec('waypoint_region', 5),
+        FieldSpec('waypoint_section', 6, 'int'),
+        FieldSpec('waypoint_type', 7),
+        FieldSpec('waypoint_description', 8),
+        FieldSpec('path_terminator', 12),
+        # 参考导航台信息
+        FieldSpec('ref_navaid_identifier', 14),
+        FieldSpec('ref_navaid_region', 15),
+        FieldSpec('ref_navaid_section', 16, 'int', missing=None),
+        FieldSpec('ref_navaid_type', 17),
+        # 坐标和距离信息
+        FieldSpec('theta', 19, 'float', missing=None),
+        FieldSpec('rho', 20, 'float', missing=None),
+        FieldSpec('magnetic_course', 21, 'float', missing=None),
+        FieldSpec('distance_time', 22),
+        # 高度限制
+        FieldSpec('altitude_description', 24),
+        FieldSpec('altitude1', 25),
+        FieldSpec('altitude2', 26),
+        FieldSpec('transition_altitude', 27),
+        # 速度限制
+        FieldSpec('speed_limit', 29),
+        # 其他参数
+        FieldSpec('vertical_angle', 31, 'float', missing=None),
+        FieldSpec('center_fix', 32),
+        FieldSpec('multiple_code', 33),
+        FieldSpec('gnss_fms_indication', 34),
+    )
+    
+    def __init__(self, cifp_directory: str, workers: int = 1, manifest=None, changed_only: bool = False):
         """
         初始化
+        
+        Args:
+            cifp_directory: CIFP目录
+            workers: 并行解析机场文件的进程数
+            manifest: 按机场的清单 (parse_cache.CifpManifest)，只重新解析新增或变化的机场
+            changed_only: 只输出新增或变化机场的记录，需要manifest
         """
         self.cifp_directory = cifp_directory
+        # 并行解析机场文件的进程数，1为串行
+        self.workers = workers
+        self.manifest = manifest
+        self.changed_only = changed_only
+        # 与清单对比的结果，第一次使用时计算
+        self._airport_plan = None
         self.logger = self._setup_logger()
+        self._convert_fields = self.get_field_converter()
+        # 各机场的解析耗时 (秒)
+        self.airport_timings: Dict[str, float] = {}
+        # 解析失败的机场，按解析顺序
+        self.failed_airports: List[str] = []
+        # 不为None时诊断信息记在这里，而不是当前进程的全局诊断信息中
+        self.airport_diagnostics: Optional[ParseDiagnostics] = None
         
         if not os.path.exists(cifp_directory):
             raise FileNotFoundError(f"CIFP目录不存在: {cifp_directory}")
@@ -19,33 +107,184 @@ class TerminalParser(BaseParser):
         import logging
         return logging.getLogger(self.__class__.__name__)
     
-    def parse_all_airports(self) -> List[Dict[str, Any]]:
+    def _report_issue(self, category: str, field: str = '', sample: str = '') -> None:
+        if self.airport_diagnostics is None:
+            super()._report_issue(category, field, sample)
+        else:
+            self.airport_diagnostics.record(self.__class__.__name__, category, field, sample)
+    
+    def parse_all_airports(self) -> List[TerminalProcedureRecord]:
         """
         解析所有机场的终端程序数据
         
         Returns:
-            List[Dict[str, Any]]: 所有终端程序数据记录列表
+            List[TerminalProcedureRecord]: 所有终端程序数据记录列表
+        """
+        return list(self.iter_records())
+    
+    def list_airport_files(self) -> List[Tuple[str, str]]:
+        """
+        列出CIFP目录中的机场文件，按ICAO代码排序，保证输出顺序确定
+        
+        Returns:
+            List[Tuple[str, str]]: (机场ICAO代码, 文件路径) 列表
+        """
+        with os.scandir(self.cifp_directory) as entries:
+            airport_files = [(entry.name[:-4], entry.path) for entry in entries
+                             if entry.name.endswith('.dat') and entry.is_file()]
+        airport_files.sort()
+        return airport_files
+    
+    def iter_records(self) -> Iterator[TerminalProcedureRecord]:
         """
-        all_records = []
+        按机场逐个解析终端程序数据，同一时间只保留一个机场的记录
         
-        # 遍历CIFP目录中的所有.dat文件
-        for filename in os.listdir(self.cifp_directory):
-            if filename.endswith('.dat'):
-                airport_icao = filename[:-4]  # 移除.dat扩展名
-                file_path = os.path.join(self.cifp_directory, filename)
-                
-                try:
-                    records = self.parse_airport(file_path, airport_icao)
-                    all_records.extend(records)
-                    self.logger.info(f"成功解析机场 {airport_icao}: {len(records)} 条记录")
-                except Exception as e:
-                    self.logger.error(f"解析机场 {airport_icao} 失败: {e}")
+        Returns:
+            Iterator[TerminalProcedureRecord]: 终端程序数据记录迭代器
+        """
+        if self.manifest is None:
+            results = self._iter_airport_results(self.list_airport_files())
+        else:
+            results = self._iter_incremental_results()
+        total_records = 0
+        
+        for airport_icao, records, elapsed, error, diagnostics in results:
+            get_diagnostics().merge_items(diagnostics)
+            if elapsed is None:
+                # 清单中未变化的机场
+                self.logger.debug(f"复用机场 {airport_icao} 的解析结果: {len(records)} 条记录")
+            else:
+                self.airport_timings[airport_icao] = elapsed
+                if error is not None:
+                    self.logger.error(f"解析机场 {airport_icao} 失败: {error}")
+                    self.failed_airports.append(airport_icao)
                     continue
+                self.logger.info(f"成功解析机场 {airport_icao}: {len(records)} 条记录, 耗时 {elapsed:.3f} 秒")
+                get_metrics().record_airport(airport_icao, elapsed, len(records))
+            
+            total_records += len(records)
+            yield from records
         
-        self.logger.info(f"总共解析 {len(all_records)} 条终端程序记录")
-        return all_records
+        self.logger.info(f"总共解析 {total_records} 条终端程序记录")
     
-    def parse_airport(self, file_path: str, airport_icao: str) -> List[Dict[str, Any]]:
+    def get_airport_changes(self) -> Tuple[List[str], List[str]]:
+        """
+        与清单对比机场文件，没有清单时所有机场都视为新增
+        
+        Returns:
+            Tuple[List[str], List[str]]: (新增或变化的机场, 已删除的机场)
+        """
+        if self.manifest is None:
+            return [airport_icao for airport_icao, _ in self.list_airport_files()], []
+        
+        plan = self._get_airport_plan()
+        return plan['changed'], plan['removed']
+    
+    def iter_stored_records(self, airport_icaos: List[str]) -> Iterator[TerminalProcedureRecord]:
+        """
+        按给定顺序读取清单中各机场的记录 (解析结果已由 iter_records 写入清单)
+        """
+        try:
+            for airport_icao in airport_icaos:
+                yield from self.manifest.get_airport(airport_icao)[0]
+        finally:
+            self.manifest.close()
+    
+    def _get_airport_plan(self) -> Dict[str, Any]:
+        """
+        计算各机场文件的指纹并与清单对比；大小和修改时间不变时沿用清单中的内容哈希
+        """
+        if self._airport_plan is not None:
+            return self._airport_plan
+        
+        airport_files = self.list_airport_files()
+        stored = self.manifest.load_fingerprints()
+        fingerprints = {}
+        changed = []
+        touched = []
+        
+        for airport_icao, file_path in airport_files:
+            stat = os.stat(file_path)
+            stat_signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+            stored_signature, stored_hash, stored_version = stored.get(airport_icao, (None, None, None))
+            
+            if stat_signature == stored_signature:
+                content_hash = stored_hash
+            else:
+                with open(file_path, 'rb') as file:
+                    content_hash = hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+            fingerprints[airport_icao] = (stat_signature, content_hash)
+            
+            if content_hash != stored_hash or stored_version != self.manifest.parser_version:
+                changed.append(airport_icao)
+            elif stat_signature != stored_signature:
+                touched.append(airport_icao)
+        
+        current = set(fingerprints)
+        self._airport_plan = {
+            'files': airport_files,
+            'fingerprints': fingerprints,
+            'changed': changed,
+            'touched': touched,
+            'removed': sorted(airport_icao for airport_icao in stored if airport_icao not in current)
+        }
+        return self._airport_plan
+    
+    def _iter_incremental_results(self) -> Iterator[tuple]:
+        """
+        只解析新增或变化的机场并写入清单，其余机场使用清单中的结果 (耗时为None)；
+        全部读取完后才提交清单，中途停止时清单保持不变
+        """
+        plan = self._get_airport_plan()
+        changed = set(plan['changed'])
+        self.logger.info(f"CIFP清单: {len(changed)} 个机场新增或变化, {len(plan['removed'])} 个已删除, "
+                         f"{len(plan['files']) - len(changed)} 个未变化")
+        
+        parsed = self._iter_airport_results([(airport_icao, file_path) for airport_icao, file_path
+                                             in plan['files'] if airport_icao in changed])
+        try:
+            for airport_icao, _ in plan['files']:
+                if airport_icao in changed:
+                    result = next(parsed)
+                    _, records, _, error, diagnostics = result
+                    # 解析失败的机场不写入清单，下次仍视为变化
+                    if error is None:
+                        self.manifest.put(airport_icao, *plan['fingerprints'][airport_icao], records, diagnostics)
+                    yield result
+                elif not self.changed_only:
+                    records, diagnostics = self.manifest.get_airport(airport_icao)
+                    yield airport_icao, records, None, None, diagnostics
+            
+            for airport_icao in plan['touched']:
+                self.manifest.touch(airport_icao, plan['fingerprints'][airport_icao][0])
+            self.manifest.remove(plan['removed'])
+            self.manifest.commit()
+        finally:
+            parsed.close()
+            self.manifest.close()
+    
+    def _iter_airport_results(self, airport_files: List[Tuple[str, str]]) -> Iterator[tuple]:
+        """
+        解析各机场文件，按输入顺序返回 (ICAO, 记录, 耗时, 错误信息, 诊断信息)
+        """
+        if self.workers <= 1 or len(airport_files) < 2:
+            for airport_icao, file_path in airport_files:
+                yield (airport_icao, *_parse_airport_job(self.cifp_directory, file_path, airport_icao))
+            return
+        
+        self.logger.info(f"使用 {self.workers} 个进程并行解析 {len(airport_files)} 个机场文件")
+        # 机场文件很小，按批分发以减少进程间通信次数
+        chunksize = max(1, len(airport_files) // (self.workers * 8))
+        icaos = [airport_icao for airport_icao, _ in airport_files]
+        paths = [file_path for _, file_path in airport_files]
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(_parse_airport_job, repeat(self.cifp_directory), paths, icaos,
+                                   chunksize=chunksize)
+            for airport_icao, result in zip(icaos, results):
+                yield (airport_icao, *result)
+    
+    def parse_airport(self, file_path: str, airport_icao: str) -> List[TerminalProcedureRecord]:
         """
         解析单个机场的终端程序数据
         
@@ -54,48 +293,39 @@ class TerminalParser(BaseParser):
             airport_icao: 机场ICAO代码
             
         Returns:
-            List[Dict[str, Any]]: 终端程序数据记录列表
+            List[TerminalProcedureRecord]: 终端程序数据记录列表
         """
         records = []
+        warned = False
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    
-                    # 跳过空行
-                    if not line:
-                        continue
-                    
-                    try:
-                        record = self._parse_terminal_line(line, airport_icao)
-                        if record:
-                            records.append(record)
-                    except Exception as e:
-                        self.logger.error(f"解析终端程序数据行失败 {file_path}:{line_num}: {line}, 错误: {e}")
-                        continue
-                        
-        except UnicodeDecodeError:
-            # 如果UTF-8解码失败，尝试使用latin-1编码
-            self.logger.warning(f"UTF-8解码失败，尝试使用latin-1编码: {file_path}")
-            with open(file_path, 'r', encoding='latin-1') as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    
-                    if not line:
-                        continue
-                    
-                    try:
-                        record = self._parse_terminal_line(line, airport_icao)
-                        if record:
-                            records.append(record)
-                    except Exception as e:
-                        self.logger.error(f"解析终端程序数据行失败 {file_path}:{line_num}: {line}, 错误: {e}")
-                        continue
+        # 按行解码: 个别无法按UTF-8解码的行单独使用latin-1，不重读文件，已解析的记录不会重复
+        with open(file_path, 'rb') as file:
+            for line_num, raw_line in enumerate(file, 1):
+                raw_line = raw_line.strip()
+                
+                # 跳过空行
+                if not raw_line:
+                    continue
+                
+                try:
+                    line = raw_line.decode('utf-8')
+                except UnicodeDecodeError:
+                    if not warned:
+                        self.logger.warning(f"UTF-8解码失败，该行使用latin-1编码: {file_path}")
+                        warned = True
+                    line = raw_line.decode('latin-1')
+                
+                try:
+                    record = self._parse_terminal_line(line, airport_icao)
+                    if record:
+                        records.append(record)
+                except Exception as e:
+                    self._report_issue('parse_error', type(e).__name__, f"{airport_icao}:{line_num}: {line} ({e})")
+                    continue
         
         return records
     
-    def _parse_terminal_line(self, line: str, airport_icao: str) -> Dict[str, Any]:
+    def _parse_terminal_line(self, line: str, airport_icao: str) -> Optional[TerminalProcedureRecord]:
         """
         解析单行终端程序数据
         
@@ -104,7 +334,7 @@ class TerminalParser(BaseParser):
             airport_icao: 机场ICAO代码
             
         Returns:
-            Dict[str, Any]: 终端程序数据记录
+            TerminalProcedureRecord: 终端程序数据记录
         """
         # AIRAC424格式使用逗号分隔，以分号结尾
         if not line.endswith(';'):
@@ -132,96 +362,13 @@ class TerminalParser(BaseParser):
         procedure_type = type_info[0]
         sequence_number = type_info[1]
         
-        # 安全解析其他字段，防止索引超出范围
-        route_type = self._safe_int(fields[1]) if len(fields) > 1 else 0
-        procedure_name = self._safe_str(fields[2]) if len(fields) > 2 else ''
-        transition_name = self._safe_str(fields[3]) if len(fields) > 3 else ''
-        waypoint_name = self._safe_str(fields[4]) if len(fields) > 4 else ''
-        waypoint_region = self._safe_str(fields[5]) if len(fields) > 5 else ''
-        waypoint_section = self._safe_int(fields[6]) if len(fields) > 6 else 0
-        waypoint_type = self._safe_str(fields[7]) if len(fields) > 7 else ''
-        waypoint_description = self._safe_str(fields[8]) if len(fields) > 8 else ''
-        path_terminator = self._safe_str(fields[12]) if len(fields) > 12 else ''
-        
-        # 解析参考导航台信息
-        ref_navaid_identifier = self._safe_str(fields[14]) if len(fields) > 14 else ''
-        ref_navaid_region = self._safe_str(fields[15]) if len(fields) > 15 else ''
-        ref_navaid_section = self._safe_int(fields[16]) if len(fields) > 16 else None
-        ref_navaid_type = self._safe_str(fields[17]) if len(fields) > 17 else ''
-        
-        # 解析坐标和距离信息
-        theta = self._safe_float(fields[19]) if len(fields) > 19 else None
-        rho = self._safe_float(fields[20]) if len(fields) > 20 else None
-        magnetic_course = self._safe_float(fields[21]) if len(fields) > 21 else None
-        distance_time = self._safe_str(fields[22]) if len(fields) > 22 else ''
-        
-        # 解析高度限制
-        altitude_description = self._safe_str(fields[24]) if len(fields) > 24 else ''
-        altitude1 = self._safe_str(fields[25]) if len(fields) > 25 else ''
-        altitude2 = self._safe_str(fields[26]) if len(fields) > 26 else ''
-        transition_altitude = self._safe_str(fields[27]) if len(fields) > 27 else ''
-        
-        # 解析速度限制
-        speed_limit = self._safe_str(fields[29]) if len(fields) > 29 else ''
-        
-        # 解析其他参数
-        vertical_angle = self._safe_float(fields[31]) if len(fields) > 31 else None
-        center_fix = self._safe_str(fields[32]) if len(fields) > 32 else ''
-        multiple_code = self._safe_str(fields[33]) if len(fields) > 33 else ''
-        gnss_fms_indication = self._safe_str(fields[34]) if len(fields) > 34 else ''
-        
-        return {
-            'airport_icao': airport_icao,
-            'procedure_type': procedure_type,
-            'sequence_number': sequence_number,
-            'route_type': route_type,
-            'procedure_name': procedure_name,
-            'transition_name': transition_name,
-            'waypoint_name': waypoint_name,
-            'waypoint_region': waypoint_region,
-            'waypoint_section': waypoint_section,
-            'waypoint_type': waypoint_type,
-            'waypoint_description': waypoint_description,
-            'path_terminator': path_terminator,
-            'ref_navaid_identifier': ref_navaid_identifier,
-            'ref_navaid_region': ref_navaid_region,
-            'ref_navaid_section': ref_navaid_section,
-            'ref_navaid_type': ref_navaid_type,
-            'theta': theta,
-            'rho': rho,
-            'magnetic_course': magnetic_course,
-            'distance_time': distance_time,
-            'altitude_description': altitude_description,
-            'altitude1': altitude1,
-            'altitude2': altitude2,
-            'transition_altitude': transition_altitude,
-            'speed_limit': speed_limit,
-            'vertical_angle': vertical_angle,
-            'center_fix': center_fix,
-            'multiple_code': multiple_code,
-            'gnss_fms_indication': gnss_fms_indication
-        }
+        return self._convert_fields(fields, airport_icao, procedure_type, sequence_number)
     
-    def parse(self) -> List[Dict[str, Any]]:
+    def parse(self) -> List[TerminalProcedureRecord]:
         """
-        实现基类的抽象方法
+        解析所有机场的终端程序数据
         
         Returns:
-            List[Dict[str, Any]]: 解析后的数据记录列表
+            List[TerminalProcedureRecord]: 解析后的数据记录列表
         """
         return self.parse_all_airports()
-    
-    def _safe_str(self, value: str, default: str = '') -> str:
-        return value.strip() if value and value.strip() else default
-    
-    def _safe_int(self, value: str, default: int = 0) -> int:
-        try:
-            return int(value) if value and value.strip() != '' else default
-        except (ValueError, TypeError):
-            return default
-    
-    def _safe_float(self, value: str, default: float = 0.0) -> float:
-        try:
-            return float(value) if value and value.strip() != '' else default
-        except (ValueError, TypeError):
-            return default
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from typing import List, Dict, Any
+from typing import Optional
+from record_types import WaypointRecord
 from .base_parser import BaseParser
+from .field_spec import FieldSpec, is_latitude, is_longitude, not_empty
 
 class WaypointParser(BaseParser):
     """
@@ -11,61 +13,34 @@ class WaypointParser(BaseParser):
     示例行: -1.000000000  -10.000000000  0110W ENRT GO 2115159 01S010W
     """
     
-    def parse(self) -> List[Dict[str, Any]]:
-        records = []
-        
-        for line in self._read_file_lines():
-            try:
-                record = self._parse_waypoint_line(line)
-                if record:
-                    records.append(record)
-            except Exception as e:
-                self.logger.error(f"解析航路点数据行失败: {line}, 错误: {e}")
-                continue
-        
-        self.validate_data(records)
-        return records
+    table_name = 'waypoints'
+    data_label = '航路点'
+    supports_chunking = True
     
-    def _parse_waypoint_line(self, line: str) -> Dict[str, Any]:
-        fields = self._split_line(line)
-        
-        if len(fields) < 7:
-            self.logger.warning(f"航路点数据字段不足: {line}")
-            return None
-        
-        # 解析基本字段
-        latitude = self._safe_float(fields[0])
-        longitude = self._safe_float(fields[1])
-        waypoint_name = self._safe_str(fields[2])
-        usage_type = self._safe_str(fields[3])
-        region_code = self._safe_str(fields[4])
-        section_code = self._safe_int(fields[5])
+    min_fields = 7
+    field_specs = (
+        FieldSpec('latitude', 0, 'float', validator=is_latitude),
+        FieldSpec('longitude', 1, 'float', validator=is_longitude),
+        FieldSpec('waypoint_name', 2, validator=not_empty),
+        FieldSpec('usage_type', 3, validator=not_empty),
+        FieldSpec('region_code', 4),
+        FieldSpec('section_code', 5, 'int'),
         # waypoint_id包含第7列及以后的所有内容（可能是多个单词）
-        waypoint_id = ' '.join(fields[6:]) if len(fields) > 6 else ''
-        
-        # 验证必要字段
-        if not waypoint_name or not usage_type:
-            self.logger.warning(f"航路点名称或使用类型为空: {line}")
-            return None
-        
-        # 验证坐标范围
-        if not (-90 <= latitude <= 90) or not (-180 <= longitude <= 180):
-            self.logger.warning(f"航路点坐标超出有效范围: {waypoint_name}, lat={latitude}, lon={longitude}")
-            return None
+        FieldSpec('waypoint_id', 6, 'rest'),
+    )
+    
+    def _parse_line(self, line: str) -> Optional[WaypointRecord]:
+        return self._parse_waypoint_line(line)
+    
+    def _parse_waypoint_line(self, line: str) -> Optional[WaypointRecord]:
+        (latitude, longitude, waypoint_name, usage_type,
+         region_code, section_code, waypoint_id) = self._convert_fields(line.split())
         
         # 根据使用类型判断是否为终端航路点
         is_terminal = self._is_terminal_waypoint(usage_type)
         
-        return {
-            'latitude': latitude,
-            'longitude': longitude,
-            'waypoint_name': waypoint_name,
-            'usage_type': usage_type,
-            'region_code': region_code,
-            'section_code': section_code,
-            'waypoint_id': waypoint_id,
-            'is_terminal': is_terminal
-        }
+        return WaypointRecord(latitude, longitude, waypoint_name, usage_type,
+                              region_code, section_code, waypoint_id, is_terminal)
     
     def _is_terminal_waypoint(self, usage_type: str) -> bool:
 
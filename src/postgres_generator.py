@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+PostgreSQL COPY 输出
+
+表结构由 sql_schemas 转换而来 (自增id改为SERIAL，索引从建表语句中拆出)，
+数据以 COPY ... FROM STDIN 文本格式块流式写入，全部数据写完后再建索引。
+输出文件可直接用 psql -f 导入
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, TextIO
+
+try:
+    from .sql_generator import SqlGenerator
+    from .sql_schemas import get_column_definitions, get_table_indexes
+except ImportError:
+    from sql_generator import SqlGenerator
+    from sql_schemas import get_column_definitions, get_table_indexes
+
+# COPY文本格式的转义: 反斜杠、制表符、换行和回车；PostgreSQL的文本不能包含NUL，直接去掉
+_ESCAPE_TABLE = str.maketrans({
+    '\\': '\\\\',
+    '\t': '\\t',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\0': None,
+})
+
+def to_postgres_definition(definition: str) -> str:
+    """
+    把MySQL字段定义转换为PostgreSQL，DECIMAL对应NUMERIC，其余类型两边通用
+    """
+    return re.sub(r'^DECIMAL\b', 'NUMERIC', definition, flags=re.IGNORECASE)
+
+def get_postgres_create_table(table_name: str) -> str:
+    """
+    生成不带索引的PostgreSQL建表语句
+    """
+    columns = ["    id SERIAL PRIMARY KEY"]
+    columns.extend(f"    {name} {to_postgres_definition(definition)}"
+                   for name, definition in get_column_definitions(table_name))
+    return (f"DROP TABLE IF EXISTS {table_name};\n"
+            f"CREATE TABLE {table_name} (\n" + ",\n".join(columns) + "\n);\n")
+
+def format_copy_value(value: Any) -> str:
+    """
+    格式化COPY文本格式中的一个字段
+    
+    Args:
+        value: 原始值
+    
+    Returns:
+        str: 转义后的字段文本，NULL为 \\N
+    """
+    if value is None:
+        return '\\N'
+    elif isinstance(value, bool):
+        return 't' if value else 'f'
+    elif isinstance(value, (int, float)):
+        return str(value)
+    return str(value).translate(_ESCAPE_TABLE)
+
+class PostgresGenerator(SqlGenerator):
+    """
+    生成PostgreSQL导入脚本
+    """
+    
+    def generate_complete_sql(self, data_dict: Dict[str, Iterable[tuple]]) -> None:
+        """
+        生成PostgreSQL导入脚本: 建表、COPY数据、建索引
+    
+        Args:
+            data_dict: 包含所有表数据的字典，值可以是列表或记录迭代器
+        """
+        table_names = [table_name for table_name in self.table_order if table_name in data_dict]
+    
+        with self._open_output(self.output_file, newline='') as f:
+            self._write_header(f)
+    
+            f.write("-- =====================================================\n")
+            f.write("-- 数据库表结构 (索引在数据导入后建立)\n")
+            f.write("-- =====================================================\n\n")
+            for table_name in table_names:
+                f.write(f"-- {table_name.upper()} 表\n")
+                f.write(get_postgres_create_table(table_name))
+                f.write("\n")
+    
+            f.write("-- =====================================================\n")
+            f.write("-- 数据导入\n")
+            f.write("-- =====================================================\n\n")
+            for table_name in table_names:
+                # 迭代器在写入时才真正解析数据，单表失败不影响其他表
+                try:
+                    self.record_counts[table_name] = self._write_copy_block(f, table_name,
+                                                                            data_dict[table_name])
+                except Exception as e:
+                    self.logger.error(f"写入 {table_name} 表数据失败: {e}")
+                    self.record_counts.setdefault(table_name, 0)
+    
+            f.write("-- =====================================================\n")
+            f.write("-- 索引\n")
+            f.write("-- =====================================================\n\n")
+            for table_name in table_names:
+                self._write_indexes(f, table_name)
+    
+            self._write_footer(f)
+    
+        self.logger.info(f"PostgreSQL导入脚本生成完成: {self.output_file}")
+    
+    def _write_header(self, f: TextIO) -> None:
+        f.write("-- =====================================================\n")
+        f.write("-- X-Plane导航数据库转PostgreSQL导入脚本 (psql -f 导入)\n")
+        f.write(f"-- 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("-- =====================================================\n\n")
+    
+        f.write("SET client_encoding = 'UTF8';\n")
+        f.write("SET standard_conforming_strings = on;\n\n")
+    
+    def _write_copy_block(self, f: TextIO, table_name: str, records: Iterable[tuple]) -> int:
+        """
+        写入单个表的 COPY ... FROM STDIN 块
+    
+        Args:
+            f: 文件对象
+            table_name: 表名
+            records: 数据记录列表或迭代器，记录字段顺序与建表语句一致，也兼容dict
+    
+        Returns:
+            int: 写入的记录数
+        """
+        column_names = [name for name, _ in get_column_definitions(table_name)]
+    
+        f.write(f"-- {table_name.upper()} 表数据\n")
+        f.write(f"COPY {table_name} ({', '.join(column_names)}) FROM STDIN;\n")
+        # 解析中途失败时也要结束COPY块，否则后面的语句都会被当成数据
+        try:
+            record_count = self._write_delimited_rows(f, column_names, records, format_copy_value)
+        finally:
+            f.write("\\.\n\n")
+    
+        f.write(f"-- {table_name.upper()} 表数据共 {record_count} 条记录\n\n")
+        self.logger.info(f"写入 {table_name} 表数据: {record_count} 条记录")
+        return record_count
+    
+    def _write_indexes(self, f: TextIO, table_name: str) -> None:
+        """
+        写入单个表的索引，按 sql_schemas 中的定义
+        """
+        for index in get_table_indexes(table_name):
+            unique = 'UNIQUE ' if index.unique else ''
+            f.write(f"CREATE {unique}INDEX {index.name} ON {table_name} ({', '.join(index.columns)});\n")
+        f.write(f"ANALYZE {table_name};\n\n")
+    
+    def _write_footer(self, f: TextIO) -> None:
+        f.write("-- =====================================================\n")
+        f.write("-- 数据导入完成\n")
+        f.write("-- =====================================================\n")
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+转换性能分析 (--profile)
+
+转换时每张表从开始读取第一条记录到读完为止 (串行模式下即解析并生成写出该表SQL的整个阶段)
+单独用 cProfile 统计。转换完成后各解析器再单独运行一次，在前后各取一次 tracemalloc 快照，
+统计峰值内存和解析结果占用内存的分配位置。tracemalloc 会使字符串处理慢几十倍，
+与 cProfile 分开运行，不影响耗时统计。结果写到 <输出文件名>_profile/ 目录:
+    <表名>.prof        cProfile原始数据，可用 pstats、snakeviz 等工具打开
+    <表名>_stats.txt   按累计耗时和自身耗时排序的函数统计
+    <表名>_alloc.txt   解析器的峰值内存和解析结果占用内存最多的分配位置
+    summary.txt        各表的耗时、峰值内存、最耗时的函数和最大的分配位置
+"""
+
+import os
+import time
+import pstats
+import logging
+import cProfile
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, Iterator
+
+# 统计文件中列出的函数数和分配位置数，汇总中列出的数量
+_STATS_LIMIT = 40
+_ALLOC_LIMIT = 25
+_SUMMARY_LIMIT = 8
+
+# 快照中排除tracemalloc自身和导入机制的分配
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+class ConversionProfiler:
+    """
+    按表的 cProfile 和按解析器的 tracemalloc 分析
+    
+    cProfile 对当前线程生效，同一时间只分析一张表，调用方需要串行处理各表
+    """
+    
+    def __init__(self, profile_dir: str, traceback_frames: int = 1):
+        """
+        Args:
+            profile_dir: 结果目录
+            traceback_frames: tracemalloc 记录的调用栈深度，按分配位置统计只需要1层
+        """
+        self.profile_dir = profile_dir
+        self.traceback_frames = traceback_frames
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # 各表的汇总: 耗时、最耗时的函数、峰值内存和最大的分配位置
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+    
+    def start(self) -> None:
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.logger.info(f"性能分析已开启，结果目录: {self.profile_dir}")
+    
+    def stop(self) -> None:
+        """
+        写出汇总
+        """
+        if self._summaries:
+            self._write_summary()
+            self.logger.info(f"性能分析结果已保存到: {self.profile_dir}")
+    
+    def profile_records(self, table_name: str, records: Iterable[tuple]) -> Iterator[tuple]:
+        """
+        包装一张表的记录迭代器，读取第一条记录时开始 cProfile 统计，读完 (或中途失败) 时结束
+    
+        Args:
+            table_name: 表名
+            records: 数据记录列表或迭代器
+    
+        Returns:
+            Iterator[tuple]: 与原来相同的记录
+        """
+        profile = cProfile.Profile()
+        start_time = time.perf_counter()
+        profile.enable()
+        try:
+            yield from records
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - start_time
+            try:
+                self._write_stats(table_name, profile, seconds)
+            except OSError as e:
+                self.logger.warning(f"写入 {table_name} 性能分析结果失败: {e}")
+    
+    def profile_memory(self, table_name: str, parse: Callable[[], Iterable[tuple]]) -> None:
+        """
+        在 tracemalloc 下单独运行一次解析器，解析结果全部保留在内存中时取快照
+    
+        Args:
+            table_name: 表名
+            parse: 创建解析器并返回记录迭代器的函数
+        """
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.traceback_frames)
+        try:
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            records = list(parse())
+            peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            record_count = len(records)
+            del records
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+    
+        allocations = [diff for diff in after.compare_to(before, 'lineno') if diff.size_diff > 0]
+        allocations.sort(key=lambda diff: diff.size_diff, reverse=True)
+        try:
+            with open(os.path.join(self.profile_dir, f"{table_name}_alloc.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"{table_name}: {record_count} 条记录，解析过程峰值 {peak_mb:.2f} MB\n\n")
+                f.write("解析结果占用内存最多的分配位置 (全部记录保留在内存中时与解析前的快照对比)\n")
+                for diff in allocations[:_ALLOC_LIMIT]:
+                    f.write(f"{diff.size_diff / 1024:>12.1f} KiB {diff.count_diff:>+10} 个对象  "
+                            f"{self._format_location(diff.traceback)}\n")
+        except OSError as e:
+            self.logger.warning(f"写入 {table_name} 内存分析结果失败: {e}")
+    
+        summary = self._summaries.setdefault(table_name, {})
+        summary['peak_mb'] = peak_mb
+        summary['allocations'] = [(self._format_location(diff.traceback), diff.size_diff)
+                                  for diff in allocations[:_SUMMARY_LIMIT]]
+    
+    def _write_stats(self, table_name: str, profile: cProfile.Profile, seconds: float) -> None:
+        """
+        写出单张表的 .prof 和函数统计，并记录汇总
+        """
+        profile.dump_stats(os.path.join(self.profile_dir, f"{table_name}.prof"))
+    
+        with open(os.path.join(self.profile_dir, f"{table_name}_stats.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"{table_name}: {seconds:.3f} 秒\n\n")
+            f.write("按累计耗时排序 (cumulative)\n")
+            stats = pstats.Stats(profile, stream=f)
+            stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(_STATS_LIMIT)
+            f.write("\n按自身耗时排序 (tottime)\n")
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(_STATS_LIMIT)
+    
+        hotspots = sorted(pstats.Stats(profile).stats.items(), key=lambda item: item[1][2], reverse=True)
+        summary = self._summaries.setdefault(table_name, {})
+        summary['seconds'] = seconds
+        summary['hotspots'] = [(f"{os.path.basename(file_name)}:{line}({function})", total_time, call_count)
+                               for (file_name, line, function), (_, call_count, total_time, _, _)
+                               in hotspots[:_SUMMARY_LIMIT]]
+    
+    def _format_location(self, traceback: tracemalloc.Traceback) -> str:
+        frame = traceback[0]
+        return f"{frame.filename}:{frame.lineno}"
+    
+    def _write_summary(self) -> None:
+        with open(os.path.join(self.profile_dir, 'summary.txt'), 'w', encoding='utf-8') as f:
+            for table_name, summary in self._summaries.items():
+                seconds = '-' if 'seconds' not in summary else f"{summary['seconds']:.3f} 秒"
+                peak = '-' if 'peak_mb' not in summary else f"{summary['peak_mb']:.2f} MB"
+                f.write(f"== {table_name}: {seconds}, 解析峰值内存 {peak}\n")
+                if summary.get('hotspots'):
+                    f.write("  自身耗时最多的函数:\n")
+                    for location, total_time, call_count in summary['hotspots']:
+                        f.write(f"    {total_time:>9.3f} 秒 {call_count:>10} 次  {location}\n")
+                if summary.get('allocations'):
+                    f.write("  解析结果占用最多的分配位置:\n")
+                    for location, size in summary['allocations']:
+                        f.write(f"    {size / 1024:>9.1f} KiB  {location}\n")
+                f.write("\n")
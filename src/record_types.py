@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+按 sql_schemas 建表语句生成的记录类型
+
+每张表一个namedtuple，字段顺序与建表顺序一致 (不含自增id)。
+解析器直接构造这些记录，SqlGenerator按位置读取字段，
+省去每行一个dict的内存分配和按键查找
+"""
+
+from collections import namedtuple
+from typing import Dict
+
+try:
+    from .sql_schemas import get_table_columns
+except ImportError:
+    from sql_schemas import get_table_columns
+
+def make_record_type(table_name: str, type_name: str) -> type:
+    """
+    根据表结构生成记录类型，namedtuple本身没有实例__dict__ (__slots__ = ())
+    """
+    field_names = [name for name, _ in get_table_columns(table_name)]
+    return namedtuple(type_name, field_names, module=__name__)
+
+AirportRecord = make_record_type('airports', 'AirportRecord')
+AirwayRecord = make_record_type('airways', 'AirwayRecord')
+WaypointRecord = make_record_type('waypoints', 'WaypointRecord')
+HoldingRecord = make_record_type('holdings', 'HoldingRecord')
+NavaidRecord = make_record_type('navaids', 'NavaidRecord')
+MoraRecord = make_record_type('mora', 'MoraRecord')
+MsaRecord = make_record_type('msa', 'MsaRecord')
+TerminalProcedureRecord = make_record_type('terminal_procedures', 'TerminalProcedureRecord')
+RunwayRecord = make_record_type('runways', 'RunwayRecord')
+FrequencyRecord = make_record_type('frequencies', 'FrequencyRecord')
+GateRecord = make_record_type('gates', 'GateRecord')
+
+# 表名 -> 记录类型
+RECORD_TYPES: Dict[str, type] = {
+    'airports': AirportRecord,
+    'airways': AirwayRecord,
+    'waypoints': WaypointRecord,
+    'holdings': HoldingRecord,
+    'navaids': NavaidRecord,
+    'mora': MoraRecord,
+    'msa': MsaRecord,
+    'terminal_procedures': TerminalProcedureRecord,
+    'runways': RunwayRecord,
+    'frequencies': FrequencyRecord,
+    'gates': GateRecord
+}
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+按表结构编译的INSERT行格式化函数
+
+compile_row_formatter 根据 sql_schemas 中的字段类型和记录的字段顺序，
+一次性生成把整条记录格式化为 "(v1, v2, ...)" 的专用函数: 每个字段按声明类型
+走预先确定的快速路径 (整数、浮点、布尔直接转字符串，字符串不含引号和反斜杠时
+直接加引号)，类型不符的值 (如NULL) 交给通用的格式化函数，结果与其完全一致
+"""
+
+from typing import Any, Callable, Sequence
+
+try:
+    from .sql_schemas import get_table_columns, get_column_kind
+except ImportError:
+    from sql_schemas import get_table_columns, get_column_kind
+
+# 各类字段的快速路径表达式，{v} 为字段变量名，值的类型不符时调用 _fallback
+_TYPE_EXPRESSIONS = {
+    'int': "(_int_str({v}) if {v}.__class__ is _int else _fallback({v}))",
+    'float': "(_float_repr({v}) if {v}.__class__ is _float else _fallback({v}))",
+    'bool': "(('1' if {v} else '0') if {v}.__class__ is _bool else _fallback({v}))",
+    'str': ("(\"'\" + {v} + \"'\" if {v}.__class__ is _str and \"'\" not in {v} and '\\\\' not in {v} "
+            "else _fallback({v}))"),
+}
+
+def compile_row_formatter(table_name: str, field_names: Sequence[str],
+                          fallback: Callable[[Any], str]) -> Callable[[Sequence[Any]], str]:
+    """
+    编译单个表的行格式化函数
+    
+    Args:
+        table_name: 表名
+        field_names: 记录中值的字段顺序
+        fallback: 通用的单值格式化函数，处理NULL和类型不符的值
+    
+    Returns:
+        Callable: format_row(record) -> "(v1, v2, ...)"
+    """
+    column_kinds = {name: get_column_kind(sql_type) for name, sql_type in get_table_columns(table_name)}
+    namespace = {'_fallback': fallback, '_int': int, '_float': float, '_bool': bool, '_str': str,
+                 '_int_str': int.__repr__, '_float_repr': float.__repr__}
+    
+    variables = [f"v{position}" for position in range(len(field_names))]
+    expressions = []
+    for name, variable in zip(field_names, variables):
+        template = _TYPE_EXPRESSIONS.get(column_kinds.get(name, ''), "_fallback({v})")
+        expressions.append(template.format(v=variable))
+    
+    if not variables:
+        return lambda record: "()"
+    
+    lines = ["def format_row(record):",
+             f"    {', '.join(variables)}, = record",
+             "    return '(' + ', '.join((" + ', '.join(expressions) + ",)) + ')'"]
+    # 生成的代码带上表名，性能分析结果中可以区分各表的格式化函数
+    exec(compile('\n'.join(lines), f"<row_formatter {table_name}>", 'exec'), namespace)
+    return namespace['format_row']
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+按表分片输出
+
+每张表写成一个或多个分片文件 (<输出文件名>_<表名>_001.sql ...)，超过 shard_rows 行的表
+拆成多个分片，各表按固定顺序依次写出。另外生成:
+    <输出文件名>_schema.sql    不带索引的建表语句
+    <输出文件名>_indexes.sql   数据导入后添加索引的 ALTER TABLE 语句
+    <输出文件名>_manifest.json 各分片的记录数、字节数和SHA-256
+    <输出文件名>_load.sh       校验分片后通过多个mysql连接并行导入
+输出文件以 .gz/.xz 结尾时所有SQL文件都压缩输出
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, List
+
+try:
+    from .sql_generator import SqlGenerator
+    from .sql_schemas import get_add_indexes_sql, get_create_table_without_indexes
+    from .compressed_output import get_compression_format, split_output_name
+except ImportError:
+    from sql_generator import SqlGenerator
+    from sql_schemas import get_add_indexes_sql, get_create_table_without_indexes
+    from compressed_output import get_compression_format, split_output_name
+
+def get_file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_manifest_file(output_file: str) -> str:
+    """
+    分片清单的路径: <输出文件名>_manifest.json
+    """
+    return f"{split_output_name(output_file)[0]}_manifest.json"
+
+class ShardedSqlGenerator(SqlGenerator):
+    """
+    生成按表分片的SQL文件、清单和并行导入脚本
+    """
+    
+    def __init__(self, output_file: str, shard_rows: int = 500000, **options):
+        """
+        Args:
+            output_file: 输出文件路径，各文件名由其派生
+            shard_rows: 每个分片最多的记录数
+            options: 传给 SqlGenerator 的选项 (batch_size, max_statement_bytes, compression_threads)
+        """
+        super().__init__(output_file, **options)
+        self.shard_rows = max(1, shard_rows)
+        self.base_name, self.extension = split_output_name(output_file)
+        self.manifest_file = get_manifest_file(output_file)
+        self.loader_file = f"{self.base_name}_load.sh"
+    
+    def generate_complete_sql(self, data_dict: Dict[str, Iterable[tuple]]) -> None:
+        """
+        写出建表、分片、索引文件以及清单和导入脚本
+    
+        Args:
+            data_dict: 包含所有表数据的字典，值可以是列表或记录迭代器
+        """
+        table_names = [table_name for table_name in self.table_order if table_name in data_dict]
+    
+        schema_file = f"{self.base_name}_schema{self.extension}"
+        with self._open_output(schema_file) as f:
+            self._write_header(f)
+            for table_name in table_names:
+                f.write(f"-- {table_name.upper()} 表 (索引在数据导入后添加)\n")
+                f.write(get_create_table_without_indexes(table_name))
+                f.write("\n\n")
+    
+        # 迭代器在写入时才真正解析数据，单表失败不影响其他表
+        table_parts: Dict[str, List[Dict[str, Any]]] = {}
+        for table_name in table_names:
+            try:
+                table_parts[table_name] = self._write_table_parts(table_name, data_dict[table_name])
+            except Exception as e:
+                self.logger.error(f"写入 {table_name} 表数据失败: {e}")
+                table_parts[table_name] = []
+            self.record_counts[table_name] = sum(part['record_count'] for part in table_parts[table_name])
+    
+        index_file = f"{self.base_name}_indexes{self.extension}"
+        with self._open_output(index_file) as f:
+            for table_name in table_names:
+                index_sql = get_add_indexes_sql(table_name)
+                if index_sql:
+                    f.write(index_sql)
+                    f.write("\n")
+    
+        manifest = {
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'compression': get_compression_format(self.output_file),
+            'schema': self._describe_file(schema_file),
+            'indexes': self._describe_file(index_file),
+            'loader': os.path.basename(self.loader_file),
+            'tables': {
+                table_name: {'record_count': self.record_counts[table_name], 'parts': table_parts[table_name]}
+                for table_name in table_names
+            }
+        }
+        with open(self.manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    
+        self._write_loader(manifest)
+        part_count = sum(len(parts) for parts in table_parts.values())
+        self.logger.info(f"分片输出完成: {part_count} 个分片，清单: {self.manifest_file}")
+    
+    def _write_table_parts(self, table_name: str, records: Iterable[tuple]) -> List[Dict[str, Any]]:
+        """
+        写出单个表的分片，每个分片是一个事务
+    
+        Args:
+            table_name: 表名
+            records: 数据记录列表或迭代器
+    
+        Returns:
+            List[Dict]: 各分片的文件名、记录数、字节数和SHA-256
+        """
+        field_names, record_iter = self._get_positional_records(records)
+        parts = []
+        if field_names is None:
+            self.logger.info(f"写入 {table_name} 表数据: 0 条记录")
+            return parts
+    
+        while True:
+            first_record = next(record_iter, None)
+            if first_record is None:
+                break
+    
+            part_file = f"{self.base_name}_{table_name}_{len(parts) + 1:03d}{self.extension}"
+            with self._open_output(part_file) as f:
+                self._write_header(f)
+                f.write("SET UNIQUE_CHECKS = 0;\n")
+                f.write("SET autocommit = 0;\n\n")
+                record_count = self._write_insert_statements(
+                    f, table_name, field_names, chain([first_record], islice(record_iter, self.shard_rows - 1)))
+                f.write("COMMIT;\n")
+                f.write("SET UNIQUE_CHECKS = 1;\n\n")
+                self._write_footer(f)
+    
+            part = self._describe_file(part_file)
+            part['record_count'] = record_count
+            parts.append(part)
+    
+        total = sum(part['record_count'] for part in parts)
+        self.logger.info(f"写入 {table_name} 表数据: {total} 条记录，{len(parts)} 个分片")
+        return parts
+    
+    def _describe_file(self, path: str) -> Dict[str, Any]:
+        return {
+            'file': os.path.basename(path),
+            'bytes': os.path.getsize(path),
+            'sha256': get_file_checksum(path),
+        }
+    
+    def _write_loader(self, manifest: Dict[str, Any]) -> None:
+        """
+        写出导入脚本: 校验所有文件，建表，并行导入分片 (从大到小启动，减少最后的长尾)，最后添加索引
+        """
+        files = [manifest['schema'], manifest['indexes']]
+        parts = [part for table in manifest['tables'].values() for part in table['parts']]
+        files.extend(parts)
+        parts.sort(key=lambda part: part['bytes'], reverse=True)
+    
+        lines = [
+            "#!/usr/bin/env bash",
+            "# 并行导入分片SQL，由 X-Plane-to-SQL 生成",
+            "# 用法: ./" + os.path.basename(self.loader_file) + " 数据库名 [并行连接数, 默认4]",
+            "# mysql的其他参数 (如 -h -u -p) 通过环境变量 MYSQL_OPTS 传入",
+            "set -euo pipefail",
+            'cd "$(dirname "$0")"',
+            "",
+            'if [ $# -lt 1 ]; then',
+            '    echo "用法: $0 数据库名 [并行连接数]" >&2',
+            '    exit 1',
+            'fi',
+            'export DATABASE="$1"',
+            'export MYSQL_OPTS="${MYSQL_OPTS:-}"',
+            'JOBS="${2:-4}"',
+            "",
+            "sha256sum -c --quiet <<'EOF'",
+        ]
+        lines.extend(f"{entry['sha256']}  {entry['file']}" for entry in files)
+        lines.extend([
+            "EOF",
+            "",
+            "run_sql() {",
+            '    case "$1" in',
+            '        *.gz) gzip -dc "$1" ;;',
+            '        *.xz) xz -dc "$1" ;;',
+            '        *) cat "$1" ;;',
+            '    esac | mysql $MYSQL_OPTS "$DATABASE"',
+            "}",
+            "export -f run_sql",
+            "",
+            f"run_sql {manifest['schema']['file']}",
+            "",
+            "xargs -P \"$JOBS\" -I {} bash -c 'run_sql \"$1\" && echo \"已导入: $1\"' _ {} <<'EOF'",
+        ])
+        lines.extend(part['file'] for part in parts)
+        lines.extend([
+            "EOF",
+            "",
+            f"run_sql {manifest['indexes']['file']}",
+            'echo "导入完成"',
+        ])
+    
+        with open(self.loader_file, 'w', encoding='utf-8', newline='\n') as f:
+            f.write('\n'.join(lines))
+            f.write('\n')
+        os.chmod(self.loader_file, 0o755)
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+有内存预算的记录缓冲区
+
+并行解析时子进程把整张表的记录缓冲起来传回主进程，主进程在轮到该表写入之前一直保留这些记录
+(CIFP最先提交、最后写入)。SpillBuffer 按批估算缓冲记录占用的内存，超过预算时把最早的完整批次
+按顺序追加pickle到临时文件，读取时先从文件按原顺序读回已写出的批次，再读内存中的批次，
+记录的内容和顺序与直接缓冲在列表中完全相同。
+
+临时文件在子进程中创建，缓冲区pickle传回主进程后由主进程读取，读完后调用 close() 删除
+"""
+
+import os
+import sys
+import pickle
+import logging
+import tempfile
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 每批的记录数，内存估算和写出临时文件都以批为单位
+_BATCH_SIZE = 10000
+
+# 估算一批记录的内存时抽样的记录数
+_SAMPLE_SIZE = 32
+
+def estimate_record_size(record: tuple) -> int:
+    """
+    估算一条记录占用的内存 (记录本身和各字段值，不考虑字段值在记录间共享)
+    """
+    getsizeof = sys.getsizeof
+    return getsizeof(record) + sum(map(getsizeof, record))
+
+def estimate_batch_size(batch: List[tuple]) -> int:
+    """
+    抽样估算一批记录占用的内存，包括列表本身
+    """
+    if not batch:
+        return sys.getsizeof(batch)
+    step = max(1, len(batch) // _SAMPLE_SIZE)
+    samples = batch[::step]
+    average = sum(map(estimate_record_size, samples)) / len(samples)
+    return sys.getsizeof(batch) + int(average * len(batch))
+
+class SpillBuffer:
+    """
+    按顺序缓冲记录，超过内存预算时把最早的批次写到临时文件；可迭代多次，支持len()
+    """
+    
+    def __init__(self, memory_limit: int, spill_dir: Optional[str] = None, table_name: str = ''):
+        """
+        Args:
+            memory_limit: 内存中缓冲记录的预算 (字节)，0为不限制
+            spill_dir: 临时文件目录，None为系统临时目录
+            table_name: 表名，用于临时文件名和日志
+        """
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self.table_name = table_name
+        self.logger = logging.getLogger(self.__class__.__name__)
+        # 内存中的完整批次 (从旧到新) 及其估算大小，以及正在填充的批次
+        self._batches: Deque[Tuple[List[tuple], int]] = deque()
+        self._current: List[tuple] = []
+        self._memory_bytes = 0
+        self._row_count = 0
+        # 临时文件中的批次都早于内存中的批次
+        self._spill_path: Optional[str] = None
+        self._spill_file = None
+        self.spilled_records = 0
+    
+    @classmethod
+    def from_records(cls, records: Iterable[tuple], memory_limit: int, spill_dir: Optional[str] = None,
+                     table_name: str = '') -> 'SpillBuffer':
+        buffer = cls(memory_limit, spill_dir, table_name)
+        try:
+            buffer.extend(records)
+        except BaseException:
+            buffer.close()
+            raise
+        buffer.flush()
+        if buffer.spilled_records:
+            buffer.logger.info(f"{table_name} 缓冲的记录超过内存预算，{buffer.spilled_records} 条记录已写到临时文件")
+        return buffer
+    
+    def __len__(self) -> int:
+        return self._row_count
+    
+    def append(self, record: tuple) -> None:
+        self._current.append(record)
+        self._row_count += 1
+        if len(self._current) >= _BATCH_SIZE:
+            self._complete_batch()
+    
+    def extend(self, records: Iterable[tuple]) -> None:
+        append = self.append
+        for record in records:
+            append(record)
+    
+    def _complete_batch(self) -> None:
+        batch, self._current = self._current, []
+        batch_bytes = estimate_batch_size(batch)
+        self._batches.append((batch, batch_bytes))
+        self._memory_bytes += batch_bytes
+        if self.memory_limit > 0:
+            self._spill()
+    
+    def _spill(self) -> None:
+        """
+        把最早的批次写到临时文件，直到内存中的批次不超过预算
+        """
+        while self._batches and self._memory_bytes > self.memory_limit:
+            batch, batch_bytes = self._batches.popleft()
+            if self._spill_file is None:
+                self._open_spill_file()
+            pickle.dump(batch, self._spill_file, pickle.HIGHEST_PROTOCOL)
+            self._memory_bytes -= batch_bytes
+            self.spilled_records += len(batch)
+    
+    def _open_spill_file(self) -> None:
+        if self._spill_path is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix=f"xplane-{self.table_name or 'records'}-",
+                                                    suffix='.spill', dir=self.spill_dir)
+            self._spill_file = os.fdopen(fd, 'wb')
+        else:
+            self._spill_file = open(self._spill_path, 'ab')
+    
+    def flush(self) -> None:
+        """
+        把已写出的批次刷新到临时文件并关闭文件句柄，之后可以读取或pickle缓冲区
+        """
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+    
+    def __iter__(self) -> Iterator[tuple]:
+        self.flush()
+        if self._spill_path is not None:
+            with open(self._spill_path, 'rb') as file:
+                while True:
+                    try:
+                        batch = pickle.load(file)
+                    except EOFError:
+                        break
+                    yield from batch
+        for batch, _ in list(self._batches):
+            yield from batch
+        yield from list(self._current)
+    
+    def close(self) -> None:
+        """
+        释放缓冲的记录并删除临时文件
+        """
+        self.flush()
+        self._batches.clear()
+        self._current = []
+        self._memory_bytes = 0
+        if self._spill_path is not None:
+            try:
+                os.remove(self._spill_path)
+            except OSError as e:
+                self.logger.warning(f"删除临时文件失败: {self._spill_path} ({e})")
+            self._spill_path = None
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        self.flush()
+        state = self.__dict__.copy()
+        del state['logger']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(self.__class__.__name__)
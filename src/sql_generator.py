@@ -2,33 +2,81 @@
 
 import os
 import logging
-from typing import List, Dict, Any, TextIO
+from itertools import chain
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sized, TextIO, Tuple
 from datetime import datetime
 
+try:
+    from .compressed_output import open_output
+    from .row_formatter import compile_row_formatter
+except ImportError:
+    from compressed_output import open_output
+    from row_formatter import compile_row_formatter
+
 class SqlGenerator:
     
-    def __init__(self, output_file: str):
+    # 数据写入顺序
+    table_order = [
+        'airports', 'waypoints', 'navaids', 'airways', 
+        'holdings', 'mora', 'msa', 'terminal_procedures',
+        'runways', 'frequencies', 'gates'
+    ]
+    
+    # 制表符分隔的数据 (LOAD DATA数据文件、COPY块) 每次写入的行数
+    write_batch_lines = 1000
+    
+    def __init__(self, output_file: str, import_optimized: bool = False, commit_every: int = 10,
+                 batch_size: int = 1000, max_statement_bytes: int = 1024 * 1024,
+                 compression_threads: int = 0):
         self.output_file = output_file
         self.logger = logging.getLogger(self.__class__.__name__)
+        # 各表实际写入的记录数，流式写入时边写边统计
+        self.record_counts: Dict[str, int] = {}
+        # 导入优化: 先建不带索引的表，关闭自动提交和唯一性检查，数据导入后再添加索引
+        self.import_optimized = import_optimized
+        # 导入优化时每多少批INSERT提交一次
+        self.commit_every = max(1, commit_every)
+        # 每条INSERT语句的行数上限和字节数上限 (UTF-8)，字节数需小于服务器的max_allowed_packet
+        self.batch_size = max(1, batch_size)
+        self.max_statement_bytes = max_statement_bytes
+        # 输出文件以 .gz/.xz 结尾时的压缩线程数，0为CPU核数
+        self.compression_threads = compression_threads
+        self._uncommitted_batches = 0
+        # 各表写出的INSERT语句字节数 (UTF-8)，用于性能报告
+        self.output_bytes: Dict[str, int] = {}
+        # (表名, 字段顺序) -> 编译好的行格式化函数
+        self._row_formatters: Dict[tuple, Callable[[tuple], str]] = {}
         
         output_dir = os.path.dirname(output_file)
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir)
     
-    def generate_complete_sql(self, data_dict: Dict[str, List[Dict[str, Any]]]) -> None:
+    def generate_complete_sql(self, data_dict: Dict[str, Iterable[tuple]]) -> None:
         """
         生成完整的SQL文件
         Args:
-            data_dict: 包含所有表数据的字典
+            data_dict: 包含所有表数据的字典，值可以是列表或记录迭代器，
+                       记录为 record_types 中的记录类型，也兼容dict
         """
-        with open(self.output_file, 'w', encoding='utf-8') as f:
+        with self._open_output(self.output_file) as f:
             self._write_header(f)
             self._write_schema(f)
+            if self.import_optimized:
+                f.write("SET autocommit = 0;\n")
+                f.write("SET UNIQUE_CHECKS = 0;\n\n")
             self._write_data(f, data_dict)
+            if self.import_optimized:
+                self._write_deferred_indexes(f)
             self._write_footer(f)
         
         self.logger.info(f"SQL文件生成完成: {self.output_file}")
     
+    def _open_output(self, path: str, newline: str = None) -> TextIO:
+        """
+        打开输出文件，.gz/.xz 结尾时边写边多线程压缩，不产生未压缩的临时文件
+        """
+        return open_output(path, self.compression_threads, newline=newline)
+    
     def _write_header(self, f: TextIO) -> None:
         """
         写入SQL文件头部 
@@ -52,19 +100,26 @@ class SqlGenerator:
             f: 文件对象
         """
         try:
-            from .sql_schemas import get_create_database_sql
+            from .sql_schemas import ALL_TABLES, get_create_database_sql, get_create_table_without_indexes
         except ImportError:
             # 如果相对导入失败，尝试绝对导入
-            from sql_schemas import get_create_database_sql
+            from sql_schemas import ALL_TABLES, get_create_database_sql, get_create_table_without_indexes
         
         f.write("-- =====================================================\n")
         f.write("-- 数据库表结构\n")
         f.write("-- =====================================================\n\n")
         
-        f.write(get_create_database_sql())
+        if self.import_optimized:
+            # 索引在数据导入后由 _write_deferred_indexes 添加
+            for table_name in ALL_TABLES:
+                f.write(f"-- {table_name.upper()} 表 (索引在数据导入后添加)\n")
+                f.write(get_create_table_without_indexes(table_name))
+                f.write("\n\n")
+        else:
+            f.write(get_create_database_sql())
         f.write("\n")
     
-    def _write_data(self, f: TextIO, data_dict: Dict[str, List[Dict[str, Any]]]) -> None:
+    def _write_data(self, f: TextIO, data_dict: Dict[str, Iterable[tuple]]) -> None:
         """
         写入数据INSERT语句
         
@@ -77,52 +132,197 @@ class SqlGenerator:
         f.write("-- =====================================================\n\n")
         
         # 按表顺序插入数据
-        table_order = [
-            'airports', 'waypoints', 'navaids', 'airways', 
-            'holdings', 'mora', 'msa', 'terminal_procedures'
-        ]
+        for table_name in self.table_order:
+            if table_name not in data_dict:
+                continue
+            
+            # 迭代器在写入时才真正解析数据，单表失败不影响其他表
+            try:
+                self.record_counts[table_name] = self._write_table_data(f, table_name, data_dict[table_name])
+            except Exception as e:
+                self.logger.error(f"写入 {table_name} 表数据失败: {e}")
+                self.record_counts.setdefault(table_name, 0)
+            
+            # 每张表结束时提交剩余的批次
+            if self._uncommitted_batches:
+                f.write("COMMIT;\n\n")
+                self._uncommitted_batches = 0
+    
+    def _write_deferred_indexes(self, f: TextIO) -> None:
+        """
+        数据导入后为每张表添加索引，每张表一条ALTER TABLE语句，只需重建一次表
+        
+        Args:
+            f: 文件对象
+        """
+        try:
+            from .sql_schemas import ALL_TABLES, get_add_indexes_sql
+        except ImportError:
+            from sql_schemas import ALL_TABLES, get_add_indexes_sql
+        
+        f.write("-- =====================================================\n")
+        f.write("-- 添加索引\n")
+        f.write("-- =====================================================\n\n")
         
-        for table_name in table_order:
-            if table_name in data_dict and data_dict[table_name]:
-                self._write_table_data(f, table_name, data_dict[table_name])
+        for table_name in ALL_TABLES:
+            index_sql = get_add_indexes_sql(table_name)
+            if index_sql:
+                f.write(index_sql)
+                f.write("\n")
+        
+        f.write("SET UNIQUE_CHECKS = 1;\n")
+        f.write("SET autocommit = 1;\n\n")
     
-    def _write_table_data(self, f: TextIO, table_name: str, records: List[Dict[str, Any]]) -> None:
+    def _write_table_data(self, f: TextIO, table_name: str, records: Iterable[tuple]) -> int:
         """
         写入单个表的数据
         
         Args:
             f: 文件对象
             table_name: 表名
-            records: 数据记录列表
+            records: 数据记录列表或迭代器
+            
+        Returns:
+            int: 写入的记录数
         """
-        if not records:
-            return
+        field_names, record_iter = self._get_positional_records(records)
+        if field_names is None:
+            return 0
         
-        f.write(f"-- {table_name.upper()} 表数据 ({len(records)} 条记录)\n")
+        f.write(f"-- {table_name.upper()} 表数据\n")
         
-        # 获取字段名
-        field_names = list(records[0].keys())
-        field_names_str = ', '.join(field_names)
+        record_count = self._write_insert_statements(f, table_name, field_names, record_iter)
         
-        # 批量插入，每批1000条记录
-        batch_size = 1000
-        for i in range(0, len(records), batch_size):
-            batch_records = records[i:i + batch_size]
-            
-            f.write(f"INSERT INTO {table_name} ({field_names_str}) VALUES\n")
+        f.write(f"-- {table_name.upper()} 表数据共 {record_count} 条记录\n\n")
+        self.logger.info(f"写入 {table_name} 表数据: {record_count} 条记录")
+        return record_count
+    
+    def _get_positional_records(self, records: Iterable[tuple]) -> Tuple[Optional[List[str]], Iterator[tuple]]:
+        """
+        获取字段名和按位置排列的记录: 记录类型(namedtuple)按位置读取，dict记录先转换为按字段顺序的元组
+        
+        Args:
+            records: 数据记录列表或迭代器
             
-            values_list = []
-            for record in batch_records:
-                values = []
-                for field_name in field_names:
-                    value = record.get(field_name)
-                    values.append(self._format_sql_value(value))
-                values_list.append(f"({', '.join(values)})")
+        Returns:
+            Tuple: (字段名, 记录迭代器)，没有记录时字段名为None
+        """
+        record_iter = iter(records)
+        first_record = next(record_iter, None)
+        if first_record is None:
+            return None, record_iter
+        
+        if isinstance(first_record, dict):
+            field_names = list(first_record.keys())
+            record_iter = (tuple(record.get(name) for name in field_names)
+                           for record in chain([first_record], record_iter))
+        else:
+            field_names = list(first_record._fields)
+            record_iter = chain([first_record], record_iter)
+        return field_names, record_iter
+    
+    def _write_insert_statements(self, f: TextIO, table_name: str, field_names: List[str],
+                                 records: Iterable[tuple]) -> int:
+        """
+        按批写入INSERT语句: 边格式化边累计字节数，加入下一行会超出字节预算或达到行数上限时结束当前语句，
+        单行就超出预算时该行单独成为一条语句
+        
+        Args:
+            f: 文件对象
+            table_name: 表名
+            field_names: 字段名，与记录中值的顺序一致
+            records: 按位置排列的记录迭代器
             
-            f.write(',\n'.join(values_list))
-            f.write(";\n\n")
+        Returns:
+            int: 写入的记录数
+        """
+        statement_head = f"INSERT INTO {table_name} ({', '.join(field_names)}) VALUES\n"
+        format_row = self._get_row_formatter(table_name, field_names)
+        batch_size = self.batch_size
+        # 语句开头和结尾的 ";" 计入预算，每行另加分隔的 ",\n"
+        head_bytes = len(statement_head.encode('utf-8')) + 1
+        byte_budget = self.max_statement_bytes
+        
+        record_count = 0
+        written_bytes = 0
+        rows = []
+        statement_bytes = head_bytes
+        for record in records:
+            row = format_row(record)
+            row_bytes = (len(row) if row.isascii() else len(row.encode('utf-8'))) + 2
+            if rows and (len(rows) >= batch_size or statement_bytes + row_bytes > byte_budget):
+                self._write_insert_statement(f, statement_head, rows)
+                record_count += len(rows)
+                written_bytes += statement_bytes
+                rows = []
+                statement_bytes = head_bytes
+            rows.append(row)
+            statement_bytes += row_bytes
+        
+        if rows:
+            self._write_insert_statement(f, statement_head, rows)
+            record_count += len(rows)
+            written_bytes += statement_bytes
+        
+        self.output_bytes[table_name] = self.output_bytes.get(table_name, 0) + written_bytes
+        return record_count
+    
+    def _write_insert_statement(self, f: TextIO, statement_head: str, rows: List[str]) -> None:
+        f.write(statement_head)
+        f.write(',\n'.join(rows))
+        f.write(";\n\n")
+        
+        if self.import_optimized:
+            self._uncommitted_batches += 1
+            if self._uncommitted_batches >= self.commit_every:
+                f.write("COMMIT;\n\n")
+                self._uncommitted_batches = 0
+    
+    def _write_delimited_rows(self, f: TextIO, column_names: List[str], records: Iterable[tuple],
+                              format_value: Callable[[Any], str]) -> int:
+        """
+        把记录写成制表符分隔的文本行，每积累 write_batch_lines 行写入一次
+        
+        Args:
+            f: 文件对象
+            column_names: 字段名，dict记录按此顺序取值
+            records: 数据记录迭代器，记录字段顺序与建表语句一致，也兼容dict
+            format_value: 单个字段的格式化函数 (含转义)
         
-        self.logger.info(f"写入 {table_name} 表数据: {len(records)} 条记录")
+        Returns:
+            int: 写入的记录数
+        """
+        batch_lines = self.write_batch_lines
+        record_count = 0
+        lines = []
+        for record in records:
+            if isinstance(record, dict):
+                record = [record.get(name) for name in column_names]
+            lines.append('\t'.join(map(format_value, record)))
+            if len(lines) >= batch_lines:
+                record_count += self._flush_lines(f, lines)
+        record_count += self._flush_lines(f, lines)
+        return record_count
+    
+    @staticmethod
+    def _flush_lines(f: TextIO, lines: List[str]) -> int:
+        count = len(lines)
+        if count:
+            f.write('\n'.join(lines))
+            f.write('\n')
+            lines.clear()
+        return count
+    
+    def _get_row_formatter(self, table_name: str, field_names: List[str]) -> Callable[[tuple], str]:
+        """
+        获取按表结构编译的行格式化函数，每个表和字段顺序只编译一次
+        """
+        key = (table_name, tuple(field_names))
+        format_row = self._row_formatters.get(key)
+        if format_row is None:
+            format_row = compile_row_formatter(table_name, field_names, self._format_sql_value)
+            self._row_formatters[key] = format_row
+        return format_row
     
     def _format_sql_value(self, value: Any) -> str:
         """
@@ -163,21 +363,21 @@ class SqlGenerator:
         f.write("SET FOREIGN_KEY_CHECKS = 1;\n")
         f.write("-- 数据库导入完成\n")
     
-    def generate_table_sql(self, table_name: str, records: List[Dict[str, Any]], 
+    def generate_table_sql(self, table_name: str, records: Iterable[tuple], 
                           output_file: str = None) -> None:
         """
         生成单个表的SQL文件
         
         Args:
             table_name: 表名
-            records: 数据记录列表
+            records: 数据记录列表或迭代器
             output_file: 输出文件路径，如果为None则使用默认路径
         """
         if output_file is None:
             base_name = os.path.splitext(self.output_file)[0]
             output_file = f"{base_name}_{table_name}.sql"
         
-        with open(output_file, 'w', encoding='utf-8') as f:
+        with self._open_output(output_file) as f:
             self._write_header(f)
             
             # 写入单个表的结构
@@ -191,17 +391,49 @@ class SqlGenerator:
                 f.write("\n\n")
             
             # 写入数据
-            self._write_table_data(f, table_name, records)
+            self.record_counts[table_name] = self._write_table_data(f, table_name, records)
             self._write_footer(f)
         
         self.logger.info(f"单表SQL文件生成完成: {output_file}")
     
-    def get_statistics(self, data_dict: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+    def generate_airport_patch_sql(self, table_name: str, airport_icaos: List[str],
+                                   records: Iterable[tuple]) -> None:
+        """
+        生成按机场替换数据的SQL: 先删除受影响机场的全部记录，再插入这些机场的新记录
+        
+        Args:
+            table_name: 表名，需要有airport_icao字段
+            airport_icaos: 受影响 (新增、变化或已删除) 的机场ICAO代码
+            records: 新增或变化机场的记录
+        """
+        with self._open_output(self.output_file) as f:
+            self._write_header(f)
+            f.write(f"-- 按机场更新 {table_name}: {len(airport_icaos)} 个机场\n")
+            f.write("START TRANSACTION;\n\n")
+            
+            # 每条DELETE语句最多500个机场
+            format_value = self._format_sql_value
+            for start in range(0, len(airport_icaos), 500):
+                icao_list = ', '.join(map(format_value, airport_icaos[start:start + 500]))
+                f.write(f"DELETE FROM {table_name} WHERE airport_icao IN ({icao_list});\n")
+            f.write("\n")
+            
+            self.record_counts[table_name] = self._write_table_data(f, table_name, records)
+            f.write("COMMIT;\n\n")
+            self._write_footer(f)
+        
+        self.logger.info(f"按机场更新的SQL文件生成完成: {self.output_file}")
+    
+    def get_statistics(self, data_dict: Dict[str, Iterable[tuple]]) -> Dict[str, int]:
         stats = {}
         total_records = 0
         
         for table_name, records in data_dict.items():
-            count = len(records) if records else 0
+            # 已写入的表使用写入时的计数，迭代器无法再次取长度
+            if table_name in self.record_counts:
+                count = self.record_counts[table_name]
+            else:
+                count = len(records) if isinstance(records, Sized) else 0
             stats[table_name] = count
             total_records += count
         
@@ -1,4 +1,14 @@
 # -*- coding: utf-8 -*-
+import re
+from typing import List, NamedTuple, Tuple
+
+# 建表语句中的字段定义行，如 "latitude DECIMAL(12, 9) NOT NULL,"
+_COLUMN_PATTERN = re.compile(r'^(\w+)\s+([A-Za-z]+(?:\s*\(\s*\d+\s*(?:,\s*\d+\s*)?\))?)')
+_NON_COLUMN_KEYWORDS = {'KEY', 'UNIQUE', 'PRIMARY', 'INDEX', 'CREATE', 'DROP', 'CONSTRAINT'}
+# 建表语句中的索引定义行，如 "KEY idx_airports_icao (icao_code)," 或 "UNIQUE(icao_code),"
+_INDEX_PATTERN = re.compile(r'^(UNIQUE|KEY|INDEX)\s*(?:KEY\s+|INDEX\s+)?(\w*)\s*\(([^)]*)\)', re.IGNORECASE)
+# 字段定义行末尾 (注释之前) 的逗号
+_TRAILING_COMMA_PATTERN = re.compile(r',(?=\s*(?:--|$))')
 
 AIRPORTS_TABLE = """
 DROP TABLE IF EXISTS airports;
@@ -210,6 +220,69 @@ CREATE TABLE terminal_procedures (
 );
 """
 
+RUNWAYS_TABLE = """
+DROP TABLE IF EXISTS runways;
+CREATE TABLE runways (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,
+    airport_icao VARCHAR(8) NOT NULL,                 -- 机场标识 (1302元数据中的ICAO代码，没有时为机场头中的标识)
+    runway_type CHAR(1) NOT NULL,                     -- 类型 (L=陆地跑道 100, W=水上跑道 101, H=直升机坪 102)
+    width DECIMAL(6, 2) NOT NULL,                     -- 宽度 (米)
+    surface_type INTEGER,                             -- 道面类型代码 (1=沥青, 2=混凝土, 3=草地...，水上跑道为NULL)
+    
+    -- 跑道端1 (直升机坪为直升机坪本身)
+    end1_identifier VARCHAR(7) NOT NULL,              -- 跑道号 (如16L)，直升机坪为名称
+    end1_latitude DECIMAL(12, 9) NOT NULL,            -- 入口纬度
+    end1_longitude DECIMAL(12, 9) NOT NULL,           -- 入口经度
+    end1_displaced_threshold DECIMAL(7, 2),           -- 内移入口长度 (米)
+    end1_overrun_length DECIMAL(7, 2),                -- 停止道/防吹坪长度 (米)
+    
+    -- 跑道端2 (直升机坪为NULL)
+    end2_identifier VARCHAR(7),
+    end2_latitude DECIMAL(12, 9),
+    end2_longitude DECIMAL(12, 9),
+    end2_displaced_threshold DECIMAL(7, 2),
+    end2_overrun_length DECIMAL(7, 2),
+    
+    KEY idx_runways_airport (airport_icao),
+    KEY idx_runways_location (end1_latitude, end1_longitude)
+);
+"""
+
+FREQUENCIES_TABLE = """
+DROP TABLE IF EXISTS frequencies;
+CREATE TABLE frequencies (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,
+    airport_icao VARCHAR(8) NOT NULL,                 -- 机场标识
+    frequency_type VARCHAR(4) NOT NULL,               -- 类型 (ATIS, CTAF, CLD, GND, TWR, APP, DEP)
+    frequency_khz INTEGER NOT NULL,                   -- 频率 (kHz，如118700)
+    name VARCHAR(64),                                 -- 名称 (如 SEATTLE TWR)
+    
+    KEY idx_frequencies_airport (airport_icao),
+    KEY idx_frequencies_frequency (frequency_khz)
+);
+"""
+
+GATES_TABLE = """
+DROP TABLE IF EXISTS gates;
+CREATE TABLE gates (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,
+    airport_icao VARCHAR(8) NOT NULL,                 -- 机场标识
+    latitude DECIMAL(12, 9) NOT NULL,                 -- 纬度
+    longitude DECIMAL(12, 9) NOT NULL,                -- 经度
+    heading DECIMAL(6, 2) NOT NULL,                   -- 航向 (真航向)
+    location_type VARCHAR(8),                         -- 位置类型 (gate, hangar, tie-down, misc，旧格式15为NULL)
+    aircraft_types VARCHAR(64),                       -- 适用机型 (heavy|jets|turboprops|props|helos)
+    name VARCHAR(128) NOT NULL,                       -- 名称 (如 Gate A2)
+    
+    -- 1301 停机位元数据
+    icao_width CHAR(1),                               -- ICAO机型类别 (A-F)
+    operation_type VARCHAR(16),                       -- 运营类型 (general_aviation, airline, cargo, military)
+    airlines VARCHAR(255),                            -- 航空公司代码 (空格分隔)
+    
+    KEY idx_gates_airport (airport_icao)
+);
+"""
+
 ALL_TABLES = {
     'airports': AIRPORTS_TABLE,
     'airways': AIRWAYS_TABLE,
@@ -218,9 +291,127 @@ ALL_TABLES = {
     'navaids': NAVAIDS_TABLE,
     'mora': MORA_TABLE,
     'msa': MSA_TABLE,
-    'terminal_procedures': TERMINAL_PROCEDURES_TABLE
+    'terminal_procedures': TERMINAL_PROCEDURES_TABLE,
+    'runways': RUNWAYS_TABLE,
+    'frequencies': FREQUENCIES_TABLE,
+    'gates': GATES_TABLE
+}
+
+# 各表的自然键，用于在两个AIRAC周期之间对应同一条记录 (增量模式)
+# 自然键在数据中不一定唯一，重复时按出现顺序编号区分
+NATURAL_KEYS = {
+    'airports': ('icao_code',),
+    'airways': ('airway_name', 'from_waypoint', 'from_region', 'from_section',
+                'to_waypoint', 'to_region', 'to_section'),
+    'waypoints': ('waypoint_name', 'usage_type', 'region_code'),
+    'holdings': ('waypoint_name', 'region_code', 'airport_icao', 'section_code',
+                 'inbound_course', 'turn_direction'),
+    'navaids': ('identifier', 'region_code', 'usage_type', 'nav_type'),
+    'mora': ('latitude_deg', 'longitude_deg'),
+    'msa': ('navaid_identifier', 'region_code', 'airport_icao', 'msa_type'),
+    'terminal_procedures': ('airport_icao', 'procedure_type', 'procedure_name',
+                            'transition_name', 'sequence_number'),
+    'runways': ('airport_icao', 'runway_type', 'end1_identifier'),
+    'frequencies': ('airport_icao', 'frequency_type', 'frequency_khz'),
+    'gates': ('airport_icao', 'name')
 }
 
+def get_table_columns(table_name: str) -> List[Tuple[str, str]]:
+    """
+    从建表语句中解析出数据字段，按建表顺序返回 (字段名, SQL类型)，不包含自增id
+    """
+    columns = []
+    for line in ALL_TABLES[table_name].splitlines():
+        line = line.split('--', 1)[0].strip()
+        match = _COLUMN_PATTERN.match(line)
+        if not match or match.group(1).upper() in _NON_COLUMN_KEYWORDS:
+            continue
+        if 'AUTO_INCREMENT' in line:
+            continue
+        columns.append((match.group(1), re.sub(r'\s+', '', match.group(2).upper())))
+    return columns
+
+def get_column_kind(sql_type: str) -> str:
+    """
+    把 get_table_columns 返回的SQL类型 (如 'DECIMAL(12,9)') 归类为值类型:
+    int / float / bool / str，其他类型按字符串处理
+    """
+    base_type = sql_type.split('(', 1)[0]
+    if base_type in ('INTEGER', 'INT', 'SMALLINT', 'BIGINT', 'TINYINT'):
+        return 'int'
+    if base_type in ('DECIMAL', 'NUMERIC', 'FLOAT', 'DOUBLE', 'REAL'):
+        return 'float'
+    if base_type in ('BOOLEAN', 'BOOL'):
+        return 'bool'
+    return 'str'
+
+class IndexDefinition(NamedTuple):
+    name: str
+    columns: Tuple[str, ...]
+    unique: bool = False
+
+def _iter_definition_lines(table_name: str):
+    for line in ALL_TABLES[table_name].splitlines():
+        line = line.split('--', 1)[0].strip().rstrip(',')
+        if line:
+            yield line
+
+def get_column_definitions(table_name: str) -> List[Tuple[str, str]]:
+    """
+    按建表顺序返回数据字段的完整定义 (字段名, 类型及约束)，如 ('runway_length', 'INTEGER DEFAULT 0')，不包含自增id
+    """
+    definitions = []
+    for line in _iter_definition_lines(table_name):
+        match = _COLUMN_PATTERN.match(line)
+        if not match or match.group(1).upper() in _NON_COLUMN_KEYWORDS or 'AUTO_INCREMENT' in line:
+            continue
+        definitions.append((match.group(1), line[len(match.group(1)):].strip()))
+    return definitions
+
+def get_table_indexes(table_name: str) -> List[IndexDefinition]:
+    """
+    返回建表语句中的索引 (KEY和UNIQUE)，不包含主键；未命名的UNIQUE命名为 uk_<表名>_<字段名>
+    """
+    indexes = []
+    for line in _iter_definition_lines(table_name):
+        match = _INDEX_PATTERN.match(line)
+        if not match:
+            continue
+        columns = tuple(column.strip() for column in match.group(3).split(','))
+        unique = match.group(1).upper() == 'UNIQUE'
+        name = match.group(2) or f"uk_{table_name}_{'_'.join(columns)}"
+        indexes.append(IndexDefinition(name, columns, unique))
+    return indexes
+
+def get_create_table_without_indexes(table_name: str) -> str:
+    """
+    返回去掉KEY和UNIQUE索引的建表语句，主键保留，索引由 get_add_indexes_sql 在数据导入后添加
+    """
+    lines = []
+    for line in ALL_TABLES[table_name].splitlines():
+        code = line.split('--', 1)[0].strip()
+        if _INDEX_PATTERN.match(code):
+            continue
+        if code.startswith(')'):
+            # 去掉索引前的空行，最后一个字段定义后面不能有逗号 (用空格代替，保持注释对齐)
+            while lines and not lines[-1].strip():
+                lines.pop()
+            lines[-1] = _TRAILING_COMMA_PATTERN.sub(' ', lines[-1], count=1).rstrip()
+        lines.append(line)
+    return "\n".join(lines)
+
+def get_add_indexes_sql(table_name: str) -> str:
+    """
+    返回为表添加全部索引的一条 ALTER TABLE 语句，没有索引时返回空字符串
+    """
+    clauses = []
+    for index in get_table_indexes(table_name):
+        kind = 'UNIQUE KEY' if index.unique else 'INDEX'
+        clauses.append(f"    ADD {kind} {index.name} ({', '.join(index.columns)})")
+    if not clauses:
+        return ''
+    return f"ALTER TABLE {table_name}\n" + ",\n".join(clauses) + ";\n"
+
 def get_create_database_sql():
     sql_statements = []
 
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+直接生成SQLite导航数据库
+
+表结构由 sql_schemas 转换而来: 先建不带索引的表，每张表在一个事务中用executemany批量写入，
+全部写完后再建索引，并为机场、航路点和导航设备的坐标建立R*Tree空间索引
+"""
+
+import os
+import re
+import sqlite3
+from typing import Dict, Iterable, Iterator
+
+try:
+    from .sql_generator import SqlGenerator
+    from .sql_schemas import get_column_definitions, get_table_indexes
+except ImportError:
+    from sql_generator import SqlGenerator
+    from sql_schemas import get_column_definitions, get_table_indexes
+
+# 需要建立R*Tree空间索引的表 -> (纬度字段, 经度字段)
+RTREE_TABLES = {
+    'airports': ('latitude', 'longitude'),
+    'waypoints': ('latitude', 'longitude'),
+    'navaids': ('latitude', 'longitude'),
+}
+
+# 写入期间的PRAGMA: 输出文件是新建的，写入失败时直接删除，不需要同步到磁盘；
+# 回滚日志放在内存中 (单表写入失败时需要回滚，journal_mode = OFF 时回滚的行为未定义)
+_LOAD_PRAGMAS = (
+    "PRAGMA page_size = 8192",
+    "PRAGMA journal_mode = MEMORY",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA locking_mode = EXCLUSIVE",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+)
+
+def to_sqlite_definition(definition: str) -> str:
+    """
+    把MySQL字段定义转换为SQLite: DECIMAL使用REAL (NUMERIC亲和性会把1.0存成整数1)，BOOLEAN使用INTEGER
+    """
+    definition = re.sub(r'^DECIMAL\s*\([^)]*\)', 'REAL', definition, flags=re.IGNORECASE)
+    definition = re.sub(r'^BOOLEAN\b', 'INTEGER', definition, flags=re.IGNORECASE)
+    definition = re.sub(r'\bDEFAULT\s+FALSE\b', 'DEFAULT 0', definition, flags=re.IGNORECASE)
+    return re.sub(r'\bDEFAULT\s+TRUE\b', 'DEFAULT 1', definition, flags=re.IGNORECASE)
+
+def get_sqlite_create_table(table_name: str) -> str:
+    """
+    生成不带索引的SQLite建表语句，id为rowid别名
+    """
+    columns = ["    id INTEGER PRIMARY KEY"]
+    columns.extend(f"    {name} {to_sqlite_definition(definition)}"
+                   for name, definition in get_column_definitions(table_name))
+    return f"CREATE TABLE {table_name} (\n" + ",\n".join(columns) + "\n)"
+
+class SqliteGenerator(SqlGenerator):
+
+    def generate_complete_sql(self, data_dict: Dict[str, Iterable[tuple]]) -> None:
+        """
+        生成SQLite数据库文件，已存在的文件会被替换
+    
+        Args:
+            data_dict: 包含所有表数据的字典，值可以是列表或记录迭代器
+        """
+        temp_file = f"{self.output_file}.tmp"
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    
+        connection = sqlite3.connect(temp_file, isolation_level=None)
+        try:
+            for pragma in _LOAD_PRAGMAS:
+                connection.execute(pragma)
+    
+            for table_name in self.table_order:
+                if table_name not in data_dict:
+                    continue
+                connection.execute(get_sqlite_create_table(table_name))
+    
+                # 迭代器在写入时才真正解析数据，单表失败不影响其他表
+                try:
+                    self.record_counts[table_name] = self._load_table(connection, table_name,
+                                                                      data_dict[table_name])
+                except Exception as e:
+                    self.logger.error(f"写入 {table_name} 表数据失败: {e}")
+                    self.record_counts.setdefault(table_name, 0)
+    
+            # 数据写完后再建索引，避免写入时逐行维护索引
+            for table_name in self.record_counts:
+                self._create_indexes(connection, table_name)
+    
+            connection.execute("ANALYZE")
+            connection.execute("PRAGMA journal_mode = DELETE")
+        except BaseException:
+            connection.close()
+            os.remove(temp_file)
+            raise
+        connection.close()
+    
+        os.replace(temp_file, self.output_file)
+        self.logger.info(f"SQLite数据库生成完成: {self.output_file}")
+    
+    def _load_table(self, connection: sqlite3.Connection, table_name: str, records: Iterable[tuple]) -> int:
+        """
+        在一个事务中写入单个表的数据，失败时回滚该表
+    
+        Args:
+            connection: 数据库连接
+            table_name: 表名
+            records: 数据记录列表或迭代器
+    
+        Returns:
+            int: 写入的记录数
+        """
+        column_names = [name for name, _ in get_column_definitions(table_name)]
+        insert_sql = (f"INSERT INTO {table_name} ({', '.join(column_names)}) "
+                      f"VALUES ({', '.join('?' * len(column_names))})")
+        record_count = 0
+    
+        def iter_rows() -> Iterator[tuple]:
+            nonlocal record_count
+            for record in records:
+                if isinstance(record, dict):
+                    record = tuple(record.get(name) for name in column_names)
+                record_count += 1
+                yield record
+    
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(insert_sql, iter_rows())
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    
+        self.logger.info(f"写入 {table_name} 表数据: {record_count} 条记录")
+        return record_count
+    
+    def _create_indexes(self, connection: sqlite3.Connection, table_name: str) -> None:
+        """
+        按 sql_schemas 中的定义建立索引，坐标表另建R*Tree空间索引
+        """
+        connection.execute("BEGIN")
+        for index in get_table_indexes(table_name):
+            unique = 'UNIQUE ' if index.unique else ''
+            connection.execute(f"CREATE {unique}INDEX {index.name} ON {table_name} ({', '.join(index.columns)})")
+    
+        if table_name in RTREE_TABLES:
+            self._create_rtree(connection, table_name, *RTREE_TABLES[table_name])
+        connection.execute("COMMIT")
+    
+    def _create_rtree(self, connection: sqlite3.Connection, table_name: str,
+                      latitude_column: str, longitude_column: str) -> None:
+        """
+        建立 <表名>_rtree 空间索引表，id与数据表的id对应，点坐标的最小值和最大值相同
+        """
+        try:
+            connection.execute(f"CREATE VIRTUAL TABLE {table_name}_rtree "
+                               "USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+        except sqlite3.OperationalError as e:
+            self.logger.warning(f"当前SQLite不支持R*Tree，跳过 {table_name} 的空间索引: {e}")
+            return
+    
+        connection.execute(
+            f"INSERT INTO {table_name}_rtree "
+            f"SELECT id, {latitude_column}, {latitude_column}, {longitude_column}, {longitude_column} "
+            f"FROM {table_name}")
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 源码模块按 src 目录下的顶层模块导入 (与 main.py 相同)，合成数据生成器在 benchmarks 目录下
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'src'))
+sys.path.insert(0, os.path.join(PROJECT_DIR, 'benchmarks'))
+
+@pytest.fixture(scope='session', autouse=True)
+def work_directory(tmp_path_factory):
+    """
+    XPlaneConverter 在当前目录写 conversion.log，测试在临时目录中运行，结束时停止日志监听线程
+    """
+    previous = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('work'))
+    yield
+    os.chdir(previous)
+    
+    main = sys.modules.get('main')
+    if main is not None and main._log_listener is not None:
+        main._log_listener.stop()
+        main._log_listener = None
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from parsers import AirportFacilityParser, FrequencyParser, GateParser, RunwayParser
+from record_types import FrequencyRecord, GateRecord, RunwayRecord
+
+HEADER = "I\n1200 Version - data cycle 2401, build 20240101, metadata AptXP1200.\n\n"
+
+APT_LINES = [
+    # 机场头中的X-Plane标识由1302 icao_code覆盖
+    "1    433 0 0 XSEA Seattle Tacoma Intl",
+    "1302 city Seattle",
+    "1302 icao_code KSEA",
+    "100 45.72 1 0 0.25 1 3 0 16L 47.46379136 -122.30800667 0.00 0.00 3 0 0 1 "
+    "34R 47.43121431 -122.30809111 0.00 60.96 3 0 0 1",
+    "50 12780 SEATTLE ATIS",
+    "1054 119900 SEATTLE TOWER",
+    "110 1 0.25 150.00 Taxiway A",
+    "111 47.44000000 -122.30000000",
+    "1201 47.44000000 -122.30000000 both 1",
+    "1300 47.44314 -122.29860 270.00 gate jets|turboprops A2",
+    "1301 C airline AAL UAL",
+    "1300 47.44320 -122.29870 90.00 tie_down props Ramp 1",
+    "15 47.44330 -122.29880 180.00 Old Ramp",
+    # 没有1302 icao_code时使用机场头中的标识
+    "16   0 0 0 W55 Seaplane Base",
+    "101 50.00 1 01 47.60000000 -122.30000000 19 47.61000000 -122.30000000",
+    "1300 47.60100 -122.30100 0.00 misc props Dock",
+    "1301 A general_aviation",
+    "17   20 0 0 H01 City Heliport",
+    "1302 icao_code KH01",
+    "102 H1 47.62000000 -122.33000000 0.00 15.00 15.00 2 0 0 0.25 0",
+    "1051 122800 CTAF",
+    "15 47.62010 -122.33010 45.00 Pad Parking",
+]
+
+@pytest.fixture
+def apt_file(tmp_path):
+    path = tmp_path / 'earth_apt.dat'
+    path.write_text(HEADER + '\n'.join(APT_LINES) + "\n99\n", encoding='utf-8')
+    return str(path)
+
+def test_runways(apt_file):
+    assert RunwayParser(apt_file).parse() == [
+        RunwayRecord('KSEA', 'L', 45.72, 1, '16L', 47.46379136, -122.30800667, 0.0, 0.0,
+                     '34R', 47.43121431, -122.30809111, 0.0, 60.96),
+        RunwayRecord('W55', 'W', 50.0, None, '01', 47.6, -122.3, None, None, '19', 47.61, -122.3, None, None),
+        RunwayRecord('KH01', 'H', 15.0, 2, 'H1', 47.62, -122.33, None, None, None, None, None, None, None),
+    ]
+
+def test_frequencies(apt_file):
+    assert FrequencyParser(apt_file).parse() == [
+        FrequencyRecord('KSEA', 'ATIS', 127800, 'SEATTLE ATIS'),
+        FrequencyRecord('KSEA', 'TWR', 119900, 'SEATTLE TOWER'),
+        FrequencyRecord('KH01', 'CTAF', 122800, 'CTAF'),
+    ]
+
+def test_gates_pair_metadata_with_the_preceding_location(apt_file):
+    assert GateParser(apt_file).parse() == [
+        GateRecord('KSEA', 47.44314, -122.2986, 270.0, 'gate', 'jets|turboprops', 'A2', 'C', 'airline', 'AAL UAL'),
+        # 没有1301的停机位在下一个停机位出现时输出
+        GateRecord('KSEA', 47.4432, -122.2987, 90.0, 'tie_down', 'props', 'Ramp 1', None, None, None),
+        # 旧格式15行没有类型和元数据，机场结束时输出
+        GateRecord('KSEA', 47.4433, -122.2988, 180.0, None, None, 'Old Ramp', None, None, None),
+        GateRecord('W55', 47.601, -122.301, 0.0, 'misc', 'props', 'Dock', 'A', 'general_aviation', None),
+        # 文件结束时输出最后一个等待中的停机位
+        GateRecord('KH01', 47.6201, -122.3301, 45.0, None, None, 'Pad Parking', None, None, None),
+    ]
+
+def test_single_pass_matches_table_parsers(apt_file):
+    records = AirportFacilityParser(apt_file).parse()
+    for parser_class in AirportFacilityParser.table_parsers:
+        record_type = type(parser_class(apt_file).parse()[0])
+        assert [record for record in records if type(record) is record_type] == parser_class(apt_file).parse()
+
+def test_file_without_header(tmp_path):
+    path = tmp_path / 'earth_apt.dat'
+    path.write_text('\n'.join(APT_LINES) + "\n", encoding='utf-8')
+    assert [record.airport_icao for record in RunwayParser(str(path)).parse()] == ['KSEA', 'W55', 'KH01']
+
+def test_find_airport_start(apt_file):
+    parser = GateParser(apt_file)
+    with parser._open_mmap() as mm:
+        start, end = parser._get_data_range(mm)
+        text = mm[:].decode('utf-8')
+        # 从第一个机场的跑道行内部开始查找，返回下一个机场头的行首
+        position = text.index("34R 47.43121431")
+        assert parser._find_airport_start(mm, position, end) == text.index("16   0 0 0 W55")
+        # 从机场头的行内开始时跳过该机场头
+        assert parser._find_airport_start(mm, text.index("W55 Seaplane"), end) == text.index("17   20 0 0 H01")
+        assert parser._find_airport_start(mm, text.index("Pad Parking"), end) == end
+
+@pytest.mark.parametrize('parser_class', [RunwayParser, FrequencyParser, GateParser, AirportFacilityParser])
+def test_chunked_parsing_matches_serial(apt_file, parser_class, monkeypatch):
+    serial = parser_class(apt_file).parse()
+    
+    parser = parser_class(apt_file, workers=6)
+    monkeypatch.setattr(parser, 'chunk_min_bytes', 0)
+    ranges = parser._get_chunk_ranges(6)
+    # 按字节切分的位置落在机场分段中间，每块都移到下一个机场头开始，停机位和元数据不会被分到两块中
+    assert len(ranges) == 3
+    with parser._open_mmap() as mm:
+        assert [mm[start:start + 3].split()[0] for start, _ in ranges] == [b'1', b'16', b'17']
+    assert parser.parse() == serial
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+
+import main
+from parse_cache import ParseCache
+from parsers.terminal_parser import TerminalParser
+
+SID_LINE = "SID:{seq},2,{name},RW04,WP000,K6,P,C,E  ,L,,,IF,,JFK,K6,D,,,0.0,1.5,45.0,,,+,02000,,18000,,,3.0,,,;\n"
+
+def write_airport(cifp_dir, airport_icao, *names):
+    lines = ["RWY:RW04L,,,,,,,,,;\n"]
+    lines.extend(SID_LINE.format(seq=f"{index:03d}", name=name) for index, name in enumerate(names))
+    (cifp_dir / f"{airport_icao}.dat").write_text(''.join(lines), encoding='utf-8')
+
+def run_patch(source_dir, cache_dir, output_file):
+    converter = main.XPlaneConverter(str(source_dir), str(output_file), cache=ParseCache(str(cache_dir)))
+    converter.show_progress = False
+    converter.convert_changed_airports()
+    return output_file.read_text(encoding='utf-8')
+
+def get_deleted_airports(sql):
+    deleted = []
+    for icao_list in re.findall(r"DELETE FROM terminal_procedures WHERE airport_icao IN \((.*)\);", sql):
+        deleted.extend(icao.strip("'") for icao in icao_list.split(', '))
+    return deleted
+
+def get_inserted_procedures(sql):
+    return re.findall(r"^\('(\w+)', 'SID', '\d+', 2, '(\w+)'", sql, re.MULTILINE)
+
+@pytest.fixture
+def source_dir(tmp_path):
+    cifp_dir = tmp_path / 'source' / 'CIFP'
+    cifp_dir.mkdir(parents=True)
+    write_airport(cifp_dir, 'KAAA', 'AAA1')
+    write_airport(cifp_dir, 'KBBB', 'BBB1')
+    write_airport(cifp_dir, 'KCCC', 'CCC1')
+    return tmp_path / 'source'
+
+def test_first_run_replaces_all_airports(tmp_path, source_dir):
+    sql = run_patch(source_dir, tmp_path / 'cache', tmp_path / 'patch.sql')
+    assert get_deleted_airports(sql) == ['KAAA', 'KBBB', 'KCCC']
+    assert get_inserted_procedures(sql) == [('KAAA', 'AAA1'), ('KBBB', 'BBB1'), ('KCCC', 'CCC1')]
+
+def test_failed_airport_is_not_deleted(tmp_path, source_dir, monkeypatch):
+    cache_dir = tmp_path / 'cache'
+    run_patch(source_dir, cache_dir, tmp_path / 'first.sql')
+    
+    cifp_dir = source_dir / 'CIFP'
+    write_airport(cifp_dir, 'KAAA', 'AAA2')
+    write_airport(cifp_dir, 'KBBB', 'BBB2')
+    (cifp_dir / 'KCCC.dat').unlink()
+    
+    parse_airport = TerminalParser.parse_airport
+    
+    def failing_parse_airport(self, file_path, airport_icao):
+        if airport_icao == 'KBBB':
+            raise OSError("无法读取")
+        return parse_airport(self, file_path, airport_icao)
+    
+    monkeypatch.setattr(TerminalParser, 'parse_airport', failing_parse_airport)
+    sql = run_patch(source_dir, cache_dir, tmp_path / 'second.sql')
+    # 解析失败的KBBB既不删除也不插入，数据库中保留上一次的记录
+    assert get_deleted_airports(sql) == ['KAAA', 'KCCC']
+    assert get_inserted_procedures(sql) == [('KAAA', 'AAA2')]
+    
+    # 失败的机场没有写入清单，下次运行时重新解析
+    monkeypatch.setattr(TerminalParser, 'parse_airport', parse_airport)
+    sql = run_patch(source_dir, cache_dir, tmp_path / 'third.sql')
+    assert get_deleted_airports(sql) == ['KBBB']
+    assert get_inserted_procedures(sql) == [('KBBB', 'BBB2')]
+
+def test_unchanged_airports_produce_empty_patch(tmp_path, source_dir):
+    cache_dir = tmp_path / 'cache'
+    run_patch(source_dir, cache_dir, tmp_path / 'first.sql')
+    sql = run_patch(source_dir, cache_dir, tmp_path / 'second.sql')
+    assert get_deleted_airports(sql) == []
+    assert get_inserted_procedures(sql) == []
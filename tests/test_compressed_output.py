@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import gzip
+import lzma
+import re
+
+import pytest
+
+import compressed_output
+from compressed_output import ParallelCompressedWriter, open_output, split_output_name
+from record_types import AirportRecord
+from sql_generator import SqlGenerator
+
+DECOMPRESS = {'gzip': gzip.decompress, 'xz': lzma.decompress}
+
+def make_text():
+    # 包含非ASCII字符，块边界可能落在多字节字符附近
+    return ''.join(f"INSERT INTO navaids VALUES ({index}, '导航台 {index}', 'O''HARE');\n" for index in range(5000))
+
+@pytest.mark.parametrize('compression', ['gzip', 'xz'])
+def test_multi_chunk_output_decompresses_to_the_input(tmp_path, compression, monkeypatch):
+    # 缩小块大小，输出由多个gzip member / xz stream拼接而成
+    monkeypatch.setitem(compressed_output._CHUNK_SIZES, compression, 10000)
+    text = make_text()
+    path = tmp_path / 'out.bin'
+    with ParallelCompressedWriter(str(path), compression, threads=3) as writer:
+        for start in range(0, len(text), 777):
+            writer.write(text[start:start + 777])
+    
+    assert DECOMPRESS[compression](path.read_bytes()) == text.encode('utf-8')
+
+@pytest.mark.parametrize('compression', ['gzip', 'xz'])
+def test_empty_output_is_a_valid_compressed_file(tmp_path, compression):
+    path = tmp_path / 'out.bin'
+    ParallelCompressedWriter(str(path), compression).close()
+    assert DECOMPRESS[compression](path.read_bytes()) == b''
+
+@pytest.mark.parametrize('extension, compression', [('.sql.gz', 'gzip'), ('.sql.xz', 'xz')])
+def test_sql_output_matches_uncompressed(tmp_path, extension, compression):
+    records = [AirportRecord(f"K{index:03d}", 'K1', 47.5, -122.25, index, 'P', 5000, '0', 18000, 'FL180')
+               for index in range(3000)]
+    outputs = {}
+    for suffix in ('.sql', extension):
+        output_file = tmp_path / f"navdata{suffix}"
+        SqlGenerator(str(output_file), compression_threads=2).generate_complete_sql({'airports': records})
+        data = output_file.read_bytes()
+        if suffix != '.sql':
+            data = DECOMPRESS[compression](data)
+        # 去掉文件头中的生成时间
+        outputs[suffix] = re.sub("生成时间: [^\n]*".encode('utf-8'), b'', data)
+    
+    assert outputs[extension] == outputs['.sql']
+
+def test_open_output_plain_text(tmp_path):
+    path = tmp_path / 'navdata.sql'
+    with open_output(str(path)) as f:
+        f.write("SELECT 1;\n")
+    assert path.read_text(encoding='utf-8') == "SELECT 1;\n"
+
+def test_split_output_name():
+    assert split_output_name('out/navdata.sql.gz') == ('out/navdata', '.sql.gz')
+    assert split_output_name('out/navdata.sql') == ('out/navdata', '.sql')
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import re
+
+import pytest
+
+from delta_generator import DeltaSqlGenerator, SnapshotStore
+from record_types import AirportRecord, MsaRecord, RunwayRecord
+
+def airport(icao_code, elevation=100):
+    return AirportRecord(icao_code, 'K1', 47.5, -122.25, elevation, 'P', 5000, '0', 18000, 'FL180')
+
+def runway(end1_identifier, width, surface_type=1):
+    return RunwayRecord('KSEA', 'land', width, surface_type, end1_identifier, 47.1, -122.3, 0.0, 0.0,
+                        '34', 47.2, -122.3, 0.0, 0.0)
+
+def msa(airport_icao, altitude):
+    return MsaRecord(1, 'SEA', 'K1', airport_icao, 'M', 0, altitude, 25, None, None, None, None, None, None)
+
+@pytest.fixture
+def run_delta(tmp_path):
+    """
+    对同一个快照依次生成增量，返回 (生成器, 只含DML语句的行)
+    """
+    runs = []
+    
+    def run(data_dict):
+        output_file = tmp_path / f"delta_{len(runs)}.sql"
+        generator = DeltaSqlGenerator(str(output_file), str(tmp_path / 'snapshot.db'))
+        generator.generate_complete_sql(data_dict)
+        runs.append(generator)
+        lines = output_file.read_text(encoding='utf-8').splitlines()
+        return generator, [line for line in lines if re.match(r"(DELETE|UPDATE|INSERT|\()", line)]
+    
+    return run
+
+def get_snapshot_rows(tmp_path, table_name):
+    store = SnapshotStore(str(tmp_path / 'snapshot.db'))
+    try:
+        return [row for (row,) in store.connection.execute(f"SELECT row FROM snap_{table_name} ORDER BY seq")]
+    finally:
+        store.close()
+
+def test_first_run_inserts_everything(run_delta):
+    generator, statements = run_delta({'airports': [airport('KAAA'), airport('KBBB')]})
+    assert generator.delta_counts['airports'] == {'delete': 0, 'update': 0, 'insert': 2}
+    assert statements[0].startswith("INSERT INTO airports (icao_code, ")
+    assert statements[1:] == ["('KAAA', 'K1', 47.5, -122.25, 100, 'P', 5000, '0', 18000, 'FL180'),",
+                              "('KBBB', 'K1', 47.5, -122.25, 100, 'P', 5000, '0', 18000, 'FL180');"]
+
+def test_unchanged_data_produces_no_statements(run_delta):
+    records = [airport('KAAA'), airport('KBBB')]
+    run_delta({'airports': records})
+    generator, statements = run_delta({'airports': records})
+    assert generator.delta_counts['airports'] == {'delete': 0, 'update': 0, 'insert': 0}
+    assert statements == []
+
+def test_insert_update_and_delete(run_delta):
+    run_delta({'airports': [airport('KAAA'), airport('KBBB')]})
+    generator, statements = run_delta({'airports': [airport('KAAA', 200), airport('KCCC')]})
+    assert generator.delta_counts['airports'] == {'delete': 1, 'update': 1, 'insert': 1}
+    assert statements[:2] == ["DELETE FROM airports WHERE icao_code IN ('KBBB');",
+                              "UPDATE airports SET elevation = 200 WHERE icao_code = 'KAAA';"]
+    assert statements[3] == "('KCCC', 'K1', 47.5, -122.25, 100, 'P', 5000, '0', 18000, 'FL180');"
+
+def test_changed_duplicate_key_is_replaced_as_a_whole(run_delta):
+    # 两条跑道的自然键 (机场, 类型, 一端标识) 相同，数据库中无法单独更新其中一条
+    run_delta({'runways': [runway('16', 45), runway('16', 60), runway('34', 45)]})
+    generator, statements = run_delta({'runways': [runway('16', 45), runway('16', 75), runway('34', 45)]})
+    assert generator.delta_counts['runways'] == {'delete': 2, 'update': 0, 'insert': 2}
+    assert statements[0] == ("DELETE FROM runways WHERE (airport_icao, runway_type, end1_identifier) "
+                             "IN (('KSEA', 'land', '16'));")
+    assert [line.split(', ')[2] for line in statements[2:]] == ['45', '75']
+
+def test_unchanged_duplicates_with_an_added_row(run_delta):
+    run_delta({'runways': [runway('16', 45), runway('16', 60)]})
+    generator, statements = run_delta({'runways': [runway('16', 45), runway('16', 60), runway('16', 90)]})
+    assert generator.delta_counts['runways'] == {'delete': 0, 'update': 0, 'insert': 1}
+    assert statements[1].split(', ')[2] == '90'
+
+def test_null_key_columns_use_is_null(run_delta):
+    run_delta({'msa': [msa(None, 3000), msa('KSEA', 4000), msa('KBFI', 5000)]})
+    generator, statements = run_delta({'msa': [msa(None, 3500), msa('KSEA', 4000)]})
+    assert generator.delta_counts['msa'] == {'delete': 1, 'update': 1, 'insert': 0}
+    assert statements == [
+        "DELETE FROM msa WHERE (navaid_identifier, region_code, airport_icao, msa_type) "
+        "IN (('SEA', 'K1', 'KBFI', 'M'));",
+        "UPDATE msa SET sector1_altitude = 3500 WHERE navaid_identifier = 'SEA' AND region_code = 'K1' "
+        "AND airport_icao IS NULL AND msa_type = 'M';",
+    ]
+    
+    generator, statements = run_delta({'msa': [msa('KSEA', 4000)]})
+    assert statements == ["DELETE FROM msa WHERE navaid_identifier = 'SEA' AND region_code = 'K1' "
+                          "AND airport_icao IS NULL AND msa_type = 'M';"]
+
+def test_failed_table_keeps_its_snapshot(tmp_path, run_delta):
+    run_delta({'airports': [airport('KAAA')], 'msa': [msa('KSEA', 4000)]})
+    
+    def failing_records():
+        yield airport('KBBB')
+        raise RuntimeError("解析失败")
+    
+    generator, statements = run_delta({'airports': failing_records(), 'msa': [msa('KSEA', 4500)]})
+    # 失败的表不输出语句，也不当作空表删除全部记录
+    assert 'airports' not in generator.delta_counts
+    assert statements == ["UPDATE msa SET sector1_altitude = 4500 WHERE navaid_identifier = 'SEA' "
+                          "AND region_code = 'K1' AND airport_icao = 'KSEA' AND msa_type = 'M';"]
+    assert get_snapshot_rows(tmp_path, 'airports') == [
+        '["KAAA","K1",47.5,-122.25,100,"P",5000,"0",18000,"FL180"]']
+    
+    # 下一次仍然与失败之前的快照对比
+    generator, statements = run_delta({'airports': [airport('KAAA'), airport('KBBB')], 'msa': [msa('KSEA', 4500)]})
+    assert generator.delta_counts['airports'] == {'delete': 0, 'update': 0, 'insert': 1}
+    assert generator.delta_counts['msa'] == {'delete': 0, 'update': 0, 'insert': 0}
+
+def test_failed_write_keeps_the_old_snapshot(tmp_path, run_delta, monkeypatch):
+    run_delta({'airports': [airport('KAAA')]})
+    
+    def failing_write(self, f, table_name, store):
+        raise OSError("磁盘已满")
+    
+    monkeypatch.setattr(DeltaSqlGenerator, '_write_table_delta', failing_write)
+    with pytest.raises(OSError):
+        run_delta({'airports': [airport('KBBB')]})
+    monkeypatch.undo()
+    
+    assert get_snapshot_rows(tmp_path, 'airports') == [
+        '["KAAA","K1",47.5,-122.25,100,"P",5000,"0",18000,"FL180"]']
+    generator, statements = run_delta({'airports': [airport('KBBB')]})
+    assert statements[0] == "DELETE FROM airports WHERE icao_code IN ('KAAA');"
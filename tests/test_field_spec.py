@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from record_types import AirportRecord
+from parsers.field_spec import (FieldSpec, FieldCountError, FieldValidationError,
+                                compile_field_specs, is_latitude, not_empty)
+
+AIRPORT_SPECS = (
+    FieldSpec('icao_code', 0, validator=not_empty),
+    FieldSpec('region_code', 1, validator=not_empty),
+    FieldSpec('latitude', 2, 'float', validator=is_latitude),
+    FieldSpec('longitude', 3, 'float'),
+    FieldSpec('elevation', 4, 'int'),
+    FieldSpec('airport_type', 5, default='P'),
+    FieldSpec('runway_length', 6, 'int'),
+    FieldSpec('runway_surface', 7, default='0'),
+    FieldSpec('transition_altitude', 8, 'int', -1),
+    FieldSpec('transition_level', 9, default='-1'),
+)
+
+def test_converts_fields_by_kind():
+    convert = compile_field_specs((FieldSpec('name', 0), FieldSpec('count', 1, 'int'),
+                                   FieldSpec('value', 2, 'float'), FieldSpec('course', 3, 'int_float')))
+    assert convert(['ABC', '12', '1.5', '57.0']) == ('ABC', 12, 1.5, 57)
+
+def test_builds_record_type():
+    convert = compile_field_specs(AIRPORT_SPECS, 10, AirportRecord)
+    record = convert('00AN PA 59.093472222 -156.455833333 80 P 4500 0 18000 FL180'.split())
+    assert type(record) is AirportRecord
+    assert record == AirportRecord('00AN', 'PA', 59.093472222, -156.455833333, 80, 'P', 4500, '0', 18000, 'FL180')
+
+def test_rest_joins_remaining_fields():
+    convert = compile_field_specs((FieldSpec('code', 0), FieldSpec('name', 1, 'rest')))
+    assert convert(['K1', 'SOME', 'LONG', 'NAME']) == ('K1', 'SOME LONG NAME')
+
+def test_arg_fields_come_first():
+    convert = compile_field_specs((FieldSpec('value', 0, 'int'),), arg_fields=('airport', 'sequence'))
+    assert convert(['7'], 'KSEA', 3) == ('KSEA', 3, 7)
+
+def test_empty_string_uses_default():
+    convert = compile_field_specs((FieldSpec('kind', 0, default='P'), FieldSpec('altitude', 1, 'int', -1)))
+    assert convert(['', '']) == ('P', -1)
+
+def test_missing_optional_fields():
+    convert = compile_field_specs((FieldSpec('name', 0), FieldSpec('count', 1, 'int', 5),
+                                   FieldSpec('note', 2, missing=None)), min_fields=1)
+    assert convert(['A']) == ('A', 5, None)
+    assert convert(['A', '2', 'x']) == ('A', 2, 'x')
+
+def test_too_few_fields_raises():
+    convert = compile_field_specs(AIRPORT_SPECS, 10, AirportRecord)
+    with pytest.raises(FieldCountError) as excinfo:
+        convert(['00AN', 'PA'])
+    assert (excinfo.value.count, excinfo.value.min_fields) == (2, 10)
+
+def test_validator_rejects_row():
+    convert = compile_field_specs(AIRPORT_SPECS, 10, AirportRecord)
+    with pytest.raises(FieldValidationError) as excinfo:
+        convert('00AN PA 95.0 10.0 80 P 4500 0 18000 FL180'.split())
+    assert excinfo.value.field_name == 'latitude'
+    assert excinfo.value.value == 95.0
+
+def test_conversion_error_callback():
+    errors = []
+    convert = compile_field_specs((FieldSpec('count', 0, 'int', -1), FieldSpec('value', 1, 'float')),
+                                  on_conversion_error=lambda *args: errors.append(args))
+    assert convert(['abc', 'x1']) == (-1, 0.0)
+    assert errors == [('count', 'abc', -1), ('value', 'x1', 0.0)]
+
+def test_conversion_error_callback_not_called_for_blank_values():
+    errors = []
+    convert = compile_field_specs((FieldSpec('count', 0, 'int'),),
+                                  on_conversion_error=lambda *args: errors.append(args))
+    assert convert([' ']) == (0,)
+    assert errors == []
+
+def test_conversion_errors_without_callback_use_default():
+    convert = compile_field_specs((FieldSpec('count', 0, 'int', 9),))
+    assert convert(['abc']) == (9,)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from record_types import AirportRecord, WaypointRecord
+from row_formatter import compile_row_formatter
+from sql_generator import SqlGenerator
+
+@pytest.fixture
+def format_value(tmp_path):
+    return SqlGenerator(str(tmp_path / 'out.sql'))._format_sql_value
+
+def format_generic(format_value, record):
+    return '(' + ', '.join(format_value(value) for value in record) + ')'
+
+def test_formats_typed_values(format_value):
+    format_row = compile_row_formatter('airports', AirportRecord._fields, format_value)
+    record = AirportRecord('00AN', 'PA', 59.093472222, -156.455833333, 80, 'P', 4500, '0', 18000, 'FL180')
+    assert format_row(record) == "('00AN', 'PA', 59.093472222, -156.455833333, 80, 'P', 4500, '0', 18000, 'FL180')"
+
+def test_formats_boolean_column(format_value):
+    format_row = compile_row_formatter('waypoints', WaypointRecord._fields, format_value)
+    record = WaypointRecord(1.0, -10.0, '0110W', 'ENRT', 'GO', 2115159, '01S010W', True)
+    assert format_row(record).endswith(", '01S010W', 1)")
+    assert format_row(record._replace(is_terminal=False)).endswith(", 0)")
+
+@pytest.mark.parametrize('record', [
+    AirportRecord(None, 'PA', None, 1.5, None, 'P', 0, '0', -1, '-1'),
+    AirportRecord("O'HARE", 'K\\1', 1.0, 2.0, 3, 'P', 4, '0', 5, 'FL180'),
+    AirportRecord('KSEA', 'K1', 47, -122, 3.5, 'P', True, '0', '18000', 'FL180'),
+])
+def test_matches_generic_formatting(format_value, record):
+    # NULL、需要转义的字符串和类型与声明不符的值都与通用格式化函数的结果一致
+    format_row = compile_row_formatter('airports', AirportRecord._fields, format_value)
+    assert format_row(record) == format_generic(format_value, record)
+
+def test_fallback_only_for_values_off_the_fast_path():
+    calls = []
+
+    def fallback(value):
+        calls.append(value)
+        return 'NULL' if value is None else repr(value)
+
+    format_row = compile_row_formatter('airports', AirportRecord._fields, fallback)
+    record = AirportRecord('KSEA', "K'", 47.0, None, 10, 'P', 0, '0', -1, '-1')
+    assert format_row(record) == "('KSEA', \"K'\", 47.0, NULL, 10, 'P', 0, '0', -1, '-1')"
+    assert calls == ["K'", None]
+
+def test_field_order_follows_record(format_value):
+    format_row = compile_row_formatter('airports', ['elevation', 'icao_code'], format_value)
+    assert format_row((80, '00AN')) == "(80, '00AN')"
+    assert format_row(('80', None)) == "('80', NULL)"
+
+def test_unknown_fields_use_fallback(format_value):
+    format_row = compile_row_formatter('airports', ['icao_code', 'not_a_column'], format_value)
+    assert format_row(('KSEA', 1.25)) == "('KSEA', 1.25)"
+
+def test_empty_field_list(format_value):
+    assert compile_row_formatter('airports', [], format_value)(()) == "()"
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import gzip
+import hashlib
+import json
+import os
+
+import pytest
+
+from record_types import AirportRecord, MoraRecord
+from sharded_generator import ShardedSqlGenerator, get_manifest_file
+
+def make_data():
+    airports = [AirportRecord(f"K{index:04d}", 'K1', 47.5, -122.25, index, 'P', 5000, '0', 18000, 'FL180')
+                for index in range(2500)]
+    mora = [MoraRecord(*[index] * len(MoraRecord._fields)) for index in range(10)]
+    return {'airports': airports, 'mora': mora}
+
+def read_sql(path):
+    data = open(path, 'rb').read()
+    if path.endswith('.gz'):
+        data = gzip.decompress(data)
+    return data.decode('utf-8')
+
+@pytest.mark.parametrize('file_name', ['navdata.sql', 'navdata.sql.gz'])
+def test_manifest_matches_shard_files(tmp_path, file_name):
+    output_file = str(tmp_path / file_name)
+    generator = ShardedSqlGenerator(output_file, shard_rows=1000)
+    generator.generate_complete_sql(make_data())
+    
+    manifest_file = get_manifest_file(output_file)
+    assert manifest_file == generator.manifest_file == str(tmp_path / 'navdata_manifest.json')
+    with open(manifest_file, encoding='utf-8') as f:
+        manifest = json.load(f)
+    
+    entries = [manifest['schema'], manifest['indexes']]
+    for table in manifest['tables'].values():
+        entries.extend(table['parts'])
+    for entry in entries:
+        path = os.path.join(str(tmp_path), entry['file'])
+        assert entry['bytes'] == os.path.getsize(path)
+        with open(path, 'rb') as f:
+            assert entry['sha256'] == hashlib.sha256(f.read()).hexdigest()
+    
+    airports = manifest['tables']['airports']
+    assert airports['record_count'] == 2500
+    assert [part['record_count'] for part in airports['parts']] == [1000, 1000, 500]
+    assert manifest['tables']['mora']['record_count'] == 10
+    for table in manifest['tables'].values():
+        for part in table['parts']:
+            sql = read_sql(os.path.join(str(tmp_path), part['file']))
+            rows = [line for line in sql.splitlines() if line.startswith('(')]
+            assert len(rows) == part['record_count']
+    
+    # 导入脚本校验清单中的所有文件
+    with open(generator.loader_file, encoding='utf-8') as f:
+        loader = f.read()
+    for entry in entries:
+        assert f"{entry['sha256']}  {entry['file']}" in loader
+
+def test_empty_table_has_no_parts(tmp_path):
+    output_file = str(tmp_path / 'navdata.sql')
+    ShardedSqlGenerator(output_file).generate_complete_sql({'airports': []})
+    with open(get_manifest_file(output_file), encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert manifest['tables']['airports'] == {'record_count': 0, 'parts': []}
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import pickle
+from concurrent.futures import Future
+
+import pytest
+
+import main
+from parsers import ParseDiagnostics
+from record_types import AirportRecord
+from spill_buffer import SpillBuffer
+
+def make_records(count):
+    return [AirportRecord(f"K{index:05d}", 'K1', index / 1000, -index / 1000, index, 'P', 0, '0', -1, '-1')
+            for index in range(count)]
+
+def list_spill_files(spill_dir):
+    return sorted(path.name for path in spill_dir.iterdir())
+
+@pytest.fixture
+def spill_dir(tmp_path):
+    path = tmp_path / 'spill'
+    path.mkdir()
+    return path
+
+def test_spilled_records_read_back_in_order(spill_dir):
+    records = make_records(35000)
+    unlimited = SpillBuffer.from_records(records, 0, str(spill_dir), 'airports')
+    spilled = SpillBuffer.from_records(records, 1, str(spill_dir), 'airports')
+    
+    assert unlimited.spilled_records == 0
+    # 预算为1字节时所有完整的批次都写到临时文件，只有最后不满一批的记录留在内存中
+    assert spilled.spilled_records == 30000
+    assert len(spilled) == len(records)
+    assert list(spilled) == list(unlimited) == records
+    # 可以重复迭代
+    assert list(spilled) == records
+    
+    # 传回主进程时只pickle临时文件路径和内存中的批次
+    transferred = pickle.loads(pickle.dumps(spilled))
+    assert list(transferred) == records
+    
+    spilled.close()
+    unlimited.close()
+    assert list_spill_files(spill_dir) == []
+
+def test_close_is_idempotent(spill_dir):
+    buffer = SpillBuffer.from_records(make_records(20000), 1, str(spill_dir), 'airports')
+    assert len(list_spill_files(spill_dir)) == 1
+    buffer.close()
+    buffer.close()
+    assert list_spill_files(spill_dir) == []
+
+def test_failed_fill_removes_temp_file(spill_dir):
+    def failing_records():
+        yield from make_records(20000)
+        raise RuntimeError("解析失败")
+    
+    with pytest.raises(RuntimeError):
+        SpillBuffer.from_records(failing_records(), 1, str(spill_dir), 'airports')
+    assert list_spill_files(spill_dir) == []
+
+def make_job_future(results):
+    future = Future()
+    job_metrics = {'seconds': dict.fromkeys(results, 0.0), 'peak_rss_mb': None, 'airports': {}}
+    future.set_result(((results, job_metrics), ParseDiagnostics()))
+    return future
+
+@pytest.fixture
+def converter(tmp_path):
+    converter = main.XPlaneConverter(str(tmp_path), str(tmp_path / 'navdata.sql'))
+    converter.show_progress = False
+    return converter
+
+def test_job_result_removes_temp_file_after_full_iteration(converter, spill_dir):
+    records = make_records(20000)
+    future = make_job_future({'airports': SpillBuffer.from_records(records, 1, str(spill_dir), 'airports')})
+    converter._parse_jobs.append(future)
+    
+    assert len(list_spill_files(spill_dir)) == 1
+    assert list(converter._iter_job_result('airports', future)) == records
+    assert list_spill_files(spill_dir) == []
+    converter._close_job_results()
+
+def test_close_job_results_removes_unread_buffers(converter, spill_dir):
+    # 同一个任务解析的两张表，只读取了其中一张，另一张的生成器从未开始
+    future = make_job_future({
+        'runways': SpillBuffer.from_records(make_records(20000), 1, str(spill_dir), 'runways'),
+        'gates': SpillBuffer.from_records(make_records(20000), 1, str(spill_dir), 'gates'),
+    })
+    converter._parse_jobs.append(future)
+    runways = converter._iter_job_result('runways', future)
+    gates = converter._iter_job_result('gates', future)
+    next(runways)
+    assert len(list_spill_files(spill_dir)) == 2
+    
+    converter._close_job_results()
+    assert list_spill_files(spill_dir) == []
+    assert converter._parse_jobs == []
+    runways.close()
+    gates.close()
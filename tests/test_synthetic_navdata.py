@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import re
+from collections import Counter
+
+import pytest
+
+import main
+from parsers import WaypointParser
+from synthetic_navdata import generate_navdata
+
+# 按行独立的格式，每个数据行对应一条记录
+LINE_TABLES = ['airports', 'waypoints', 'navaids', 'airways', 'holdings', 'mora', 'msa']
+
+# 支持按字节范围分块并行解析的表
+CHUNKED_TABLES = ['waypoints', 'navaids', 'airways', 'runways', 'frequencies', 'gates']
+
+WAYPOINT_LINES = ["-1.000000000  -10.000000000  0110W ENRT GO 2115159 01S010W",
+                  "47.500000000 -122.250000000  SEA01 ENRT K1 2115159 SEATTLE ONE"]
+
+@pytest.fixture(scope='session')
+def navdata(tmp_path_factory):
+    source_dir = tmp_path_factory.mktemp('synthetic')
+    counts = generate_navdata(str(source_dir), scale=0.002)
+    return str(source_dir), counts
+
+def parse_table(source_dir, table_name, workers=1):
+    return list(main.create_parser(source_dir, table_name, workers).iter_records())
+
+def count_sql_rows(sql):
+    """
+    按表统计INSERT语句中的行数
+    """
+    counts = Counter()
+    table_name = None
+    for line in sql.splitlines():
+        match = re.match(r"INSERT INTO (\w+) ", line)
+        if match:
+            table_name = match.group(1)
+        elif line.startswith('('):
+            counts[table_name] += 1
+    return counts
+
+@pytest.mark.parametrize('table_name', LINE_TABLES)
+def test_parses_every_generated_line(navdata, table_name):
+    source_dir, counts = navdata
+    assert len(parse_table(source_dir, table_name)) == counts[table_name]
+
+def test_cifp_and_apt_tables_have_records(navdata):
+    source_dir, counts = navdata
+    procedures = parse_table(source_dir, 'terminal_procedures')
+    assert len({record.airport_icao for record in procedures}) == counts['terminal_procedures']
+    for table_name in ('runways', 'frequencies', 'gates'):
+        assert parse_table(source_dir, table_name)
+
+@pytest.mark.parametrize('table_name', CHUNKED_TABLES)
+def test_chunked_parsing_matches_serial(navdata, table_name, monkeypatch):
+    source_dir, _ = navdata
+    serial = parse_table(source_dir, table_name)
+    
+    parser = main.create_parser(source_dir, table_name, workers=3)
+    # 合成数据很小，取消分块的文件大小下限
+    monkeypatch.setattr(parser, 'chunk_min_bytes', 0)
+    assert parser._should_chunk()
+    assert len(parser._get_chunk_ranges(3)) > 1
+    assert list(parser.iter_records()) == serial
+
+def test_converter_writes_all_records(navdata, tmp_path):
+    source_dir, _ = navdata
+    output_file = tmp_path / 'navdata.sql'
+    converter = main.XPlaneConverter(source_dir, str(output_file))
+    converter.show_progress = False
+    converter.metrics_report = False
+    converter.convert_all()
+    
+    sql = output_file.read_text(encoding='utf-8')
+    expected = {table_name: len(parse_table(source_dir, table_name)) for table_name in main.TABLE_SOURCES}
+    assert count_sql_rows(sql) == expected
+    for table_name in main.TABLE_SOURCES:
+        assert f"CREATE TABLE {table_name} (" in sql
+
+def test_converter_output_is_reproducible(navdata, tmp_path):
+    source_dir, _ = navdata
+    outputs = []
+    for name in ('first.sql', 'second.sql'):
+        output_file = tmp_path / name
+        converter = main.XPlaneConverter(source_dir, str(output_file))
+        converter.show_progress = False
+        converter.metrics_report = False
+        converter.convert_all(['waypoints', 'msa'])
+        # 去掉文件头中的生成时间
+        outputs.append(re.sub(r"生成时间: .*", '', output_file.read_text(encoding='utf-8')))
+    assert outputs[0] == outputs[1]
+
+def write_dat(path, text):
+    path.write_bytes(text.encode('utf-8'))
+    return str(path)
+
+@pytest.mark.parametrize('header', ["I\n1100 Version - data cycle 2401, build 20240101.\n\n",
+                                    "A\n1100 Version - data cycle 2401.\n",
+                                    "I\n",
+                                    ""])
+def test_header_is_skipped(tmp_path, header):
+    file_path = write_dat(tmp_path / 'earth_fix.dat', header + '\n'.join(WAYPOINT_LINES) + "\n99\n")
+    records = WaypointParser(file_path).parse()
+    assert [record.waypoint_name for record in records] == ['0110W', 'SEA01']
+
+@pytest.mark.parametrize('trailer', ["99\n", "99", "99\n\n\n", "  99  \r\n", ""])
+def test_trailer_is_excluded_from_data_range(tmp_path, trailer):
+    text = "I\n1100 Version - data cycle 2401.\n" + '\n'.join(WAYPOINT_LINES) + "\n" + trailer
+    file_path = write_dat(tmp_path / 'earth_fix.dat', text)
+    parser = WaypointParser(file_path)
+    
+    with parser._open_mmap() as mm:
+        start, end = parser._get_data_range(mm)
+        assert mm[start:end].decode('utf-8') == '\n'.join(WAYPOINT_LINES) + "\n"
+    assert [record.waypoint_name for record in parser.parse()] == ['0110W', 'SEA01']
+
+def test_empty_file_has_no_records(tmp_path):
+    file_path = write_dat(tmp_path / 'earth_fix.dat', "")
+    assert WaypointParser(file_path).parse() == []
+
+def test_stray_trailer_line_does_not_end_the_file(tmp_path, monkeypatch):
+    lines = [f"47.{index:09d} -122.250000000  WP{index:03d} ENRT K1 2115159 WAYPOINT {index}" for index in range(40)]
+    lines.insert(20, "99")
+    file_path = write_dat(tmp_path / 'earth_fix.dat', "I\n1100 Version - data cycle 2401.\n" + '\n'.join(lines) + "\n99\n")
+    
+    serial = WaypointParser(file_path).parse()
+    assert len(serial) == 40
+    
+    parser = WaypointParser(file_path, workers=3)
+    monkeypatch.setattr(parser, 'chunk_min_bytes', 0)
+    assert parser._should_chunk()
+    assert parser.parse() == serial